@@ -9,8 +9,51 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from asgiref.wsgi import WsgiToAsgi
+from django.conf import settings
 from django.core.asgi import get_asgi_application
+from whitenoise import WhiteNoise
+
+from core.template_warmup import warm_templates
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Parse templates now rather than on each worker's first requests
+warm_templates()
+
+# Manifest storage names hashed files like app.3f2a9c1b7d4e.css
+HASHED_STATIC_FILE = r'^.+\.[0-9a-f]{12}\..+$'
+
+
+def static_not_found(environ, start_response):
+    start_response('404 Not Found', [('Content-Type', 'text/plain')])
+    return [b'Not Found']
+
+
+class StaticFilesRouter:
+    """Serves STATIC_URL from WhiteNoise and hands every other request to Django"""
+
+    def __init__(self, application):
+        self.application = application
+        self.prefix = settings.STATIC_URL
+        self.static = WsgiToAsgi(WhiteNoise(
+            static_not_found,
+            root=settings.STATIC_ROOT,
+            prefix=settings.STATIC_URL,
+            autorefresh=settings.DEBUG,
+            max_age=getattr(settings, 'WHITENOISE_MAX_AGE', 60),
+            immutable_file_test=HASHED_STATIC_FILE,
+        ))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'].startswith(self.prefix):
+            return await self.static(scope, receive, send)
+        return await self.application(scope, receive, send)
+
+
+if 'whitenoise.middleware.WhiteNoiseMiddleware' in settings.MIDDLEWARE:
+    application = django_application
+else:
+    application = StaticFilesRouter(django_application)
@@ -44,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',  # Server-Timing, /metrics/ and query budgets
+    'core.routers.ReplicaStickinessMiddleware',  # Primary reads right after a client writes
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -54,14 +56,33 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# 'wsgi' (gunicorn sync workers) or 'asgi' (gunicorn + uvicorn workers), see gunicorn.conf.py.
+# WhiteNoise's middleware is sync-only and would put every ASGI request back on a
+# thread, so under ASGI config/asgi.py serves static files in front of Django instead.
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+if SERVER_MODE == 'asgi':
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'config.urls'
 
+# Django caches compiled templates by default; spelled out so the production
+# mode is explicit. Outside DEBUG each template is parsed once per process
+# (config/wsgi.py and config/asgi.py precompile them at startup); while
+# developing they are re-read on every render so edits show up at once.
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.metrics.InstrumentedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
+        'APP_DIRS': False,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -75,20 +96,55 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database configuration from environment variables
-DATABASES = {
-    'default': {
+def database_config(host):
+    config = {
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': os.getenv('DB_NAME', 'postgres'),
         'USER': os.getenv('DB_USER', 'pgadmin'),
         'PASSWORD': os.getenv('DB_PASSWORD', 'Nine112233'),
-        'HOST': os.getenv('DB_HOST', 'snapora-db-19339.postgres.database.azure.com'),
+        'HOST': host,
         'PORT': os.getenv('DB_PORT', '5432'),
         'OPTIONS': {
             'sslmode': 'require'
-        }
+        },
+        # Reuse connections across requests instead of paying a TCP+TLS+auth
+        # handshake every time; health checks drop connections the server closed.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
     }
+    if os.getenv('DB_POOL', 'False') == 'True':
+        # Django's pool (psycopg 3's pool extra, see requirements.txt)
+        # replaces persistent connections, so CONN_MAX_AGE must be 0.
+        config['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        }
+        config['CONN_MAX_AGE'] = 0
+    return config
+
+DATABASES = {
+    'default': database_config(os.getenv('DB_HOST', 'snapora-db-19339.postgres.database.azure.com')),
 }
 
+# Optional read replicas, e.g. DB_REPLICA_HOSTS=replica-1.example.com,replica-2.example.com
+# Views decorated with core.routers.replica_reads read from one of these.
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = database_config(host.strip())
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# After a write, the client reads from the primary for this many seconds
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '5'))
+# Replicas further behind than this are skipped; lag is re-checked every interval
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '2'))
+REPLICA_LAG_CHECK_INTERVAL = 5
+# Bookkeeping writes that should not pin the client to the primary
+REPLICA_STICKY_IGNORE = ('sessions.session', 'interactions.view', 'users.creatorstats')
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -108,8 +164,20 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-# Whitenoise static file storage
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Storage backends (Django 5.1+ ignores DEFAULT_FILE_STORAGE/STATICFILES_STORAGE).
+# collectstatic gives every static file a content-hashed name, plus gzip and,
+# with the brotli package installed, brotli copies; WhiteNoise serves the
+# hashed names with far-future immutable cache headers.
+STORAGES = {
+    # The local filesystem, which is what uploads without an explicit storage
+    # (profile pictures) have been using; videos and thumbnails name Azure
+    # themselves. Moving the rest of media to Azure is a separate change.
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.storage.StaticFilesStorage'},
+}
+# Templates reference a few images that are not in the repo; link those by
+# their plain names instead of failing the page (core.storage).
+WHITENOISE_MANIFEST_STRICT = False
 
 # Azure Blob Storage Configuration for Media Files
 AZURE_ACCOUNT_NAME = os.getenv('AZURE_ACCOUNT_NAME', 'snaporavideos')
@@ -117,8 +185,7 @@ AZURE_ACCOUNT_KEY = os.getenv('AZURE_ACCOUNT_KEY', 'Fult+T9PAJcQbWU9a/0vuO33Haa3
 AZURE_CONTAINER = os.getenv('AZURE_CONTAINER', 'media')
 AZURE_CUSTOM_DOMAIN = f'{AZURE_ACCOUNT_NAME}.blob.core.windows.net'
 
-# Configure Azure Storage as default file storage
-DEFAULT_FILE_STORAGE = 'storages.backends.azure_storage.AzureStorage'
+# Azure Storage for video files and thumbnails (videos.models.azure_storage)
 AZURE_LOCATION = ''  # Optional subfolder within container
 AZURE_SSL = True
 AZURE_URL_EXPIRATION_SECS = 3600  # 1 hour URL expiration
@@ -128,7 +195,7 @@ MEDIA_URL = f'https://{AZURE_CUSTOM_DOMAIN}/{AZURE_CONTAINER}/'
 MEDIA_ROOT = ''  # Not used when using Azure Storage
 
 # Optional: Use Azure for static files as well (uncomment below)
-# STATICFILES_STORAGE = 'storages.backends.azure_storage.AzureStorage'
+# STORAGES['staticfiles'] = {'BACKEND': 'storages.backends.azure_storage.AzureStorage'}
 # AZURE_STATIC_CONTAINER = os.getenv('AZURE_STATIC_CONTAINER', 'static')
 # STATIC_URL = f'https://{AZURE_CUSTOM_DOMAIN}/{AZURE_STATIC_CONTAINER}/'
 
@@ -149,6 +216,67 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 SESSION_COOKIE_AGE = 3600
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
+# Caches. Set REDIS_URL to share them (and sessions) between worker processes;
+# otherwise each process keeps its own in-memory cache.
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL},
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'session',
+        },
+    }
+else:
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+        'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+    }
+
+# With a shared REDIS_URL cache, sessions are read from their own cache and
+# only written (through to the database) when they change, and
+# SESSION_ENGINE=django.contrib.sessions.backends.cache drops the database
+# entirely. A per-process cache would let workers serve a session after
+# another one logged it out, so without Redis they stay in the database.
+# Expired rows are removed in batches by `manage.py purge_sessions`.
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db' if REDIS_URL else 'django.contrib.sessions.backends.db',
+)
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_SAVE_EVERY_REQUEST = False
+
+# Repeat views of a video by the same viewer inside this window count once (interactions.view_dedup)
+VIEW_DEDUP_WINDOW = 60 * 60 * 24
+
+# Anonymous feed, search, tag and watch pages are served from the default
+# cache for this many seconds (core.page_cache); 0 turns the page cache off.
+# Edits purge the affected pages immediately.
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '60'))
+# Seconds a profile's header (avatar, stats, bio) is served from the fragment cache
+PROFILE_HEADER_TIMEOUT = int(os.getenv('PROFILE_HEADER_TIMEOUT', '60'))
+
+# Threads per process that build avatar/thumbnail size variants after uploads
+# (core.images); `manage.py build_image_variants` backfills anything missed.
+IMAGE_VARIANT_WORKERS = int(os.getenv('IMAGE_VARIANT_WORKERS', '2'))
+
+# Request instrumentation (core.middleware.RequestMetricsMiddleware)
+# /metrics/ accepts "Authorization: Bearer <METRICS_TOKEN>" when set, otherwise staff only
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+# Maximum queries per view; exceeding one logs a warning, or raises
+# QueryBudgetExceeded when QUERY_BUDGET_ENFORCE is on (as in tests).
+# Each is the signed-in count plus two, so one extra query per card fails.
+QUERY_BUDGETS = {
+    'core:home': 17,
+    'videos:search': 18,
+    'videos:tag': 19,
+    'videos:tags': 6,
+    'videos:watch': 25,
+    'users:profile': 21,
+}
+QUERY_BUDGET_ENFORCE = os.getenv('QUERY_BUDGET_ENFORCE', 'False') == 'True'
+
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -1,3 +1,24 @@
 from django.contrib import admin
 
 # Register your models here.
+
+
+class RetiringAdminMixin:
+    """ModelAdmin mixin: deleting retires rows (self.retire) and leaves the rest to manage.py reap_deleted.
+
+    The stock confirmation page would collect every row a cascade reaches,
+    which for a popular video is most of the views table; it lists only
+    the objects chosen.
+    """
+    retire = None
+
+    def delete_model(self, request, obj):
+        self.retire(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.retire(obj)
+
+    def get_deleted_objects(self, objs, request):
+        perms_needed = set() if self.has_delete_permission(request) else {self.opts.verbose_name}
+        return [str(obj) for obj in objs], {self.opts.verbose_name_plural: len(objs)}, perms_needed, []
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.core.files.storage import default_storage
+        from django.db.backends.signals import connection_created
+        from videos.models import azure_storage
+        from .metrics import time_queries, track_storage
+        from .routers import watch_writes
+
+        track_storage(azure_storage)
+        track_storage(default_storage)
+        connection_created.connect(time_queries, dispatch_uid='core.metrics.time_queries')
+        connection_created.connect(watch_writes, dispatch_uid='core.routers.watch_writes')
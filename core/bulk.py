@@ -0,0 +1,76 @@
+import time
+
+from django.db import connections, transaction
+
+
+def batches(iterable, size):
+    """Yield lists of up to size items from any iterable"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_insert(model, rows, batch_size, ignore_conflicts=False, on_batch=None):
+    """bulk_create rows in batches, one transaction per batch; returns how many rows were sent"""
+    sent = 0
+    for batch in batches(rows, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+        sent += len(batch)
+        if on_batch:
+            on_batch(sent)
+    return sent
+
+
+def delete_in_batches(queryset, batch_size, pause=0.0, signals=False, on_batch=None):
+    """Delete queryset's rows batch_size at a time, one short transaction each; returns rows deleted.
+
+    Each batch is locked and re-read first, so on_batch(keys) sees exactly
+    the primary keys about to go, inside their transaction, even if another
+    run is deleting the same rows. With signals a batch goes through
+    QuerySet.delete(), receivers and cascades included; without, it is a
+    plain DELETE ... WHERE pk IN (...) (delete_rows), for rows nothing else
+    depends on.
+    """
+    model, db = queryset.model, queryset.db
+    deleted = 0
+    while True:
+        keys = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not keys:
+            return deleted
+        with transaction.atomic(using=db):
+            keys = list(
+                model._base_manager.using(db).filter(pk__in=keys)
+                .select_for_update().values_list('pk', flat=True)
+            )
+            if on_batch:
+                on_batch(keys)
+            if signals:
+                model._base_manager.using(db).filter(pk__in=keys).delete()
+            else:
+                delete_rows(model, keys, db)
+        deleted += len(keys)
+        if pause:
+            time.sleep(pause)
+
+
+def delete_rows(model, keys, using='default'):
+    """DELETE model's rows with these primary keys in one statement; returns rows deleted.
+
+    No receivers run and nothing cascades: a row still referenced elsewhere
+    fails on its foreign key constraint rather than taking others with it.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(keys))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({placeholders})',
+            list(keys),
+        )
+        return cursor.rowcount
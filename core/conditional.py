@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.messages.storage.session import SessionStorage
+from django.core.paginator import Paginator
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.crypto import salted_hmac
+
+from interactions.models import Comment
+from interactions.viewer_state import viewer_state_annotations
+
+ETAG_SALT = 'core.conditional'
+
+# What a video card shows, minus view totals: those change on nearly every
+# request and would make the validators useless, so pages show them as of
+# their last full render (the watch page refreshes its own from the beacon).
+# Comment totals are counted per page by card_rows.
+CARD_FIELDS = ('created_at', 'updated_at', 'like_count', 'dislike_count', 'user', 'user__updated_at')
+
+
+def has_pending_messages(request):
+    """Whether the page would show flash messages, which no cached copy contains"""
+    if request.COOKIES.get(CookieStorage.cookie_name):
+        return True
+    session = getattr(request, 'session', None)
+    return session is not None and SessionStorage.session_key in session
+
+
+def viewer_version(request):
+    """The parts of a page that depend on who is asking (navbar, CSRF token)"""
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    # Logging in again starts a new session and rotates the CSRF token in forms
+    return user.pk, user.updated_at, request.session.session_key
+
+
+def media_url_window():
+    """Number of the current quarter of a signed media URL's lifetime.
+
+    Pages embed SAS URLs that expire after AZURE_URL_EXPIRATION_SECS, so a
+    copy kept by the browser must not be revalidated forever. Keyed into
+    every ETag, this forces a fresh render (and fresh signatures) at least
+    once per quarter lifetime. URLs are reused for up to half their
+    lifetime (core.images.UrlCache), so a page kept after a 304 still has
+    about a quarter of a lifetime before its links expire.
+    """
+    return int(time.time() // max(settings.AZURE_URL_EXPIRATION_SECS // 4, 1))
+
+
+def make_etag(request, *versions):
+    """ETag for a page from versions of its content and of its viewer.
+
+    Returns None, so no validator is sent and nothing is answered with a
+    304, while the viewer has flash messages waiting. The versions are
+    keyed with SECRET_KEY since they include the session key.
+    """
+    if has_pending_messages(request):
+        return None
+    versions = (viewer_version(request), media_url_window()) + versions
+    return salted_hmac(ETAG_SALT, repr(versions)).hexdigest()
+
+
+def card_rows(videos, viewer):
+    """videos with only the fields cards show, plus comment totals and the viewer's state.
+
+    Everything card_versions needs comes back in the one query for the
+    rows, so a validator costs no more than the page's own listing query.
+    """
+    comments = Comment.objects.filter(video=OuterRef('pk')).values('video').annotate(total=Count('pk')).values('total')
+    return (
+        videos.select_related('user').only(*CARD_FIELDS)
+        .annotate(comment_total=Coalesce(Subquery(comments), 0), **viewer_state_annotations(viewer))
+    )
+
+
+def card_versions(videos):
+    """Versions of the video cards on a page, from rows of card_rows"""
+    return [
+        (video.pk, video.updated_at, video.like_count, video.dislike_count, video.comment_total,
+         video.user.updated_at, getattr(video, 'viewer_is_like', None),
+         getattr(video, 'viewer_follows_creator', False), getattr(video, 'viewer_watched', False))
+        for video in videos
+    ]
+
+
+def link_versions(videos):
+    """Versions of compact video links (thumbnail, title, creator), which show no viewer state"""
+    return list(videos.values_list('pk', 'updated_at', 'thumbnail_variants', 'user__updated_at'))
+
+
+def page_versions(videos, per_page, number, viewer):
+    """Versions of one Paginator page of videos: a COUNT and one query for the cards"""
+    paginator = Paginator(card_rows(videos, viewer), per_page)
+    page = paginator.get_page(number)
+    return paginator.count, page.number, card_versions(page.object_list)
@@ -0,0 +1,256 @@
+import logging
+import posixpath
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Extension -> Pillow format. Every width is stored in both: WebP for
+# browsers that take it (nearly all), JPEG as the fallback.
+FORMATS = {'webp': 'WEBP', 'jpg': 'JPEG'}
+QUALITY = 80
+
+
+class VariantSpec:
+    """The fixed widths generated for one kind of image"""
+
+    def __init__(self, widths, square=False):
+        self.widths = tuple(sorted(widths))
+        self.square = square
+
+    def widths_for(self, size):
+        if self.square:
+            return list(self.widths)
+        # Never upscale: a small image gets a single variant at its own width
+        return [width for width in self.widths if width <= size[0]] or [size[0]]
+
+
+# Avatars are drawn at 32-56px (200px on profile pages), thumbnails in feed
+# cards up to ~320px wide; each size also gets a 2x width for dense screens.
+AVATAR = VariantSpec((48, 96, 192, 384), square=True)
+THUMBNAIL = VariantSpec((320, 640))
+
+
+def variant_name(name, width, ext):
+    head, tail = posixpath.split(name)
+    stem = posixpath.splitext(tail)[0]
+    return posixpath.join(head, 'variants', f'{stem}-{width}.{ext}')
+
+
+def render_variant(image, width, spec, image_format):
+    if spec.square:
+        out = ImageOps.fit(image, (width, width), Image.Resampling.LANCZOS)
+    elif width < image.width:
+        out = image.resize((width, round(image.height * width / image.width)), Image.Resampling.LANCZOS)
+    else:
+        out = image
+
+    if image_format == 'JPEG':
+        if out.mode in ('RGBA', 'LA', 'P'):
+            # JPEG has no alpha: flatten onto white rather than black
+            rgba = out.convert('RGBA')
+            out = Image.new('RGB', rgba.size, 'white')
+            out.paste(rgba, mask=rgba.getchannel('A'))
+        elif out.mode != 'RGB':
+            out = out.convert('RGB')
+    elif out.mode not in ('RGB', 'RGBA'):
+        out = out.convert('RGBA' if out.mode in ('LA', 'P') else 'RGB')
+
+    buffer = BytesIO()
+    out.save(buffer, image_format, quality=QUALITY)
+    return buffer.getvalue()
+
+
+def build_variants(file, spec):
+    """Store every variant of an image file next to it; returns the widths generated.
+
+    Variants already in storage are kept, so this is cheap to repeat for
+    files many rows share (the default avatar).
+    """
+    with file.open('rb'):
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    storage = file.storage
+    widths = spec.widths_for(image.size)
+    for width in widths:
+        for ext, image_format in FORMATS.items():
+            name = variant_name(file.name, width, ext)
+            if not storage.exists(name):
+                storage.save(name, ContentFile(render_variant(image, width, spec, image_format)))
+    return widths
+
+
+def variants_field(field_name):
+    return f'{field_name}_variants'
+
+
+def delete_image(instance, field_name):
+    """Remove one row's image file and the variants built from it from storage"""
+    file = getattr(instance, field_name)
+    if not file:
+        return
+    storage = file.storage
+    variants = getattr(instance, variants_field(field_name))
+    if variants.get('name') == file.name:
+        for width in variants.get('widths', []):
+            for ext in FORMATS:
+                storage.delete(variant_name(file.name, width, ext))
+    file.delete(save=False)
+
+
+def needs_variants(instance, field_name):
+    """Whether instance's image has no variants recorded for its current file"""
+    file = getattr(instance, field_name)
+    return bool(file) and getattr(instance, variants_field(field_name)).get('name') != file.name
+
+
+def refresh_variants(model, pk, field_name):
+    """Build and record the variants of one row's image; returns True if it had to.
+
+    Models list their image fields in IMAGE_VARIANTS ({field name: VariantSpec})
+    and keep what was built in a <field>_variants JSONField. Saving it bumps
+    updated_at, so the row's cached pages and ETags pick up the srcset.
+    """
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None or not needs_variants(instance, field_name):
+        return False
+    file = getattr(instance, field_name)
+    widths = build_variants(file, model.IMAGE_VARIANTS[field_name])
+    setattr(instance, variants_field(field_name), {'name': file.name, 'widths': widths})
+    instance.save(update_fields=[variants_field(field_name), 'updated_at'])
+    return True
+
+
+class VariantWorker:
+    """In-process pool that builds image variants off the request path.
+
+    Jobs are queued when the upload's transaction commits and are not
+    persisted; `manage.py build_image_variants` picks up anything a
+    restart dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._executor = None
+
+    def schedule(self, instance, field_name):
+        model, pk = type(instance), instance.pk
+        transaction.on_commit(lambda: self.submit(model, pk, field_name))
+
+    def submit(self, model, pk, field_name):
+        key = (model._meta.label_lower, pk, field_name)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2),
+                    thread_name_prefix='image-variants',
+                )
+        self._executor.submit(self._run, key, model, pk, field_name)
+
+    def _run(self, key, model, pk, field_name):
+        try:
+            refresh_variants(model, pk, field_name)
+        except Exception:
+            logger.exception('Building %s variants for %s %s failed', field_name, key[0], pk)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+            connections.close_all()
+
+
+variant_worker = VariantWorker()
+
+
+class UrlCache:
+    """Storage URLs memoized per process for part of their lifetime.
+
+    Media URLs are signed (SAS) for AZURE_URL_EXPIRATION_SECS; signing one
+    builds two SDK clients and an HMAC, and a feed page needs dozens. A URL
+    is reused for half its lifetime, so one taken from here is always valid
+    for at least the other half; page ETags (core.conditional) turn over
+    every quarter lifetime, so a page kept after a 304 still has working
+    links.
+    """
+
+    # For storages whose URLs do not expire
+    DEFAULT_SECONDS = 60 * 60
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._urls = OrderedDict()
+
+    def url(self, storage, name):
+        key = (id(storage), name)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._urls.get(key)
+            if entry is not None and entry[1] > now:
+                self._urls.move_to_end(key)
+                return entry[0]
+
+        url = storage.url(name)
+        lifetime = getattr(storage, 'expiration_secs', None)
+        expires = now + (lifetime / 2 if lifetime else self.DEFAULT_SECONDS)
+        with self._lock:
+            self._urls[key] = (url, expires)
+            self._urls.move_to_end(key)
+            while len(self._urls) > self.max_size:
+                self._urls.popitem(last=False)
+        return url
+
+    def clear(self):
+        with self._lock:
+            self._urls.clear()
+
+
+url_cache = UrlCache()
+
+
+class ResponsiveImage:
+    """An image field's file with its recorded variants, as template-ready URLs"""
+
+    def __init__(self, file, variants):
+        self.file = file
+        current = bool(file) and variants.get('name') == file.name
+        self.widths = variants.get('widths', []) if current else []
+
+    def __bool__(self):
+        return bool(self.file)
+
+    def variant_url(self, width, ext):
+        return url_cache.url(self.file.storage, variant_name(self.file.name, width, ext))
+
+    def srcset(self, ext):
+        return ', '.join(f'{self.variant_url(width, ext)} {width}w' for width in self.widths)
+
+    @property
+    def webp_srcset(self):
+        return self.srcset('webp')
+
+    @property
+    def jpeg_srcset(self):
+        return self.srcset('jpg')
+
+    @property
+    def src(self):
+        """Single URL for <img src>/poster: the largest JPEG variant, else the original"""
+        if not self.file:
+            return ''
+        if self.widths:
+            return self.variant_url(self.widths[-1], 'jpg')
+        return url_cache.url(self.file.storage, self.file.name)
@@ -0,0 +1,64 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(created_at, pk):
+    """Opaque, URL-safe position of a row in a newest-first (created_at, pk) ordering"""
+    micros = (created_at - EPOCH) // timedelta(microseconds=1)
+    return f'{micros}_{pk.hex}'
+
+
+def decode_cursor(value):
+    """(created_at, pk) from encode_cursor's output, or None if value is not one"""
+    try:
+        micros, pk = value.split('_')
+        return EPOCH + timedelta(microseconds=int(micros)), uuid.UUID(hex=pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+class KeysetPage:
+    """One page of rows plus the cursor of the page after it"""
+
+    def __init__(self, object_list, next_cursor, cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return self.cursor is None
+
+
+def keyset_page(queryset, cursor, per_page):
+    """The page of queryset (newest first by created_at, then pk) following cursor.
+
+    Unlike Paginator there is no COUNT and no OFFSET: every page is one
+    index range scan of per_page + 1 rows, so the hundredth page costs what
+    the first does. An invalid cursor gives the first page.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    queryset = queryset.order_by('-created_at', '-pk')
+    if position is not None:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    rows = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].pk)
+    return KeysetPage(rows, next_cursor, cursor if position is not None else None)
@@ -0,0 +1,208 @@
+import json
+import re
+import statistics
+import subprocess
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from videos.models import Tag, Video
+from videos.tagging import popular_tags
+
+User = get_user_model()
+
+QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = 'Drives the hot endpoints and reports latency percentiles and queries per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per scenario')
+        parser.add_argument('--scenarios', help='Comma-separated subset of: home, search, tag, watch, view, like, comment')
+        parser.add_argument('--username', help='Run as this user; defaults to the first generated load user')
+        parser.add_argument(
+            '--base-url',
+            help='Send real HTTP requests to a running server instead of the in-process test client '
+                 '(anonymous GET scenarios only); run it against SERVER_MODE=wsgi and SERVER_MODE=asgi '
+                 'with the same --concurrency to compare throughput',
+        )
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel HTTP workers with --base-url')
+        parser.add_argument('--output', help='JSON results path (default: benchmarks/<commit>.json)')
+        parser.add_argument('--compare', help='Earlier results file to diff against')
+
+    def handle(self, *args, **options):
+        self.options = options
+        user = self.pick_user(options['username'])
+        scenarios = self.build_scenarios(user)
+        if options['scenarios']:
+            wanted = options['scenarios'].split(',')
+            unknown = set(wanted) - set(scenarios)
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = {name: scenarios[name] for name in wanted}
+        if options['base_url']:
+            scenarios = {name: s for name, s in scenarios.items() if s['method'] == 'get'}
+
+        results = {}
+        for name, scenario in scenarios.items():
+            results[name] = self.run_scenario(scenario, user)
+            self.report(name, results[name])
+
+        commit = current_commit()
+        payload = {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'mode': 'http' if options['base_url'] else 'client',
+            'concurrency': options['concurrency'] if options['base_url'] else 1,
+            'requests_per_scenario': options['requests'],
+            'results': results,
+        }
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks' / f'{commit}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(payload, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if options['compare']:
+            self.compare(json.loads(Path(options['compare']).read_text()), payload)
+
+    def pick_user(self, username):
+        users = User.objects.order_by('pk')
+        user = users.filter(username=username).first() if username else users.filter(username__startswith='load_').first()
+        if user is None:
+            raise CommandError('No benchmark user found; run generate_load_dataset first or pass --username')
+        return user
+
+    def build_scenarios(self, user):
+        video = (
+            Video.objects.filter(visibility='public')
+            .annotate(popularity=Count('views'))
+            .order_by('-popularity')
+            .first()
+        )
+        if video is None:
+            raise CommandError('No public videos to benchmark against')
+        tag = popular_tags().first() or Tag.objects.first()
+        term = video.title.split()[0]
+        return {
+            'home': {'method': 'get', 'path': reverse('core:home')},
+            'search': {'method': 'get', 'path': f"{reverse('videos:search')}?q={term}"},
+            'tag': {'method': 'get', 'path': reverse('videos:tag', args=[tag.slug]) if tag else reverse('videos:tags')},
+            'watch': {'method': 'get', 'path': reverse('videos:watch', args=[video.pk]), 'login': True},
+            'view': {
+                'method': 'get', 'path': reverse('interactions:record_view', args=[video.pk]),
+                'headers': {'X-Requested-With': 'XMLHttpRequest'},
+            },
+            'like': {
+                'method': 'post', 'path': reverse('interactions:like_video', args=[video.pk]), 'login': True,
+                'headers': {'X-Requested-With': 'XMLHttpRequest'},
+            },
+            'comment': {
+                'method': 'post', 'path': reverse('interactions:add_comment', args=[video.pk]), 'login': True,
+                'data': {'text': 'benchmark comment'},
+            },
+        }
+
+    def run_scenario(self, scenario, user):
+        if self.options['base_url']:
+            return self.run_http(scenario)
+
+        client = Client()
+        if scenario.get('login'):
+            client.force_login(user)
+        send = getattr(client, scenario['method'])
+        headers = scenario.get('headers', {})
+
+        def once():
+            start = time.perf_counter()
+            response = send(scenario['path'], scenario.get('data'), secure=True, headers=headers)
+            elapsed = time.perf_counter() - start
+            return elapsed, response.status_code, response.get('Server-Timing', '')
+
+        for _ in range(self.options['warmup']):
+            once()
+        return self.summarize([once() for _ in range(self.options['requests'])])
+
+    def run_http(self, scenario):
+        url = self.options['base_url'].rstrip('/') + scenario['path']
+        headers = scenario.get('headers', {})
+
+        def once(_):
+            start = time.perf_counter()
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+                response.read()
+                status = response.status
+                timing = response.headers.get('Server-Timing', '')
+            return time.perf_counter() - start, status, timing
+
+        with ThreadPoolExecutor(max_workers=self.options['concurrency']) as pool:
+            list(pool.map(once, range(self.options['warmup'])))
+            started = time.perf_counter()
+            samples = list(pool.map(once, range(self.options['requests'])))
+            wall = time.perf_counter() - started
+        summary = self.summarize(samples)
+        summary['throughput_rps'] = round(len(samples) / wall, 1)
+        return summary
+
+    def summarize(self, samples):
+        latencies = [elapsed * 1000 for elapsed, _, _ in samples]
+        queries = [int(m.group(1)) for _, _, timing in samples if (m := QUERIES_RE.search(timing))]
+        errors = sum(1 for _, status, _ in samples if status >= 400)
+        return {
+            'count': len(samples),
+            'errors': errors,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'queries_per_request': round(statistics.fmean(queries), 1) if queries else None,
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<8} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"p99 {result['p99_ms']:>8.2f}ms  queries {result['queries_per_request']}  errors {result['errors']}"
+        )
+
+    def compare(self, before, after):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Compared with {before.get('commit', '?')}"))
+        for name, result in after['results'].items():
+            previous = before.get('results', {}).get(name)
+            if not previous:
+                continue
+            p95_delta = result['p95_ms'] - previous['p95_ms']
+            line = f"{name:<8} p95 {previous['p95_ms']:.2f} -> {result['p95_ms']:.2f}ms ({p95_delta:+.2f})"
+            if 'throughput_rps' in result and 'throughput_rps' in previous:
+                line += f"  rps {previous['throughput_rps']} -> {result['throughput_rps']}"
+            if result['queries_per_request'] is not None and previous.get('queries_per_request') is not None:
+                line += f"  queries {previous['queries_per_request']} -> {result['queries_per_request']}"
+            style = self.style.ERROR if p95_delta > 0.1 * previous['p95_ms'] else self.style.SUCCESS
+            self.stdout.write(style(line))
@@ -0,0 +1,74 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
+
+from core.images import url_cache
+from core.templatetags.cards import LAYOUTS
+from interactions.viewer_state import attach_card_state
+from videos.models import Video
+
+CARD_LIST = "{% load cards %}{% for video in videos %}{% video_card video layout %}{% endfor %}"
+
+
+class Command(BaseCommand):
+    help = 'Renders a page of video cards repeatedly and reports render time and queries per card'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=12, help='Cards per page')
+        parser.add_argument('--iterations', type=int, default=200, help='Measured renders')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured renders')
+        parser.add_argument('--layout', choices=LAYOUTS, default='grid')
+
+    def handle(self, *args, **options):
+        cards = options['cards']
+        videos = list(Video.objects.filter(visibility='public').select_related('user')[:cards])
+        if not videos:
+            raise CommandError('No public videos to render; run generate_load_dataset first')
+        # Repeat rows when there are too few, so every run renders a full page
+        videos = attach_card_state((videos * cards)[:cards], AnonymousUser())
+
+        engine = engines.all()[0]
+        page = engine.from_string(CARD_LIST)
+        context = {'videos': videos, 'layout': options['layout']}
+
+        self.report_compile(engine)
+        url_cache.clear()
+        self.stdout.write(f'first render (cold URL cache): {self.time_render(page, context)[0]:.2f}ms')
+        for _ in range(options['warmup']):
+            page.render(context)
+
+        samples, queries = [], []
+        for _ in range(options['iterations']):
+            elapsed, count = self.time_render(page, context)
+            samples.append(elapsed)
+            queries.append(count)
+        mean = statistics.fmean(samples)
+        self.stdout.write(
+            f"{options['layout']}: {cards} cards  mean {mean:.2f}ms/page  "
+            f"{mean * 1000 / cards:.0f}us/card  p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:.2f}ms  "
+            f"queries {statistics.fmean(queries) / cards:.2f}/card"
+        )
+
+    def time_render(self, template, context):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            template.render(context)
+            elapsed = time.perf_counter() - start
+        return elapsed * 1000, len(captured)
+
+    def report_compile(self, engine):
+        """How long the card template takes to parse, against a cached loader lookup"""
+        template = engine.get_template('includes/video_card.html')
+        source = template.template.source
+        start = time.perf_counter()
+        engine.from_string(source)
+        parse = time.perf_counter() - start
+        start = time.perf_counter()
+        engine.get_template('includes/video_card.html')
+        lookup = time.perf_counter() - start
+        self.stdout.write(f'video_card.html: parse {parse * 1000:.2f}ms, get_template {lookup * 1000:.3f}ms')
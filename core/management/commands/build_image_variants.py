@@ -0,0 +1,37 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.images import needs_variants, refresh_variants, variants_field
+
+
+class Command(BaseCommand):
+    help = 'Builds missing WebP/JPEG size variants for avatars and thumbnails (after imports or restarts)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Stop after building this many images')
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        for model in apps.get_models():
+            for field_name in getattr(model, 'IMAGE_VARIANTS', {}):
+                rows = (
+                    model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                    .only('pk', field_name, variants_field(field_name))
+                    .iterator(chunk_size=500)
+                )
+                for row in rows:
+                    if options['limit'] is not None and built >= options['limit']:
+                        break
+                    if not needs_variants(row, field_name):
+                        continue
+                    try:
+                        if refresh_variants(model, row.pk, field_name):
+                            built += 1
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(f'{model.__name__} {row.pk} {field_name}: {e}')
+                    self.stdout.write(f'\rbuilt: {built}', ending='')
+                    self.stdout.flush()
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'Built variants for {built} images ({failed} failed)'))
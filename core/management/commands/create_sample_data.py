@@ -1,120 +1,181 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from videos.models import Video, Tag
+from django.contrib.auth.hashers import make_password
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from core.bulk import batches, bulk_insert
+from videos.models import Video, azure_storage
+from videos.tagging import recount_tag_video_counts, resolve_tags
+from interactions.analytics import roll_up
 from interactions.models import Like, Comment, View
+from interactions.reactions import recount_reaction_counts
+from users.follows import recount_follow_counts
+from users.stats import recount_creator_stats
+from users.models import Follow
 import random
+import uuid
 from faker import Faker
 import os
-from django.core.files import File
 
 User = get_user_model()
 fake = Faker()
 
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..')
+TAG_NAMES = ['funny', 'music', 'dance', 'tutorial', 'gaming', 'food', 'travel', 'fitness', 'art', 'fashion']
+
 class Command(BaseCommand):
     help = 'Creates sample data for testing and development'
-    
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Number of users (half are creators)')
+        parser.add_argument('--videos', type=int, default=20, help='Number of videos')
+        parser.add_argument('--seed', type=int, help='Seed for reproducible data')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT/transaction')
+        parser.add_argument('--max-views', type=int, default=100, help='Maximum views per video')
+        parser.add_argument('--max-likes', type=int, default=50, help='Maximum likes per video')
+
     def handle(self, *args, **options):
         self.stdout.write('Creating sample data...')
-        
-        # Create sample users
+        self.rng = random.Random(options['seed'])
+        if options['seed'] is not None:
+            Faker.seed(options['seed'])
+        self.batch_size = options['batch_size']
+
+        users = self.create_users(options['users'])
+        self.create_follows(users)
+        tags = resolve_tags(TAG_NAMES)
+        self.stdout.write(f'Tags ready: {", ".join(tag.name for tag in tags)}')
+        videos = self.create_videos(users, tags, options['videos'])
+        self.create_interactions(users, videos, options['max_views'], options['max_likes'])
+
+        # bulk_create skips the signals that keep these counters current
+        recount_tag_video_counts()
+        recount_follow_counts()
+        recount_reaction_counts()
+        recount_creator_stats()
+        roll_up(Video.objects.order_by('created_at').values_list('created_at', flat=True).first())
+
+        self.stdout.write(self.style.SUCCESS('Successfully created sample data!'))
+
+    def upload_placeholder(self, storage, relative_path, name):
+        """Upload a placeholder file once and return its storage name for every row to share"""
+        path = os.path.join(SAMPLE_DIR, *relative_path)
+        if not os.path.exists(path):
+            return ''
+        with open(path, 'rb') as f:
+            return storage.save(name, File(f))
+
+    def create_users(self, count):
+        # Hash once; every sample user shares the same password
+        password = make_password('testpass123')
+        profile_pic = self.upload_placeholder(
+            default_storage, ('static', 'images', 'profile_pic.png'), 'profile_pics/sample/profile_pic.png'
+        ) or 'profile_pics/default.png'
+
         users = []
-        for i in range(10):
-            user_type = 'creator' if i < 5 else 'consumer'
-            user = User.objects.create_user(
-                username=fake.user_name() + str(i),
-                email=fake.email(),
-                password='testpass123',
-                user_type=user_type,
-                first_name=fake.first_name(),
-                last_name=fake.last_name(),
-                bio=fake.text(),
-                website=fake.url()
-            )
-            
-            # Add a profile picture (using a placeholder)
-            profile_pic_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'static', 'images', 'profile_pic.png')
-            if os.path.exists(profile_pic_path):
-                with open(profile_pic_path, 'rb') as f:
-                    user.profile_pic.save(f'profile_{user.username}.png', File(f))
-            
-            users.append(user)
-            self.stdout.write(f'Created user: {user.username}')
-        
-        # Create some followers
-        for user in users:
-            if user.user_type == 'creator':
-                for follower in random.sample(users, random.randint(1, 5)):
-                    if follower != user:
-                        user.followers.add(follower)
-        
-        # Create some tags
-        tags = []
-        for tag_name in ['funny', 'music', 'dance', 'tutorial', 'gaming', 'food', 'travel', 'fitness', 'art', 'fashion']:
-            tag, created = Tag.objects.get_or_create(name=tag_name)
-            tags.append(tag)
-            self.stdout.write(f'Created tag: {tag.name}')
-        
+        for batch in batches(range(count), self.batch_size):
+            rows = [
+                User(
+                    username=fake.user_name() + str(i),
+                    email=fake.email(),
+                    password=password,
+                    user_type='creator' if i < count / 2 else 'consumer',
+                    first_name=fake.first_name(),
+                    last_name=fake.last_name(),
+                    bio=fake.text(),
+                    website=fake.url(),
+                    profile_pic=profile_pic,
+                )
+                for i in batch
+            ]
+            with transaction.atomic():
+                users.extend(User.objects.bulk_create(rows))
+            self.stdout.write(f'Created users: {len(users)}/{count}')
+        return users
+
+    def create_follows(self, users):
+        # Follow rows go straight into the through table
+        def rows():
+            for user in users:
+                if user.user_type == 'creator':
+                    for follower in self.rng.sample(users, self.rng.randint(1, min(5, len(users)))):
+                        if follower != user:
+                            yield Follow(follower=follower, followee=user)
+
+        sent = bulk_insert(Follow, rows(), self.batch_size, ignore_conflicts=True)
+        self.stdout.write(f'Created follows: {sent}')
+
+    def create_videos(self, users, tags, count):
         # Create sample videos (only by creators)
-        creators = [user for user in users if user.user_type == 'creator']
+        creators = [user for user in users if user.user_type == 'creator'] or users
         video_files = ['sample1.mp4', 'sample2.mp4', 'sample3.mp4']  # These should be in your media/videos folder
-        
-        for i in range(20):
-            creator = random.choice(creators)
-            video = Video.objects.create(
-                user=creator,
-                title=fake.sentence(),
-                description=fake.text(),
-                visibility=random.choice(['public', 'public', 'public', 'followers', 'private'])
-            )
-            
-            # Add a video file (using a placeholder)
-            video_file_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'media', 'videos', random.choice(video_files))
-            if os.path.exists(video_file_path):
-                with open(video_file_path, 'rb') as f:
-                    video.video_file.save(f'video_{video.id}.mp4', File(f))
-            
-            # Add a thumbnail (using a placeholder)
-            thumbnail_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'static', 'images', 'thumbnail.png')
-            if os.path.exists(thumbnail_path):
-                with open(thumbnail_path, 'rb') as f:
-                    video.thumbnail.save(f'thumbnail_{video.id}.png', File(f))
-            
-            # Add some tags
-            video.tags.set(random.sample(tags, random.randint(1, 3)))
-            
-            self.stdout.write(f'Created video: {video.title}')
-        
-        # Create likes, comments, and views
-        videos = Video.objects.all()
-        for video in videos:
-            # Views
-            for i in range(random.randint(0, 100)):
-                viewer = random.choice(users) if random.random() > 0.3 else None
-                View.objects.create(video=video, user=viewer)
-            
-            # Likes
-            likers = random.sample(users, random.randint(0, len(users)))
-            for liker in likers:
-                Like.objects.create(user=liker, video=video, is_like=True)
-            
-            # Comments
-            for i in range(random.randint(0, 10)):
-                commenter = random.choice(users)
-                comment = Comment.objects.create(
-                    user=commenter,
-                    video=video,
-                    text=fake.sentence()
+        uploaded = {
+            name: self.upload_placeholder(azure_storage, ('media', 'videos', name), f'videos/sample/{name}')
+            for name in video_files
+        }
+        thumbnail = self.upload_placeholder(
+            azure_storage, ('static', 'images', 'thumbnail.png'), 'thumbnails/sample/thumbnail.png'
+        ) or None
+
+        videos = []
+        through = Video.tags.through
+        for batch in batches(range(count), self.batch_size):
+            rows = [
+                Video(
+                    id=uuid.UUID(int=self.rng.getrandbits(128), version=4),
+                    user=self.rng.choice(creators),
+                    title=fake.sentence()[:100],
+                    description=fake.text(),
+                    visibility=self.rng.choice(['public', 'public', 'public', 'followers', 'private']),
+                    video_file=uploaded[self.rng.choice(video_files)],
+                    thumbnail=thumbnail,
                 )
-                
+                for _ in batch
+            ]
+            video_tags = [
+                through(video_id=video.id, tag_id=tag.id)
+                for video in rows
+                for tag in self.rng.sample(tags, self.rng.randint(1, 3))
+            ]
+            with transaction.atomic():
+                videos.extend(Video.objects.bulk_create(rows))
+                through.objects.bulk_create(video_tags)
+            self.stdout.write(f'Created videos: {len(videos)}/{count}')
+        return videos
+
+    def create_interactions(self, users, videos, max_views, max_likes):
+        # Create likes, comments, and views
+        def views():
+            for video in videos:
+                for _ in range(self.rng.randint(0, max_views)):
+                    viewer = self.rng.choice(users) if self.rng.random() > 0.3 else None
+                    yield View(video=video, user=viewer)
+
+        def likes():
+            for video in videos:
+                for liker in self.rng.sample(users, self.rng.randint(0, min(max_likes, len(users)))):
+                    yield Like(user=liker, video=video, is_like=True)
+
+        def comments():
+            for video in videos:
+                for _ in range(self.rng.randint(0, 10)):
+                    yield Comment(user=self.rng.choice(users), video=video, text=fake.sentence())
+
+        self.stdout.write(f'Created views: {bulk_insert(View, views(), self.batch_size)}')
+        self.stdout.write(f'Created likes: {bulk_insert(Like, likes(), self.batch_size, ignore_conflicts=True)}')
+
+        # Top-level comments need primary keys before replies can point at them
+        created = 0
+        for batch in batches(comments(), self.batch_size):
+            with transaction.atomic():
+                parents = Comment.objects.bulk_create(batch)
                 # Some replies to comments
-                if random.random() > 0.7:
-                    for j in range(random.randint(0, 3)):
-                        replier = random.choice(users)
-                        Comment.objects.create(
-                            user=replier,
-                            video=video,
-                            text=fake.sentence(),
-                            parent=comment
-                        )
-        
-        self.stdout.write(self.style.SUCCESS('Successfully created sample data!'))
+                replies = [
+                    Comment(user=self.rng.choice(users), video=parent.video, text=fake.sentence(), parent=parent)
+                    for parent in parents if self.rng.random() > 0.7
+                    for _ in range(self.rng.randint(0, 3))
+                ]
+                Comment.objects.bulk_create(replies)
+            created += len(parents) + len(replies)
+        self.stdout.write(f'Created comments: {created}')
@@ -0,0 +1,92 @@
+import re
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from interactions.models import Comment, Like, View
+from users.models import Follow
+from videos.models import Tag, Video
+from videos.tagging import popular_tags
+from videos.visibility import visible_to
+
+User = get_user_model()
+
+# SQLite reports "SCAN table" for a full scan and "SCAN table USING INDEX ..."
+# when an index drives the scan.
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)')
+POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the main queryset of each hot view and flags full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help='Explain the feeds as this user instead of an anonymous visitor',
+        )
+        parser.add_argument(
+            '--strict',
+            action='store_true',
+            help='Fail if any query needs a full table scan. On PostgreSQL sequential '
+                 'scans are disabled first, so tiny dev tables do not hide missing indexes.',
+        )
+
+    def handle(self, *args, **options):
+        viewer = AnonymousUser()
+        if options['username']:
+            try:
+                viewer = User.objects.get(username=options['username'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['username']}' does not exist")
+
+        offenders = []
+        with transaction.atomic():
+            if options['strict'] and connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in self.hot_queries(viewer):
+                plan = queryset.explain()
+                scans = self.full_scans(plan)
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(plan)
+                if scans:
+                    offenders.append((name, scans))
+                    self.stdout.write(self.style.WARNING(f'  full scan on: {", ".join(sorted(scans))}'))
+                self.stdout.write('')
+
+        if not offenders:
+            self.stdout.write(self.style.SUCCESS('All hot queries are index-backed.'))
+        elif options['strict']:
+            summary = '; '.join(f'{name} ({", ".join(sorted(scans))})' for name, scans in offenders)
+            raise CommandError(f'Full table scans found: {summary}')
+
+    def hot_queries(self, viewer):
+        """The main queryset behind each hot view, built the same way the views build them"""
+        video = Video.objects.only('id', 'user_id').first()
+        video_id = video.pk if video else uuid.uuid4()
+        creator_id = video.user_id if video else 0
+        tag = Tag.objects.first() or Tag(pk=0)
+        viewer_id = viewer.pk if viewer.is_authenticated else 0
+
+        visible = Video.objects.filter(visible_to(viewer))
+        return [
+            ('home', visible.order_by('-created_at')[:10]),
+            ('search (newest)', visible.select_related('user').order_by('-created_at')[:12]),
+            ('videos_by_tag', tag.videos.filter(visible_to(viewer)).select_related('user').order_by('-created_at')[:12]),
+            ('tag_directory', popular_tags()[:48]),
+            ('profile', visible.filter(user_id=creator_id).order_by('-created_at')),
+            ('watch: comments', Comment.objects.filter(video_id=video_id, parent=None).order_by('-created_at')),
+            ('watch: own reaction', Like.objects.filter(user_id=viewer_id, video_id=video_id)),
+            ('watch: view count', View.objects.filter(video_id=video_id).values('id')),
+            ('watch: view dedupe', View.objects.filter(user_id=viewer_id, video_id=video_id)),
+            ('follow check', Follow.objects.filter(follower_id=viewer_id, followee_id=creator_id)),
+        ]
+
+    def full_scans(self, plan):
+        pattern = POSTGRES_SEQ_SCAN if connection.vendor == 'postgresql' else SQLITE_FULL_SCAN
+        return set(pattern.findall(plan))
@@ -0,0 +1,44 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from interactions.exports import EXPORTS, FORMATS, day_start, export_chunks, export_filename
+
+
+class Command(BaseCommand):
+    help = "Streams one of a creator's analytics or interaction tables to a CSV or JSON lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output')
+        parser.add_argument('--since', help='First day to include (YYYY-MM-DD, UTC)')
+        parser.add_argument('--until', help='Day to stop before (YYYY-MM-DD, UTC)')
+        parser.add_argument('--output', help='File to write, "-" for stdout (default: <username>-<kind>.<format>)')
+
+    def handle(self, *args, **options):
+        try:
+            creator = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}")
+        since, until = day_start(options['since']), day_start(options['until'])
+        if options['since'] and since is None or options['until'] and until is None:
+            raise CommandError('--since and --until must be dates like 2026-01-31')
+
+        export = EXPORTS[options['kind']]
+        chunks = export_chunks(export, export.rows(creator, since, until), options['format'], options['gzip'])
+        output = options['output'] or export_filename(creator, options['kind'], options['format'], options['gzip'])
+
+        written = 0
+        target = sys.stdout.buffer if output == '-' else open(output, 'wb')
+        try:
+            for chunk in chunks:
+                target.write(chunk)
+                written += len(chunk)
+        finally:
+            if target is not sys.stdout.buffer:
+                target.close()
+        if output != '-':
+            self.stdout.write(self.style.SUCCESS(f'Wrote {written} bytes to {output}'))
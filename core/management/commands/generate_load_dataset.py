@@ -0,0 +1,244 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.bulk import batches, bulk_insert
+from interactions.analytics import roll_up
+from interactions.models import Comment, Like, View
+from interactions.reactions import recount_reaction_counts
+from users.follows import recount_follow_counts
+from users.stats import recount_creator_stats
+from users.models import Follow
+from videos.models import Tag, Video
+from videos.tagging import recount_tag_video_counts
+
+User = get_user_model()
+
+LOAD_PASSWORD = 'loadtest-password'
+WORDS = (
+    'funny music dance tutorial gaming food travel fitness art fashion cats dogs '
+    'cooking comedy science tech diy beauty sports news vlog review unboxing prank '
+    'challenge asmr nature cars anime movies books coding guitar piano yoga'
+).split()
+
+
+class ZipfSampler:
+    """Draws indexes in [0, n) where index k has weight 1 / (k + 1) ** s"""
+
+    def __init__(self, n, s, rng):
+        self.population = range(n)
+        self.cum_weights = list(accumulate(1.0 / (k + 1) ** s for k in range(n)))
+        self.rng = rng
+
+    def sample(self, k=1):
+        return self.rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Let bulk_create keep the timestamps we generate instead of stamping now()"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Bulk-creates a large synthetic dataset with Zipf-distributed popularity for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--videos', type=int, default=50000)
+        parser.add_argument('--tags', type=int, default=500)
+        parser.add_argument('--follows', type=int, default=20, help='Average follows per user')
+        parser.add_argument('--likes', type=int, default=200000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--views', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent for popularity skew')
+        parser.add_argument('--days', type=int, default=365, help='Spread content over this many days')
+        parser.add_argument('--prefix', default='load_', help='Username prefix for generated users')
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['videos'] < 1:
+            raise CommandError('Need at least 2 users and 1 video')
+        if User.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(
+                f"Users with prefix '{options['prefix']}' already exist; pick another --prefix or flush the database"
+            )
+
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.span = timedelta(days=options['days']).total_seconds()
+
+        started = time.perf_counter()
+        with manual_timestamps(User, Video, Follow, Like, Comment, View):
+            user_ids = self.create_users()
+            tag_ids = self.create_tags()
+            videos = self.create_videos(user_ids)
+            self.create_video_tags(videos, tag_ids)
+            self.create_follows(user_ids)
+            self.create_likes(user_ids, videos)
+            self.create_comments(user_ids, videos)
+            self.create_views(user_ids, videos)
+
+        self.stdout.write('Recomputing counters...')
+        recount_tag_video_counts()
+        recount_follow_counts()
+        recount_reaction_counts()
+        recount_creator_stats()
+        self.stdout.write('Rolling up analytics...')
+        roll_up(self.now - timedelta(seconds=self.span))
+        self.stdout.write(self.style.SUCCESS(
+            f'Load dataset created in {time.perf_counter() - started:.1f}s '
+            f'(log in as any {options["prefix"]}N user with password "{LOAD_PASSWORD}")'
+        ))
+
+    def random_time(self, after=None):
+        start = after or self.now - timedelta(seconds=self.span)
+        return start + (self.now - start) * self.rng.random()
+
+    def insert(self, model, rows, total, label, ignore_conflicts=False):
+        def progress(done):
+            self.stdout.write(f'\r{label}: {done}/{total}', ending='')
+            self.stdout.flush()
+
+        bulk_insert(model, rows, self.batch_size, ignore_conflicts=ignore_conflicts, on_batch=progress)
+        self.stdout.write('')
+
+    def create_users(self):
+        count = self.options['users']
+        prefix = self.options['prefix']
+        # Hashing once keeps generation fast; every load user shares the password
+        password = make_password(LOAD_PASSWORD)
+        user_ids = []
+        for batch in batches(range(count), self.batch_size):
+            users = []
+            for i in batch:
+                joined = self.random_time()
+                users.append(User(
+                    username=f'{prefix}{i}',
+                    email=f'{prefix}{i}@example.com',
+                    password=password,
+                    user_type=User.UserType.CREATOR if i % 5 == 0 else User.UserType.CONSUMER,
+                    date_joined=joined,
+                    created_at=joined,
+                    updated_at=joined,
+                ))
+            with transaction.atomic():
+                user_ids.extend(user.pk for user in User.objects.bulk_create(users))
+            self.stdout.write(f'\rusers: {len(user_ids)}/{count}', ending='')
+        self.stdout.write('')
+        return user_ids
+
+    def create_tags(self):
+        count = self.options['tags']
+        names = [
+            WORDS[i % len(WORDS)] if i < len(WORDS) else f'{WORDS[i % len(WORDS)]}{i}'
+            for i in range(count)
+        ]
+        existing = set(Tag.objects.filter(name__in=names).values_list('name', flat=True))
+        self.insert(
+            Tag, (Tag(name=name, slug=name) for name in names if name not in existing),
+            count - len(existing), 'tags', ignore_conflicts=True,
+        )
+        return list(Tag.objects.filter(name__in=names).values_list('pk', flat=True))
+
+    def create_videos(self, user_ids):
+        count = self.options['videos']
+        creators = ZipfSampler(len(user_ids), self.options['zipf'], self.rng)
+        videos = []
+
+        def rows():
+            for creator in creators.sample(count):
+                created = self.random_time()
+                video = Video(
+                    id=uuid.UUID(int=self.rng.getrandbits(128), version=4),
+                    user_id=user_ids[creator],
+                    video_file='videos/load/sample.mp4',
+                    thumbnail='thumbnails/load/sample.jpg',
+                    title=' '.join(self.rng.sample(WORDS, 4)).title(),
+                    description=' '.join(self.rng.choices(WORDS, k=20)),
+                    visibility=self.rng.choices(['public', 'followers', 'private'], weights=[85, 10, 5])[0],
+                    created_at=created,
+                    updated_at=created,
+                )
+                videos.append((video.pk, created))
+                yield video
+
+        self.insert(Video, rows(), count, 'videos')
+        return videos
+
+    def create_video_tags(self, videos, tag_ids):
+        through = Video.tags.through
+        tags = ZipfSampler(len(tag_ids), self.options['zipf'], self.rng)
+
+        def rows():
+            for video_id, _ in videos:
+                for index in set(tags.sample(self.rng.randint(1, 3))):
+                    yield through(video_id=video_id, tag_id=tag_ids[index])
+
+        self.insert(through, rows(), f'~{len(videos) * 2}', 'video tags', ignore_conflicts=True)
+
+    def create_follows(self, user_ids):
+        followees = ZipfSampler(len(user_ids), self.options['zipf'], self.rng)
+        per_user = self.options['follows']
+
+        def rows():
+            for follower_id in user_ids:
+                targets = {user_ids[i] for i in followees.sample(self.rng.randint(0, per_user * 2))}
+                targets.discard(follower_id)
+                for followee_id in targets:
+                    yield Follow(follower_id=follower_id, followee_id=followee_id, created_at=self.random_time())
+
+        self.insert(Follow, rows(), f'~{len(user_ids) * per_user}', 'follows', ignore_conflicts=True)
+
+    def interaction_rows(self, count, user_ids, videos, build):
+        popular = ZipfSampler(len(videos), self.options['zipf'], self.rng)
+        for index in popular.sample(count):
+            video_id, published = videos[index]
+            user_id = user_ids[self.rng.randrange(len(user_ids))]
+            yield build(video_id, user_id, self.random_time(after=published))
+
+    def create_likes(self, user_ids, videos):
+        count = self.options['likes']
+        rows = self.interaction_rows(count, user_ids, videos, lambda video_id, user_id, at: Like(
+            video_id=video_id, user_id=user_id, is_like=self.rng.random() < 0.9, created_at=at,
+        ))
+        # Popular videos draw repeat (user, video) pairs; the unique constraint drops them
+        self.insert(Like, rows, count, 'likes', ignore_conflicts=True)
+
+    def create_comments(self, user_ids, videos):
+        count = self.options['comments']
+        rows = self.interaction_rows(count, user_ids, videos, lambda video_id, user_id, at: Comment(
+            video_id=video_id, user_id=user_id, text=' '.join(self.rng.choices(WORDS, k=8)),
+            created_at=at, updated_at=at,
+        ))
+        self.insert(Comment, rows, count, 'comments')
+
+    def create_views(self, user_ids, videos):
+        count = self.options['views']
+        rows = self.interaction_rows(count, user_ids, videos, lambda video_id, user_id, at: View(
+            video_id=video_id, user_id=user_id if self.rng.random() < 0.7 else None, created_at=at,
+        ))
+        self.insert(View, rows, count, 'views')
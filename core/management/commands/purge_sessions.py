@@ -0,0 +1,44 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired database sessions in small batches (schedule it, e.g. hourly from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per DELETE')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            self.stdout.write(f'{settings.SESSION_ENGINE} keeps no session rows; its cache expires them itself')
+            return
+
+        # Short DELETEs keyed on primary keys keep row locks brief, unlike
+        # clearsessions' single statement over the whole expired range.
+        model = store.get_model_class()
+        now = timezone.now()
+        deleted = batches = 0
+        while options['max_batches'] is None or batches < options['max_batches']:
+            keys = list(
+                model.objects.filter(expire_date__lt=now)
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not keys:
+                break
+            count, _ = model.objects.filter(pk__in=keys).delete()
+            deleted += count
+            batches += 1
+            self.stdout.write(f'\rpurged: {deleted}', ending='')
+            self.stdout.flush()
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired sessions in {batches} batches'))
@@ -0,0 +1,43 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from users.deletion import reap_account
+from users.models import CustomUser
+from videos.deletion import REAP_BATCH_SIZE, reap_video
+from videos.models import Video
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Deletes retired videos and accounts in small batches (schedule it, e.g. every few minutes from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REAP_BATCH_SIZE, help='Rows per DELETE')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Seconds to pause between batches')
+        parser.add_argument('--limit', type=int, help='Stop after this many videos and accounts')
+
+    def handle(self, *args, **options):
+        batch_size, pause, limit = options['batch_size'], options['sleep'], options['limit']
+        reaped = failed = 0
+        # Oldest first; a video or account that fails (say, storage is down)
+        # is logged and left retired for the next run
+        for model, reap in ((Video.all_objects, reap_video), (CustomUser.objects, reap_account)):
+            for pk in model.filter(deleted_at__isnull=False).order_by('deleted_at').values_list('pk', flat=True):
+                if limit is not None and reaped + failed >= limit:
+                    break
+                instance = model.filter(pk=pk).first()
+                if instance is None:
+                    continue  # reaped meanwhile, e.g. along with its account
+                try:
+                    reap(instance, batch_size, pause)
+                except Exception:
+                    logger.exception('Reaping %s %s failed', model.model._meta.label, pk)
+                    failed += 1
+                else:
+                    reaped += 1
+                    self.stdout.write(f'reaped {model.model._meta.verbose_name} {pk}')
+
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(f'Reaped {reaped} retired videos and accounts, {failed} failed'))
@@ -0,0 +1,28 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from interactions.analytics import roll_up
+
+
+class Command(BaseCommand):
+    help = 'Rolls views, likes, comments and follows up into the analytics tables (schedule it hourly from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, help='Recount this many hours back instead of the default late-arrival window')
+        parser.add_argument('--since', help='Backfill from this date (YYYY-MM-DD, UTC)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                day = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since must be a date like 2026-01-31')
+            since = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+        elif options['hours']:
+            since = timezone.now() - timedelta(hours=options['hours'])
+
+        hours, days = roll_up(since)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {hours} hourly and {days} daily video buckets'))
@@ -0,0 +1,204 @@
+import contextvars
+import functools
+import threading
+import time
+from collections import defaultdict
+
+from django.template.backends.django import DjangoTemplates
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+STORAGE_METHODS = ('save', 'open', 'delete', 'exists', 'size', 'url')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a view issues more queries than its configured budget"""
+
+
+class RequestMetrics:
+    """Counters collected while a single request is being served"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.storage_calls = 0
+        self.storage_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def cache_hit_ratio(self):
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
+    def server_timing(self):
+        """Render the counters as a Server-Timing header value"""
+        entries = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'storage;dur={self.storage_time * 1000:.1f};desc="{self.storage_calls} calls"',
+        ]
+        if self.cache_hit_ratio is not None:
+            entries.append(f'cache;desc="hit ratio {self.cache_hit_ratio:.2f}"')
+        entries.append(f'total;dur={self.total_time * 1000:.1f}')
+        return ', '.join(entries)
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current():
+    """Metrics for the request being served, or None outside a request"""
+    return _current.get()
+
+
+def record_cache(hit):
+    """Count a lookup in an application-level cache towards the request's hit ratio"""
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+class QueryTimer:
+    """connection.execute_wrapper hook that counts and times every query of the current request.
+
+    It is installed once on every connection as it opens (see
+    time_queries) and finds the request through the context variable, so
+    queries count whichever thread runs them: under ASGI, sync views and
+    sync_to_async calls use worker threads with their own connections,
+    but copies of the request's context.
+    """
+
+    def __call__(self, execute, sql, params, many, context):
+        metrics = _current.get()
+        if metrics is None:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.db_queries += 1
+            metrics.db_time += time.perf_counter() - start
+
+
+def time_queries(sender, connection, **kwargs):
+    """connection_created receiver adding the QueryTimer to each new connection"""
+    if not any(isinstance(wrapper, QueryTimer) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(QueryTimer())
+
+
+def track_storage(storage):
+    """Wrap a storage instance's I/O methods so calls count towards the current request"""
+    if getattr(storage, '_metrics_tracked', False):
+        return storage
+    for name in STORAGE_METHODS:
+        method = getattr(storage, name, None)
+        if method is not None:
+            setattr(storage, name, _timed_storage_call(method))
+    storage._metrics_tracked = True
+    return storage
+
+
+def _timed_storage_call(method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return method(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            metrics.storage_calls += 1
+            metrics.storage_time += time.perf_counter() - start
+    return wrapper
+
+
+class TimedTemplate:
+    """Wraps a backend template so rendering time is attributed to the current request"""
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return self._template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose top-level renders are timed per request"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class MetricsRegistry:
+    """Process-wide totals per view, exposed in Prometheus text format"""
+
+    COUNTERS = (
+        ('requests_total', 'Requests served', None),
+        ('db_queries_total', 'Database queries issued', 'db_queries'),
+        ('db_seconds_total', 'Time spent in database queries', 'db_time'),
+        ('template_seconds_total', 'Time spent rendering templates', 'template_time'),
+        ('storage_calls_total', 'Media storage calls', 'storage_calls'),
+        ('storage_seconds_total', 'Time spent in media storage calls', 'storage_time'),
+        ('cache_hits_total', 'Application cache hits', 'cache_hits'),
+        ('cache_misses_total', 'Application cache misses', 'cache_misses'),
+        ('request_seconds_total', 'Total request handling time', 'total_time'),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: defaultdict(float))
+
+    def observe(self, view_name, metrics):
+        with self._lock:
+            totals = self._totals[view_name]
+            for name, _, attr in self.COUNTERS:
+                totals[name] += 1 if attr is None else getattr(metrics, attr)
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+    def render(self):
+        with self._lock:
+            snapshot = {view: dict(totals) for view, totals in self._totals.items()}
+        lines = []
+        for name, description, _ in self.COUNTERS:
+            metric = f'snapora_{name}'
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} counter')
+            for view, totals in sorted(snapshot.items()):
+                lines.append(f'{metric}{{view="{view}"}} {totals.get(name, 0):g}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,62 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics as request_metrics
+from .metrics import QueryBudgetExceeded, registry
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """Collects per-request DB, template, storage and cache timings.
+
+    The numbers go out as a Server-Timing header, are folded into the
+    process-wide registry served at /metrics/, and are checked against
+    settings.QUERY_BUDGETS for the resolved view.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics, token = request_metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics.end_request(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token = request_metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics.end_request(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else 'unresolved'
+        registry.observe(view_name, metrics)
+        response['Server-Timing'] = metrics.server_timing()
+        self.check_query_budget(view_name, metrics)
+        return response
+
+    def check_query_budget(self, view_name, metrics):
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+        if budget is None or metrics.db_queries <= budget:
+            return
+        message = f'{view_name} issued {metrics.db_queries} queries (budget {budget})'
+        if getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
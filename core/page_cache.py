@@ -0,0 +1,142 @@
+import functools
+import hashlib
+import logging
+import uuid
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import (
+    cc_delim_re, get_conditional_response, patch_cache_control, patch_vary_headers, set_response_etag,
+)
+
+from .metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD')
+SURROGATE_HEADER = 'Surrogate-Key'
+# Purge versions only need to outlive the pages that recorded them
+TAG_VERSION_TIMEOUT = 60 * 60 * 24
+
+
+def page_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def _digest(value):
+    return hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()
+
+
+def _tag_version_key(tag):
+    return f'page:tagv:{tag}'
+
+
+def surrogate_keys(response):
+    return response.get(SURROGATE_HEADER, '').split()
+
+
+def add_surrogate_keys(response, *keys):
+    """Label a response with the content it shows so purge() can drop it (and a CDN can, by tag)"""
+    keys = [str(key) for key in keys if key]
+    if keys:
+        response[SURROGATE_HEADER] = ' '.join(dict.fromkeys(surrogate_keys(response) + keys))
+    return response
+
+
+def purge(*tags):
+    """Invalidate every cached page labelled with any of tags.
+
+    Each tag has a version token; a cached page remembers the tokens it was
+    stored under and is ignored once one changes, so a purge is a single
+    cache write however many pages carry the tag.
+    """
+    tags = [str(tag) for tag in tags if tag]
+    if tags:
+        page_cache().set_many(
+            {_tag_version_key(tag): uuid.uuid4().hex for tag in tags}, TAG_VERSION_TIMEOUT,
+        )
+
+
+def purge_on_commit(*tags):
+    """purge() once the current transaction commits, so a page rendered meanwhile cannot outlive it"""
+    transaction.on_commit(lambda: purge(*tags))
+
+
+def bypasses_cache(request):
+    """Requests whose page may depend on who is asking: signed in, pending messages, or not a read"""
+    if request.method not in SAFE_METHODS or 'Authorization' in request.headers:
+        return True
+    cookies = request.COOKIES
+    return bool(cookies.get(settings.SESSION_COOKIE_NAME) or cookies.get(CookieStorage.cookie_name))
+
+
+def _vary_key(request):
+    return f'page:vary:{_digest(request.build_absolute_uri())}'
+
+
+def _page_key(request, headers):
+    values = [request.build_absolute_uri()] + [request.headers.get(header, '') for header in headers]
+    return f'page:{_digest("|".join(values))}'
+
+
+def _vary_headers(response):
+    # Cookie only matters through the session and messages, which bypass the cache
+    vary = cc_delim_re.split(response.get('Vary', ''))
+    return sorted({header.lower() for header in vary if header and header.lower() != 'cookie'})
+
+
+def anonymous_page_cache(view=None, *, timeout=None):
+    """Serve anonymous GETs of a view from a shared full-page cache.
+
+    The key is the absolute URL plus the request headers the response
+    varies on (learned from the first response, as Django's cache
+    middleware does). Requests carrying a session or messages cookie always
+    reach the view. Cached pages are sent with ETag, Cache-Control
+    s-maxage and Surrogate-Key headers so a CDN can cache and purge them too.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            seconds = timeout if timeout is not None else getattr(settings, 'PAGE_CACHE_TIMEOUT', 60)
+            if bypasses_cache(request) or seconds <= 0:
+                return view(request, *args, **kwargs)
+
+            cache = page_cache()
+            headers = cache.get(_vary_key(request))
+            if headers is not None:
+                entry = cache.get(_page_key(request, headers))
+                if entry is not None:
+                    response, versions = entry
+                    current = cache.get_many([_tag_version_key(tag) for tag in versions])
+                    if all(current.get(_tag_version_key(tag)) == token for tag, token in versions.items()):
+                        record_cache(True)
+                        return get_conditional_response(request, etag=response.get('ETag'), response=response)
+            record_cache(False)
+
+            response = view(request, *args, **kwargs)
+            if (response.status_code != 200 or response.streaming or response.cookies
+                    or request.META.get('CSRF_COOKIE_NEEDS_UPDATE')):
+                # Never share a response that sets a cookie or embeds a CSRF token
+                return response
+            if not response.has_header('ETag'):
+                set_response_etag(response)
+            patch_cache_control(response, public=True, max_age=0, s_maxage=seconds)
+            patch_vary_headers(response, ('Cookie',))
+
+            # A purge landing while the view rendered is missed until the page expires
+            tags = surrogate_keys(response)
+            tokens = cache.get_many([_tag_version_key(tag) for tag in tags])
+            versions = {tag: tokens.get(_tag_version_key(tag)) for tag in tags}
+            headers = _vary_headers(response)
+            cache.set_many({
+                _vary_key(request): headers,
+                _page_key(request, headers): (response, versions),
+            }, seconds)
+            return get_conditional_response(request, etag=response.get('ETag'), response=response)
+        return wrapper
+
+    if view is not None:
+        return decorator(view)
+    return decorator
@@ -0,0 +1,214 @@
+import contextvars
+import functools
+import logging
+import random
+import re
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+_state = contextvars.ContextVar('db_routing', default=None)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'db_pin'
+
+# Streaming replicas report how far replay is behind; an idle replica that
+# has replayed everything it received counts as zero lag.
+POSTGRES_LAG_SQL = (
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+)
+
+# Data-modifying statements and the table they write; a WITH statement that
+# modifies data (interactions.reactions) counts as a write to any table.
+WRITE_SQL = re.compile(r'\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+"?([\w.]+)', re.IGNORECASE)
+CTE_WRITE_SQL = re.compile(r'\s*WITH\b.*\b(?:INSERT|UPDATE|DELETE)\b', re.IGNORECASE | re.DOTALL)
+
+
+class RoutingState:
+    """Per-request routing decisions shared by the router, decorator and middleware"""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.read_alias = None
+        self.wrote = False
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+class ReplicaHealth:
+    """Caches per-process replica lag checks so routing costs no extra query per request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked = {}
+
+    def healthy(self, aliases):
+        interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 5)
+        now = time.monotonic()
+        result = []
+        for alias in aliases:
+            with self._lock:
+                checked_at, ok = self._checked.get(alias, (None, True))
+            if checked_at is None or now - checked_at > interval:
+                ok = self.check(alias)
+                with self._lock:
+                    self._checked[alias] = (now, ok)
+            if ok:
+                result.append(alias)
+        return result
+
+    def check(self, alias):
+        max_lag = getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 2)
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRES_LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        except DatabaseError:
+            logger.warning('Replica %s is unreachable; reading from primary', alias, exc_info=True)
+            return False
+        if lag > max_lag:
+            logger.warning('Replica %s is %.1fs behind; reading from primary', alias, lag)
+            return False
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    """Sends reads to a replica only inside views marked with @replica_reads.
+
+    Everything else, including all writes and any read outside those views,
+    stays on the primary. Once a request writes, its remaining reads go to
+    the primary too, and ReplicaStickinessMiddleware keeps the client there
+    for REPLICA_PIN_SECONDS so it never sees its own write disappear.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.wrote:
+            return None
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        # Django also asks this when a related object is merely assigned, so
+        # whether the request wrote is decided by track_writes instead
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, so objects from any alias may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def sticky_ignored_models():
+    """Models whose writes do not pin the client to the primary (bookkeeping, not user actions)"""
+    return getattr(settings, 'REPLICA_STICKY_IGNORE', ())
+
+
+def track_writes(execute, sql, params, many, context):
+    """execute_wrapper that marks the current request as having written to the primary"""
+    state = _state.get()
+    if state is not None and not state.wrote:
+        match = WRITE_SQL.match(sql)
+        if match:
+            ignored = {apps.get_model(label)._meta.db_table for label in sticky_ignored_models()}
+            state.wrote = match.group(1) not in ignored
+        elif CTE_WRITE_SQL.match(sql):
+            state.wrote = True
+    return execute(sql, params, many, context)
+
+
+def watch_writes(sender, connection, **kwargs):
+    """connection_created receiver adding track_writes to each new connection"""
+    if track_writes not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_writes)
+
+
+def replica_reads(view):
+    """Serve a read-only view's queries (and its template rendering) from a healthy replica"""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = _state.get()
+        token = None
+        if state is None:
+            state = RoutingState()
+            token = _state.set(state)
+        try:
+            if request.method in SAFE_METHODS and not state.pinned:
+                replicas = replica_health.healthy(replica_aliases())
+                if replicas:
+                    state.read_alias = random.choice(replicas)
+            return view(request, *args, **kwargs)
+        finally:
+            state.read_alias = None
+            if token is not None:
+                _state.reset(token)
+    return wrapper
+
+
+class ReplicaStickinessMiddleware:
+    """Pins a client to the primary for a few seconds after any request that wrote"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = self.routing_state(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        state = self.routing_state(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    def routing_state(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        return RoutingState(pinned=pinned_until > time.time())
+
+    def pin(self, request, response, state):
+        if state.wrote and replica_aliases():
+            seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + seconds), max_age=seconds,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
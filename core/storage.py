@@ -0,0 +1,18 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """WhiteNoise's hashed, compressed storage that tolerates references to missing files.
+
+    With WHITENOISE_MANIFEST_STRICT off, {% static %} for a file that was
+    never collected returns its plain URL (a 404 for that one asset)
+    instead of raising and failing the whole page.
+    """
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if self.manifest_strict or content is not None:
+                raise
+            return name
@@ -0,0 +1,24 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+
+async def _pull(chunks):
+    # One thread hop per chunk, on the request's thread-sensitive executor so
+    # a server-side cursor stays on the connection that opened it
+    iterator = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(iterator, None)) is not None:
+        yield chunk
+
+
+def streaming_response(chunks, **kwargs):
+    """StreamingHttpResponse over a sync chunk iterator that stays incremental under ASGI.
+
+    Handed a plain iterator, Django's ASGI handler reads it to the end
+    before sending anything, which defeats streaming; under ASGI chunks
+    are pulled one at a time from a worker thread instead.
+    """
+    if settings.SERVER_MODE == 'asgi':
+        chunks = _pull(chunks)
+    return StreamingHttpResponse(chunks, **kwargs)
@@ -0,0 +1,37 @@
+import logging
+import os
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+def site_template_names(engine):
+    """Every template under an engine's DIRS: the site's own, not those of installed apps"""
+    for directory in engine.dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(('.html', '.txt')):
+                    yield os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+
+
+def warm_templates():
+    """Compile the site's templates into the cached loader before the first request.
+
+    Without this each worker parses a template on the first request that
+    renders it. Does nothing under DEBUG, where templates are not cached.
+    Returns how many templates were compiled.
+    """
+    if settings.DEBUG:
+        return 0
+    compiled = 0
+    for engine in engines.all():
+        for name in site_template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                logger.exception('Could not precompile template %s', name)
+            else:
+                compiled += 1
+    return compiled
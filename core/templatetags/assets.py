@@ -0,0 +1,38 @@
+import functools
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+
+@functools.cache
+def _cached_static_source(path):
+    return _static_source(path)
+
+
+def _static_source(path):
+    found = finders.find(path)
+    if found is None:
+        raise template.TemplateSyntaxError(f'inline_static: no static file {path!r}')
+    with open(found, encoding='utf-8') as f:
+        return f.read()
+
+
+@register.simple_tag
+def inline_static(path):
+    """Contents of a static file, for the few styles a page needs before its stylesheets load"""
+    # Read once per process, except while developing so edits show up
+    source = _static_source(path) if settings.DEBUG else _cached_static_source(path)
+    return mark_safe(source)
+
+
+@register.inclusion_tag('includes/responsive_image.html')
+def responsive_image(image, sizes, alt='', css_class='', width='', height='', loading='lazy'):
+    """<picture> offering a ResponsiveImage's WebP and JPEG variants (the original until they exist)"""
+    return {
+        'image': image, 'sizes': sizes, 'alt': alt, 'css_class': css_class,
+        'width': width, 'height': height, 'loading': loading,
+    }
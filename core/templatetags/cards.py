@@ -0,0 +1,33 @@
+from django import template
+from django.urls import reverse
+
+register = template.Library()
+
+# grid and featured: home feed; profile: a creator's own grid; tile: search and tag results
+LAYOUTS = ('grid', 'featured', 'profile', 'tile')
+
+
+@register.inclusion_tag('includes/video_card.html')
+def video_card(video, layout='grid'):
+    """One video's card in a listing, in the markup of the given layout.
+
+    URLs and counts are worked out once per card here instead of by
+    repeated {% url %} and .count lookups in the markup. The counts come
+    from attach_card_state (or attach_counts); a video without them raises
+    ValueError rather than costing queries per card.
+    """
+    if layout not in LAYOUTS:
+        raise template.TemplateSyntaxError(f'video_card: unknown layout {layout!r}')
+    needed = ('view_total', 'comment_total') if layout in ('profile', 'tile') else ('view_total',)
+    missing = [name for name in needed if not hasattr(video, name)]
+    if missing:
+        raise ValueError(f"video_card: video {video.pk} has no {', '.join(missing)}; pass it through attach_card_state")
+    return {
+        'video': video,
+        'layout': layout,
+        'watch_url': reverse('videos:watch', args=[video.pk]),
+        # The profile layout sits on the creator's own page
+        'profile_url': '' if layout == 'profile' else reverse('users:profile', args=[video.user.username]),
+        'views': video.view_total,
+        'comments': getattr(video, 'comment_total', None),
+    }
@@ -0,0 +1,22 @@
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def sparkline(values, width=120, height=32, css_class='sparkline'):
+    """Inline SVG line through values, scaled to fit; no chart library or extra request"""
+    values = list(values)
+    if len(values) < 2:
+        values = values * 2 or [0, 0]
+    peak = max(values) or 1
+    step = width / (len(values) - 1)
+    points = ' '.join(
+        f'{i * step:.1f},{height - 1 - value / peak * (height - 2):.1f}' for i, value in enumerate(values)
+    )
+    return format_html(
+        '<svg class="{}" width="{}" height="{}" viewBox="0 0 {} {}" preserveAspectRatio="none" aria-hidden="true">'
+        '<polyline fill="none" stroke="currentColor" stroke-width="1.5" points="{}"/></svg>',
+        css_class, width, height, width, height, points,
+    )
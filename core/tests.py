@@ -1,3 +1,462 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.bulk import delete_in_batches
+from core.keyset import decode_cursor, encode_cursor, keyset_page
+from core.metrics import QueryBudgetExceeded
+from core.page_cache import add_surrogate_keys, anonymous_page_cache, purge
+from core.images import variant_worker
+from core.routers import PIN_COOKIE, ReplicaRouter, ReplicaStickinessMiddleware, replica_health, replica_reads
+from interactions.models import Comment, Like, View
+from interactions.reactions import LIKE, react
+from interactions.viewer_state import attach_card_state
+from users.follows import follow
+from users.models import CustomUser
+from videos.models import Video
+from videos.tagging import set_video_tags
+
+VISIBILITIES = ('public', 'public', 'public', 'followers', 'private')
+
+
+def create_feed(creators=3, videos_per_creator=10, viewers=4):
+    """A small site: creators with tagged videos of every visibility, liked, commented and watched"""
+    creators = [CustomUser.objects.create_user(f'creator{i}', password='pw') for i in range(creators)]
+    viewers = [CustomUser.objects.create_user(f'viewer{i}', password='pw') for i in range(viewers)]
+    videos = []
+    for index in range(videos_per_creator * len(creators)):
+        video = Video.objects.create(
+            user=creators[index % len(creators)],
+            title=f'Video {index}',
+            description='Some dance and music',
+            video_file=f'videos/{index}.mp4',
+            thumbnail=f'thumbnails/{index}.jpg',
+            visibility=VISIBILITIES[index % len(VISIBILITIES)],
+        )
+        set_video_tags(video, 'dance, music' if index % 2 else 'dance, travel')
+        videos.append(video)
+    for viewer_index, viewer in enumerate(viewers):
+        follow(viewer, creators[viewer_index % len(creators)])
+        for video in videos[viewer_index::2]:
+            Like.objects.create(user=viewer, video=video, is_like=bool(viewer_index % 3))
+            View.objects.create(user=viewer, video=video)
+            comment = Comment.objects.create(user=viewer, video=video, text='Nice one')
+            Comment.objects.create(user=video.user, video=video, text='Thanks!', parent=comment)
+    return creators, viewers, videos
+
+
+# Reads stay on the primary: a mirrored replica alias does not see the
+# test's uncommitted fixtures (ReplicaRoutingTests covers routing)
+@override_settings(QUERY_BUDGET_ENFORCE=True, DATABASE_REPLICAS=[])
+class QueryBudgetTests(TestCase):
+    """The main pages stay within settings.QUERY_BUDGETS; exceeding one raises QueryBudgetExceeded"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creators, cls.viewers, cls.videos = create_feed()
+        cls.viewer = cls.viewers[0]
+        cls.video = next(video for video in cls.videos if video.visibility == 'public')
+
+    def setUp(self):
+        # Page cache hits cost no queries and would hide what a render costs
+        for cache in caches.all():
+            cache.clear()
+
+    def pages(self):
+        return [
+            reverse('core:home'),
+            reverse('core:home') + '?page=2',
+            reverse('videos:watch', args=[self.video.pk]),
+            reverse('users:profile', args=[self.creators[0].username]),
+            reverse('videos:search') + '?q=dance',
+            reverse('videos:search') + '?sort=most_views',
+            reverse('videos:tag', args=['dance']),
+            reverse('videos:tags'),
+        ]
+
+    def test_pages_within_budget(self):
+        for logged_in in (False, True):
+            if logged_in:
+                self.client.force_login(self.viewer)
+            for url in self.pages():
+                with self.subTest(url=url, logged_in=logged_in):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIn('queries', response['Server-Timing'])
+
+    async def test_pages_within_budget_async(self):
+        client = AsyncClient()
+        for logged_in in (False, True):
+            if logged_in:
+                await client.aforce_login(self.viewer)
+            for url in self.pages():
+                with self.subTest(url=url, logged_in=logged_in):
+                    response = await client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+    def test_exceeding_budget_raises(self):
+        with override_settings(QUERY_BUDGETS={'core:home': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('core:home'))
+
+    async def test_exceeding_budget_raises_async(self):
+        with override_settings(QUERY_BUDGETS={'core:home': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                await AsyncClient().get(reverse('core:home'))
+
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class CardQueryTests(TestCase):
+    """A listing costs the same queries with one card as with a full page of them"""
+
+    def setUp(self):
+        self.creator = CustomUser.objects.create_user('creator', password='pw')
+        self.fans = [CustomUser.objects.create_user(f'fan{i}', password='pw') for i in range(3)]
+        self.viewer = self.fans[0]
+        follow(self.viewer, self.creator)
+        self.client.force_login(self.viewer)
+        self.upload()
+
+    def upload(self):
+        video = Video.objects.create(user=self.creator, title='Dance', video_file='videos/clip.mp4',
+                                     thumbnail='thumbnails/clip.jpg')
+        set_video_tags(video, 'dance, music')
+        for fan in self.fans:
+            Like.objects.create(user=fan, video=video)
+            View.objects.create(user=fan, video=video)
+            Comment.objects.create(user=fan, video=video, text='Nice')
+
+    def queries(self, url):
+        for cache in caches.all():
+            cache.clear()
+        with CaptureQueriesContext(connections['default']) as captured:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(captured)
+
+    def test_query_count_does_not_grow_with_cards(self):
+        urls = [
+            reverse('core:home'),
+            reverse('users:profile', args=[self.creator.username]),
+            reverse('videos:search') + '?q=dance',
+            reverse('videos:tag', args=['dance']),
+        ]
+        one_card = {url: self.queries(url) for url in urls}
+        for _ in range(15):
+            self.upload()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.queries(url), one_card[url])
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ConditionalGetTests(TestCase):
+    """Pages answer a matching If-None-Match with a cheap 304, and their ETags follow what they show"""
+
+    # Most queries a signed-in 304 may cost, session and user lookups included
+    VALIDATOR_QUERIES = {'home': 4, 'watch': 7, 'profile': 4, 'search': 4, 'tag': 5}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creators, cls.viewers, cls.videos = create_feed()
+        cls.viewer = cls.viewers[-1]
+        cls.creator = cls.creators[-1]
+        cls.video = next(video for video in reversed(cls.videos) if video.visibility == 'public' and video.user == cls.creator)
+
+    def setUp(self):
+        self.client.force_login(self.viewer)
+
+    def urls(self):
+        return {
+            'home': reverse('core:home'),
+            'watch': reverse('videos:watch', args=[self.video.pk]),
+            'profile': reverse('users:profile', args=[self.creator.username]),
+            'search': reverse('videos:search') + '?q=dance',
+            'tag': reverse('videos:tag', args=['dance']),
+        }
+
+    def etags(self):
+        return {name: self.client.get(url)['ETag'] for name, url in self.urls().items()}
+
+    def test_matching_etag_gets_a_cheap_304(self):
+        for name, url in self.urls().items():
+            with self.subTest(page=name):
+                etag = self.client.get(url)['ETag']
+                with CaptureQueriesContext(connections['default']) as queries:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertLessEqual(len(queries), self.VALIDATOR_QUERIES[name])
+
+    def assertChanged(self, before, pages):
+        after = self.etags()
+        for name in pages:
+            with self.subTest(page=name):
+                self.assertNotEqual(before[name], after[name])
+
+    def test_like_changes_etags(self):
+        before = self.etags()
+        react(self.viewer.pk, self.video.pk, LIKE)
+        self.assertChanged(before, ('home', 'watch', 'profile', 'search', 'tag'))
+
+    def test_comment_changes_etags(self):
+        before = self.etags()
+        Comment.objects.create(user=self.viewer, video=self.video, text='Late to this')
+        self.assertChanged(before, ('home', 'watch', 'profile', 'search', 'tag'))
+
+    def test_follow_changes_etags(self):
+        before = self.etags()
+        follow(self.viewer, self.creator)
+        self.assertChanged(before, ('home', 'watch', 'profile', 'search', 'tag'))
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.renders = 0
+
+    def view(self, request):
+        self.renders += 1
+        return add_surrogate_keys(HttpResponse(f'render {self.renders}'), 'video:1', 'feed')
+
+    def get(self, view, cookies=None, **extra):
+        request = RequestFactory().get('/page/', **extra)
+        request.COOKIES.update(cookies or {})
+        return anonymous_page_cache(view)(request)
+
+    def test_anonymous_requests_share_one_render(self):
+        first, second = self.get(self.view), self.get(self.view)
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(second.content, first.content)
+        self.assertIn('s-maxage', second['Cache-Control'])
+        self.assertEqual(second['Surrogate-Key'], 'video:1 feed')
+        self.assertEqual(self.get(self.view, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_signed_in_and_message_requests_bypass(self):
+        for extra in ({'cookies': {settings.SESSION_COOKIE_NAME: 'abc'}}, {'cookies': {'messages': 'x'}},
+                      {'HTTP_AUTHORIZATION': 'Bearer token'}):
+            with self.subTest(extra=extra):
+                before = self.renders
+                self.get(self.view, **extra)
+                self.get(self.view, **extra)
+                self.assertEqual(self.renders, before + 2)
+
+    def test_responses_setting_cookies_are_not_stored(self):
+        def view(request):
+            response = self.view(request)
+            response.set_cookie('greeting', 'hi')
+            return response
+        self.get(view)
+        self.get(view)
+        self.assertEqual(self.renders, 2)
+
+    def test_purge_drops_tagged_pages(self):
+        self.get(self.view)
+        purge('video:2')
+        self.assertEqual(self.get(self.view).content, b'render 1')
+        purge('video:1')
+        self.assertEqual(self.get(self.view).content, b'render 2')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_video_edit_purges_its_watch_page(self):
+        creator = CustomUser.objects.create_user('creator', password='pw')
+        video = Video.objects.create(user=creator, title='Before', video_file='videos/clip.mp4')
+        url = reverse('videos:watch', args=[video.pk])
+        self.assertContains(self.client.get(url), 'Before')
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        video.title = 'After'
+        with self.captureOnCommitCallbacks(execute=True):
+            video.save()
+        self.assertContains(self.client.get(url), 'After')
+
+class VideoCardTests(TestCase):
+    def setUp(self):
+        creator = CustomUser.objects.create_user('creator', password='pw')
+        self.video = Video.objects.create(user=creator, title='Clip', video_file='videos/clip.mp4')
+        View.objects.create(video=self.video)
+
+    def render(self, video, layout):
+        return Template('{% load cards %}{% video_card video layout %}').render(
+            Context({'video': video, 'layout': layout}))
+
+    def test_cards_need_attached_counts(self):
+        for layout in ('grid', 'featured', 'profile', 'tile'):
+            with self.subTest(layout=layout), self.assertRaises(ValueError):
+                self.render(Video.objects.get(), layout)
+
+    def test_attached_counts_cost_no_queries(self):
+        video, = attach_card_state(Video.objects.select_related('user'), AnonymousUser())
+        for layout in ('grid', 'featured', 'profile', 'tile'):
+            with self.subTest(layout=layout), self.assertNumQueries(0):
+                self.assertIn('fa-eye"></i> 1', self.render(video, layout))
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        creator = CustomUser.objects.create_user('creator', password='pw')
+        for index in range(7):
+            Video.objects.create(user=creator, title=f'Video {index}', video_file=f'videos/{index}.mp4')
+        # Bulk uploads share a timestamp; pk breaks the tie
+        self.tied = timezone.now()
+        Video.objects.filter(title__in=['Video 2', 'Video 3', 'Video 4', 'Video 5']).update(created_at=self.tied)
+        self.expected = list(Video.objects.order_by('-created_at', '-pk'))
+
+    def walk(self, per_page):
+        pages, cursor = [], None
+        while True:
+            page = keyset_page(Video.objects.all(), cursor, per_page)
+            pages.append(list(page))
+            if not page.has_next:
+                return pages
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_row_once_across_ties(self):
+        for per_page in (1, 2, 3, 7, 10):
+            with self.subTest(per_page=per_page):
+                pages = self.walk(per_page)
+                self.assertEqual(sum(pages, []), self.expected)
+                self.assertTrue(all(len(page) == per_page for page in pages[:-1]))
+
+    def test_next_cursor(self):
+        first = keyset_page(Video.objects.all(), None, 3)
+        self.assertTrue(first.is_first)
+        self.assertEqual(decode_cursor(first.next_cursor), (self.expected[2].created_at, self.expected[2].pk))
+        last = keyset_page(Video.objects.all(), encode_cursor(self.expected[4].created_at, self.expected[4].pk), 3)
+        self.assertFalse(last.is_first)
+        self.assertEqual(list(last), self.expected[5:])
+        self.assertIsNone(last.next_cursor)
+
+    def test_invalid_cursor_gives_first_page(self):
+        for cursor in ('junk', '12_zz', '1_2_3'):
+            with self.subTest(cursor=cursor):
+                page = keyset_page(Video.objects.all(), cursor, 3)
+                self.assertTrue(page.is_first)
+                self.assertEqual(list(page), self.expected[:3])
+
+class DeleteInBatchesTests(TestCase):
+    def setUp(self):
+        self.creator = CustomUser.objects.create_user('creator', password='pw')
+        self.video = Video.objects.create(user=self.creator, title='Clip', video_file='videos/clip.mp4')
+        for index in range(5):
+            Like.objects.create(user=CustomUser.objects.create_user(f'fan{index}', password='pw'), video=self.video)
+
+    def test_deletes_every_batch(self):
+        batches = []
+        deleted = delete_in_batches(Like.objects.filter(video=self.video), 2, on_batch=batches.append)
+        self.assertEqual(deleted, 5)
+        self.assertEqual([len(keys) for keys in batches], [2, 2, 1])
+        self.assertFalse(Like.objects.exists())
+
+    def test_receivers_run_only_with_signals(self):
+        delete_in_batches(Like.objects.filter(pk=Like.objects.first().pk), 2)
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.like_count, 5)
+        delete_in_batches(Like.objects.all(), 2, signals=True)
+        self.video.refresh_from_db()
+        # The like deleted without receivers was never taken off
+        self.assertEqual(self.video.like_count, 1)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Reads inside @replica_reads go to replica_0 (a mirror of default) until the request writes"""
+
+    databases = {'default', 'replica_0'}
+
+    def setUp(self):
+        replica_health.reset()
+        for cache in caches.all():
+            cache.clear()
+        # Rows commit here, which would queue avatar variant builds
+        patcher = mock.patch.object(variant_worker, 'submit')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.creator = CustomUser.objects.create_user('creator', password='pw')
+        self.video = Video.objects.create(user=self.creator, title='Clip', video_file='videos/clip.mp4')
+
+    def routed(self, method='get', body=None):
+        """Run body inside a @replica_reads view and return the alias a Video read would use"""
+        @replica_reads
+        def view(request):
+            if body is not None:
+                body()
+            return Video.objects.all().db
+        return view(getattr(RequestFactory(), method)('/'))
+
+    def test_reads_outside_replica_views_use_primary(self):
+        self.assertEqual(Video.objects.all().db, 'default')
+
+    def test_replica_views_read_from_replica(self):
+        self.assertEqual(self.routed(), 'replica_0')
+        self.assertEqual(Video.objects.all().db, 'default')
+
+    def test_unsafe_methods_read_from_primary(self):
+        self.assertEqual(self.routed('post'), 'default')
+
+    def test_write_moves_remaining_reads_to_primary(self):
+        self.assertEqual(self.routed(body=lambda: Comment.objects.create(
+            user=self.creator, video=self.video, text='First')), 'default')
+
+    def test_assigning_relations_does_not_pin(self):
+        self.assertEqual(self.routed(body=lambda: Video(user=self.creator)), 'replica_0')
+
+    def test_ignored_models_do_not_pin(self):
+        self.assertEqual(self.routed(body=lambda: View.objects.create(video=self.video)), 'replica_0')
+
+    def test_lagging_replica_is_skipped(self):
+        with mock.patch.object(replica_health, 'check', return_value=False):
+            self.assertEqual(self.routed(), 'default')
+
+    def test_replica_sees_primary_rows(self):
+        self.assertEqual(Video.objects.using('replica_0').get().pk, self.video.pk)
+
+    def test_page_reads_from_replica(self):
+        with CaptureQueriesContext(connections['replica_0']) as replica, \
+                CaptureQueriesContext(connections['default']) as primary:
+            response = self.client.get(reverse('videos:watch', args=[self.video.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any('videos_video' in query['sql'] for query in replica.captured_queries))
+        self.assertFalse(any('videos_video' in query['sql'] for query in primary.captured_queries))
+
+    def test_write_pins_client_to_primary(self):
+        viewer = CustomUser.objects.create_user('viewer', password='pw')
+        self.client.force_login(viewer)
+        response = self.client.post(reverse('interactions:like_video', args=[self.video.pk]))
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        with CaptureQueriesContext(connections['replica_0']) as replica:
+            self.client.get(reverse('videos:watch', args=[self.video.pk]))
+        self.assertEqual(replica.captured_queries, [])
+
+    def test_middleware_pins_only_after_writes(self):
+        def writes(request):
+            Comment.objects.create(user=self.creator, video=self.video, text='Hi')
+            return HttpResponse()
+
+        request = RequestFactory().post('/')
+        self.assertNotIn(PIN_COOKIE, ReplicaStickinessMiddleware(lambda r: HttpResponse())(request).cookies)
+        self.assertIn(PIN_COOKIE, ReplicaStickinessMiddleware(writes)(request).cookies)
+
+    async def test_async_requests_read_from_replica(self):
+        aliases = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            aliases.append(db_for_read(router, model, **hints))
+            return aliases[-1]
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', spy):
+            response = await AsyncClient().get(reverse('videos:watch', args=[self.video.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('replica_0', aliases)
+        self.assertNotIn(None, aliases)
@@ -1,17 +1,52 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import condition
 from videos.models import Video
+from videos.visibility import visible_to
 from interactions.models import View
+from interactions.viewer_state import attach_card_state_to_page
 from django.core.paginator import Paginator
+from .conditional import make_etag, page_versions
+from .metrics import registry
+from .page_cache import add_surrogate_keys, anonymous_page_cache
+from .routers import replica_reads
 
+HOME_PAGE_SIZE = 10
+
+def home_videos(request):
+    return Video.objects.filter(visible_to(request.user)).order_by('-created_at')
+
+def home_etag(request):
+    return make_etag(request, page_versions(
+        home_videos(request), HOME_PAGE_SIZE, request.GET.get('page'), request.user,
+    ))
+
+@anonymous_page_cache
+@replica_reads
+@condition(etag_func=home_etag)
 def home(request):
-    videos = Video.objects.filter(visibility='public').order_by('-created_at')
+    videos = home_videos(request).select_related('user')
     
     # Pagination
-    paginator = Paginator(videos, 10)  # Show 10 videos per page
+    paginator = Paginator(videos, HOME_PAGE_SIZE)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = attach_card_state_to_page(paginator.get_page(page_number), request.user)
     
     context = {
         'page_obj': page_obj,
     }
-    return render(request, 'core/home.html', context)
+    return add_surrogate_keys(render(request, 'core/home.html', context), 'feed')
+
+def metrics(request):
+    """Prometheus text exposition of per-view request metrics"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        allowed = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    else:
+        allowed = request.user.is_staff
+    if not allowed:
+        raise PermissionDenied
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
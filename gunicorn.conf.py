@@ -0,0 +1,23 @@
+# gunicorn -c gunicorn.conf.py
+#
+# SERVER_MODE=wsgi (default) runs config.wsgi on threaded sync workers.
+# SERVER_MODE=asgi runs config.asgi on uvicorn workers, so the async
+# interaction views wait on the database without holding a thread.
+# Compare the two with benchmark_endpoints --base-url --concurrency.
+import multiprocessing
+import os
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+accesslog = '-'
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.getenv('GUNICORN_THREADS', 4))
@@ -0,0 +1,249 @@
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from users.models import Follow
+from users.stats import refresh_view_counts
+from .models import Comment, DailyFollowerActivity, DailyVideoActivity, HourlyVideoActivity, Like, View
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+WEEK = timedelta(days=7)
+
+METRICS = ('views', 'likes', 'comments')
+# Raw table behind each metric, with the filter that selects what it counts
+SOURCES = (('views', View, {}), ('likes', Like, {'is_like': True}), ('comments', Comment, {}))
+
+# Rows can be committed a little after their created_at, so each run
+# recounts this far back rather than only the hour that just ended
+LATE_ARRIVALS = timedelta(hours=2)
+# Hourly buckets only feed the 24 hour range and the days being built
+HOURLY_RETENTION = timedelta(days=14)
+
+# Dashboard ranges: (span, bucket width, rollup table read). Spans are whole
+# buckets; weekly buckets are summed from the daily rows.
+RANGES = {
+    '24h': (timedelta(hours=24), HOUR, HourlyVideoActivity),
+    '7d': (timedelta(days=7), DAY, DailyVideoActivity),
+    '30d': (timedelta(days=30), DAY, DailyVideoActivity),
+    '13w': (timedelta(weeks=13), WEEK, DailyVideoActivity),
+    '52w': (timedelta(weeks=52), WEEK, DailyVideoActivity),
+}
+DEFAULT_RANGE = '30d'
+TOP_VIDEOS = 10
+
+
+def floor_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(moment):
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _replace_buckets(model, start, end, rows):
+    # Recounted buckets replace the old ones wholesale, so a bucket whose
+    # only like was withdrawn disappears instead of keeping a stale count
+    with transaction.atomic():
+        model.objects.filter(start__gte=start, start__lt=end).delete()
+        model.objects.bulk_create(rows, batch_size=2000)
+    return len(rows)
+
+
+def roll_up_hours(start, end):
+    """Recount the hourly buckets in [start, end) from the View, Like and Comment rows"""
+    buckets = {}
+    for metric, model, filters in SOURCES:
+        counts = (
+            model.objects.filter(created_at__gte=start, created_at__lt=end, **filters)
+            .annotate(bucket=TruncHour('created_at'))
+            .values('video_id', 'video__user_id', 'bucket')
+            .annotate(total=Count('pk'))
+            .order_by()
+        )
+        for row in counts.iterator(chunk_size=5000):
+            key = (row['video_id'], row['bucket'])
+            if key not in buckets:
+                buckets[key] = HourlyVideoActivity(
+                    video_id=row['video_id'], creator_id=row['video__user_id'], start=row['bucket'],
+                )
+            setattr(buckets[key], metric, row['total'])
+    return _replace_buckets(HourlyVideoActivity, start, end, list(buckets.values()))
+
+
+def roll_up_days(start, end):
+    """Rebuild the daily buckets in [start, end), whole days, from the hourly ones and Follow rows"""
+    totals = (
+        HourlyVideoActivity.objects.filter(start__gte=start, start__lt=end)
+        .annotate(day=TruncDay('start'))
+        .values('video_id', 'creator_id', 'day')
+        .annotate(**{f'total_{metric}': Sum(metric) for metric in METRICS})
+        .order_by()
+    )
+    days = [
+        DailyVideoActivity(
+            video_id=row['video_id'], creator_id=row['creator_id'], start=row['day'],
+            **{metric: row[f'total_{metric}'] for metric in METRICS},
+        )
+        for row in totals.iterator(chunk_size=5000)
+    ]
+    follows = (
+        Follow.objects.filter(created_at__gte=start, created_at__lt=end)
+        .annotate(day=TruncDay('created_at'))
+        .values('followee_id', 'day')
+        .annotate(total=Count('pk'))
+        .order_by()
+    )
+    followers = [
+        DailyFollowerActivity(creator_id=row['followee_id'], start=row['day'], new_followers=row['total'])
+        for row in follows.iterator(chunk_size=5000)
+    ]
+    _replace_buckets(DailyFollowerActivity, start, end, followers)
+    with transaction.atomic():
+        creators = set(
+            DailyVideoActivity.objects.filter(start__gte=start, start__lt=end).values_list('creator_id', flat=True)
+        )
+        written = _replace_buckets(DailyVideoActivity, start, end, days)
+        # Creators' view totals are their daily buckets summed
+        refresh_view_counts(creators | {day.creator_id for day in days})
+    return written
+
+
+def roll_up(since=None, until=None):
+    """Bring the rollup tables up to date for everything that happened in [since, until).
+
+    Hours are recounted from the raw tables a day at a time, so a long
+    backfill never holds one huge transaction; then every day they touch
+    is rebuilt from its hours. Run hourly (manage.py rollup_analytics);
+    with no since, it recounts the last LATE_ARRIVALS. Returns the number
+    of (hourly, daily) buckets written.
+    """
+    until = until or timezone.now()
+    since = since or until - LATE_ARRIVALS
+    end = floor_hour(until) + HOUR
+    hours = days = 0
+
+    start = floor_hour(since)
+    while start < end:
+        chunk_end = min(floor_day(start) + DAY, end)
+        hours += roll_up_hours(start, chunk_end)
+        start = chunk_end
+    days += roll_up_days(floor_day(since), floor_day(until) + DAY)
+
+    HourlyVideoActivity.objects.filter(start__lt=floor_day(until) - HOURLY_RETENTION).delete()
+    return hours, days
+
+
+def rebucket(starts, values, range_start, step, count):
+    """Sum rows of per-bucket values into count buckets of width step from range_start.
+
+    starts are the rows' bucket starts and values a (rows, metrics)
+    array; the result is a (count, metrics) array. Rows outside the
+    range are dropped.
+    """
+    out = np.zeros((count, values.shape[1]), dtype=np.int64)
+    if len(starts):
+        offsets = np.array([(start - range_start) // step for start in starts], dtype=np.int64)
+        inside = (offsets >= 0) & (offsets < count)
+        np.add.at(out, offsets[inside], values[inside])
+    return out
+
+
+class ActivityReport:
+    """A creator's views, likes, comments and new followers over one dashboard range"""
+
+    def __init__(self, creator, range_key=DEFAULT_RANGE, now=None):
+        if range_key not in RANGES:
+            range_key = DEFAULT_RANGE
+        self.range_key = range_key
+        span, self.step, self.model = RANGES[range_key]
+        self.hourly = self.step < DAY
+        self.bucket_name = 'hour' if self.hourly else 'day' if self.step == DAY else 'week'
+        now = now or timezone.now()
+        source_step = HOUR if self.model is HourlyVideoActivity else DAY
+        # The current, still-filling bucket is the last one shown
+        self.end = (floor_hour(now) if source_step == HOUR else floor_day(now)) + source_step
+        self.start = self.end - span
+        self.count = span // self.step
+        self.bucket_starts = [self.start + i * self.step for i in range(self.count)]
+
+        rows = self.model.objects.filter(creator=creator, start__gte=self.start, start__lt=self.end)
+        self.series = self.load_series(rows)
+        self.totals = dict(zip(METRICS, self.series.sum(axis=0).tolist()))
+        self.videos = self.load_top_videos(rows)
+        self.new_followers = self.load_followers(creator)
+
+    def load_series(self, rows):
+        # Few enough rows to sum in Python: one per source bucket
+        by_bucket = list(
+            rows.values('start')
+            .annotate(**{f'total_{metric}': Sum(metric) for metric in METRICS})
+            .order_by()
+        )
+        values = np.array(
+            [[row[f'total_{metric}'] for metric in METRICS] for row in by_bucket], dtype=np.int64,
+        ).reshape(-1, len(METRICS))
+        return rebucket([row['start'] for row in by_bucket], values, self.start, self.step, self.count)
+
+    def load_top_videos(self, rows):
+        top = list(
+            rows.values('video_id', 'video__title')
+            .annotate(**{f'total_{metric}': Sum(metric) for metric in METRICS})
+            .order_by('-total_views', 'video_id')[:TOP_VIDEOS]
+        )
+        if not top:
+            return []
+        ids = [row['video_id'] for row in top]
+        detail = list(rows.filter(video_id__in=ids).values_list('video_id', 'start', 'views'))
+
+        # One add.at over every (video, bucket) pair instead of a loop per video
+        index = {video_id: i for i, video_id in enumerate(ids)}
+        matrix = np.zeros((len(ids), self.count), dtype=np.int64)
+        if detail:
+            videos = np.array([index[video_id] for video_id, _, _ in detail], dtype=np.int64)
+            offsets = np.array([(start - self.start) // self.step for _, start, _ in detail], dtype=np.int64)
+            views = np.array([count for _, _, count in detail], dtype=np.int64)
+            np.add.at(matrix, (videos, offsets), views)
+
+        return [
+            {
+                'id': row['video_id'],
+                'title': row['video__title'],
+                **{metric: row[f'total_{metric}'] for metric in METRICS},
+                'views_series': matrix[i].tolist(),
+            }
+            for i, row in enumerate(top)
+        ]
+
+    def load_followers(self, creator):
+        """New followers per bucket; None for hourly ranges, as follows are rolled up by day"""
+        if self.hourly:
+            return None
+        days = list(
+            DailyFollowerActivity.objects.filter(creator=creator, start__gte=self.start, start__lt=self.end)
+            .values_list('start', 'new_followers')
+        )
+        values = np.array([[count] for _, count in days], dtype=np.int64).reshape(-1, 1)
+        return rebucket([start for start, _ in days], values, self.start, self.step, self.count)[:, 0].tolist()
+
+    def summary(self):
+        """(label, total, per-bucket series) for each headline figure"""
+        figures = [
+            (metric.capitalize(), self.totals[metric], self.series[:, i].tolist())
+            for i, metric in enumerate(METRICS)
+        ]
+        if self.new_followers is not None:
+            figures.append(('New followers', sum(self.new_followers), self.new_followers))
+        return figures
+
+    def rows(self):
+        """One dict per bucket, oldest first, for tables"""
+        followers = self.new_followers or [None] * self.count
+        return [
+            {'start': start, **dict(zip(METRICS, values)), 'new_followers': gained}
+            for start, values, gained in zip(self.bucket_starts, self.series.tolist(), followers)
+        ]
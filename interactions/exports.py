@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, time, timezone
+
+from django.utils.dateparse import parse_date
+
+from .models import Comment, DailyFollowerActivity, DailyVideoActivity, Like, View
+
+# Rows fetched per round trip; on PostgreSQL .iterator() reads them through
+# a server-side cursor, so memory stays flat however many rows there are
+CHUNK_ROWS = 2000
+# Text buffered before a chunk is handed on to the response or file
+FLUSH_BYTES = 64 * 1024
+
+# A spreadsheet treats a cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+FORMATS = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson; charset=utf-8'}
+
+
+class Export:
+    """One downloadable table: its columns and how to find a creator's rows in time order"""
+
+    def __init__(self, model, creator_field, time_field, columns, **filters):
+        self.model = model
+        self.creator_field = creator_field
+        self.time_field = time_field
+        self.header = [name for name, _ in columns]
+        self.lookups = [lookup for _, lookup in columns]
+        self.filters = filters
+
+    def rows(self, creator, since=None, until=None):
+        """Lazy values_list of creator's rows in [since, until), oldest first"""
+        queryset = self.model.objects.filter(**{self.creator_field: creator}, **self.filters)
+        if since is not None:
+            queryset = queryset.filter(**{f'{self.time_field}__gte': since})
+        if until is not None:
+            queryset = queryset.filter(**{f'{self.time_field}__lt': until})
+        return queryset.order_by(self.time_field, 'pk').values_list(*self.lookups)
+
+
+EXPORTS = {
+    'daily': Export(DailyVideoActivity, 'creator', 'start', [
+        ('day', 'start'), ('video_id', 'video_id'), ('title', 'video__title'),
+        ('views', 'views'), ('likes', 'likes'), ('comments', 'comments'),
+    ], video__deleted_at__isnull=True),
+    'followers': Export(DailyFollowerActivity, 'creator', 'start', [
+        ('day', 'start'), ('new_followers', 'new_followers'),
+    ]),
+    'views': Export(View, 'video__user', 'created_at', [
+        ('created_at', 'created_at'), ('video_id', 'video_id'),
+    ], video__deleted_at__isnull=True),
+    'likes': Export(Like, 'video__user', 'created_at', [
+        ('created_at', 'created_at'), ('video_id', 'video_id'), ('username', 'user__username'),
+        ('is_like', 'is_like'),
+    ], video__deleted_at__isnull=True),
+    'comments': Export(Comment, 'video__user', 'created_at', [
+        ('created_at', 'created_at'), ('video_id', 'video_id'), ('username', 'user__username'),
+        ('text', 'text'),
+    ], video__deleted_at__isnull=True),
+}
+
+
+def day_start(value):
+    """Midnight UTC of a YYYY-MM-DD string, or None if value is not one"""
+    try:
+        day = parse_date(value or '')
+    except ValueError:
+        return None
+    return datetime.combine(day, time.min, tzinfo=timezone.utc) if day else None
+
+
+def _plain(rows):
+    for row in rows.iterator(chunk_size=CHUNK_ROWS):
+        yield [value.isoformat() if isinstance(value, datetime) else value for value in row]
+
+
+def _cell(value):
+    """value, quoted with a leading ' if a spreadsheet would run it as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunks(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in _plain(rows):
+        writer.writerow([_cell(value) for value in row])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _jsonl_chunks(header, rows):
+    lines, size = [], 0
+    for row in _plain(rows):
+        line = json.dumps(dict(zip(header, row)), ensure_ascii=False, default=str)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= FLUSH_BYTES:
+            yield '\n'.join(lines) + '\n'
+            lines, size = [], 0
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def export_chunks(export, rows, fmt='csv', compress=False):
+    """rows (from export.rows) as encoded byte chunks, gzipped on the fly if compress"""
+    chunks = _csv_chunks(export.header, rows) if fmt == 'csv' else _jsonl_chunks(export.header, rows)
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode()
+        return
+    # wbits=31 writes a gzip container, so the download opens with any gunzip
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = gzip.compress(chunk.encode())
+        if data:
+            yield data
+    yield gzip.flush()
+
+
+def export_filename(creator, kind, fmt='csv', compress=False):
+    return f"{creator.username}-{kind}.{fmt}{'.gz' if compress else ''}"
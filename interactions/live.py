@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+COALESCE_SECONDS = 1
+KEEPALIVE_SECONDS = 15
+RESYNC_SECONDS = 60
+RETRY_MILLISECONDS = 5000
+FIELDS = ('likes', 'views', 'comments')
+
+
+def sse(event, payload):
+    return f'event: {event}\ndata: {json.dumps(payload, separators=(",", ":"))}\n\n'.encode()
+
+
+class Channel:
+    """Live counters for one video, shared by every client watching it"""
+
+    def __init__(self, loop, load_counts):
+        self.loop = loop
+        self.load_counts = load_counts
+        self.subscribers = 0
+        self.counts = None
+        self.message = None
+        self.version = 0
+        self.synced_at = 0.0
+        self.loaded = loop.create_future()
+        self.changed = loop.create_future()
+
+    def sync(self, counts):
+        """Replace the counters with freshly counted values"""
+        delta = {field: counts[field] - self.counts[field] for field in FIELDS} if self.counts else {}
+        self.counts = counts
+        self.synced_at = time.monotonic()
+        if not self.loaded.done():
+            self.message = sse('counts', {**counts, 'delta': {}})
+            self.loaded.set_result(None)
+        elif any(delta.values()):
+            self.broadcast(delta, apply=False)
+
+    def broadcast(self, delta, apply=True):
+        """Render the update once and wake every subscriber with the same bytes"""
+        if apply:
+            for field, value in delta.items():
+                self.counts[field] = max(self.counts[field] + value, 0)
+        self.message = sse('counts', {**self.counts, 'delta': dict(delta)})
+        self.version += 1
+        waiter, self.changed = self.changed, self.loop.create_future()
+        waiter.set_result(None)
+
+
+class LiveCounters:
+    """In-process pub/sub that fans coalesced counter updates out to SSE clients.
+
+    publish() may be called from any thread and only bumps a pending delta.
+    A single ticker on the event loop folds those deltas into each watched
+    video's channel at most once per COALESCE_SECONDS, so the message is
+    encoded once per video per tick however many clients are listening, and
+    counts are never recomputed per client. Deltas only reach clients of the
+    same process; every channel re-counts from the database each
+    RESYNC_SECONDS, which bounds drift and picks up other workers' activity.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(Counter)
+        self._channels = {}
+        self._loop = None
+        self._ticker = None
+
+    def publish(self, video_id, **delta):
+        if video_id not in self._channels:
+            return
+        with self._lock:
+            self._pending[video_id].update(delta)
+
+    def watchers(self, video_id):
+        channel = self._channels.get(video_id)
+        return channel.subscribers if channel else 0
+
+    async def stream(self, video_id, load_counts):
+        """Yield server-sent events for one client until it disconnects"""
+        channel = await self._join(video_id, load_counts)
+        try:
+            sent = channel.version
+            yield f'retry: {RETRY_MILLISECONDS}\n\n'.encode() + channel.message
+            while True:
+                # A broadcast while this client was suspended in a yield has
+                # already replaced channel.changed; send it without waiting
+                if channel.version == sent:
+                    try:
+                        await asyncio.wait_for(asyncio.shield(channel.changed), KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield b': keepalive\n\n'
+                        continue
+                # Carries the latest counts, so missed intermediate messages need no replay
+                sent = channel.version
+                yield channel.message
+        finally:
+            channel.subscribers -= 1
+
+    async def _join(self, video_id, load_counts):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Channels and futures belong to one event loop
+            self._loop, self._channels, self._ticker = loop, {}, None
+        channel = self._channels.get(video_id)
+        if channel is None:
+            channel = self._channels[video_id] = Channel(loop, load_counts)
+            channel.subscribers += 1
+            try:
+                channel.sync(await load_counts(video_id))
+            except BaseException:
+                channel.subscribers -= 1
+                del self._channels[video_id]
+                channel.loaded.cancel()
+                raise
+        else:
+            channel.subscribers += 1
+            try:
+                await asyncio.shield(channel.loaded)
+            except BaseException:
+                channel.subscribers -= 1
+                raise
+        if self._ticker is None:
+            self._ticker = loop.create_task(self._tick())
+        return channel
+
+    async def _tick(self):
+        try:
+            while self._channels:
+                await asyncio.sleep(COALESCE_SECONDS)
+                with self._lock:
+                    pending, self._pending = self._pending, defaultdict(Counter)
+                now = time.monotonic()
+                for video_id, channel in list(self._channels.items()):
+                    if channel.subscribers <= 0:
+                        del self._channels[video_id]
+                    elif now - channel.synced_at > RESYNC_SECONDS:
+                        try:
+                            channel.sync(await channel.load_counts(video_id))
+                        except Exception:
+                            logger.warning('Could not re-count video %s', video_id, exc_info=True)
+                            channel.synced_at = now
+                    elif pending.get(video_id):
+                        channel.broadcast(pending[video_id])
+        finally:
+            self._ticker = None
+
+
+live_counters = LiveCounters()
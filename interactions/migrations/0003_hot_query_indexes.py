@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0002_initial'),
+        ('videos', '0004_video_public_partial_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['video', '-created_at'], name='comment_video_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(condition=models.Q(('is_like', True)), fields=['video'], name='like_video_liked_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='view',
+            index=models.Index(fields=['video', '-created_at'], name='view_video_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='view',
+            index=models.Index(fields=['user', 'video'], name='view_user_video_idx'),
+        ),
+    ]
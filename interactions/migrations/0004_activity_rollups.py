@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0003_hot_query_indexes'),
+        ('videos', '0006_video_thumbnail_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyFollowerActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('new_followers', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyVideoActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HourlyVideoActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at'], name='comment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['created_at'], name='like_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='view',
+            index=models.Index(fields=['created_at'], name='view_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailyfolloweractivity',
+            name='creator',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='dailyvideoactivity',
+            name='creator',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='dailyvideoactivity',
+            name='video',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='videos.video'),
+        ),
+        migrations.AddField(
+            model_name='hourlyvideoactivity',
+            name='creator',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='hourlyvideoactivity',
+            name='video',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='videos.video'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyfolloweractivity',
+            index=models.Index(fields=['start'], name='daily_followers_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyfolloweractivity',
+            constraint=models.UniqueConstraint(fields=('creator', 'start'), name='daily_followers_creator_start'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyvideoactivity',
+            index=models.Index(fields=['creator', 'start'], name='daily_activity_creator_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyvideoactivity',
+            index=models.Index(fields=['start'], name='daily_activity_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyvideoactivity',
+            constraint=models.UniqueConstraint(fields=('video', 'start'), name='daily_activity_video_start'),
+        ),
+        migrations.AddIndex(
+            model_name='hourlyvideoactivity',
+            index=models.Index(fields=['creator', 'start'], name='hourly_activity_creator_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hourlyvideoactivity',
+            index=models.Index(fields=['start'], name='hourly_activity_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='hourlyvideoactivity',
+            constraint=models.UniqueConstraint(fields=('video', 'start'), name='hourly_activity_video_start'),
+        ),
+    ]
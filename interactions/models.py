@@ -1,6 +1,14 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from videos.models import Video
+from videos.models import Video, creator_of
+from core.page_cache import purge_on_commit
+from users.models import adjust_creator_stats
+
+from .live import live_counters
 
 User = get_user_model()
 
@@ -12,10 +20,23 @@ class Like(models.Model):
 
     class Meta:
         unique_together = ('user', 'video')
+        indexes = [
+            # like_count filters on is_like=True; a partial index answers it from the index alone
+            models.Index(fields=['video'], condition=models.Q(is_like=True), name='like_video_liked_idx'),
+            # Analytics rollups recount recent hours across all videos
+            models.Index(fields=['created_at'], name='like_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} {"liked" if self.is_like else "disliked"} {self.video.title}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored value so a flip can be counted as a delta
+        instance._saved_is_like = instance.__dict__.get('is_like')
+        return instance
+
 class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
     video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='comments')
@@ -26,6 +47,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['video', '-created_at'], name='comment_video_created_idx'),
+            models.Index(fields=['created_at'], name='comment_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} commented on {self.video.title}'
@@ -39,5 +64,114 @@ class View(models.Model):
     video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='views')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['video', '-created_at'], name='view_video_created_idx'),
+            models.Index(fields=['user', 'video'], name='view_user_video_idx'),
+            models.Index(fields=['created_at'], name='view_created_idx'),
+        ]
+
     def __str__(self):
         return f'View on {self.video.title} by {self.user.username if self.user else "Anonymous"}'
+
+
+class VideoActivity(models.Model):
+    """Views, likes and comments one video received in one rollup bucket (see interactions.analytics)"""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='+')
+    # Copied from the video so a creator's dashboard reads one index range
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    start = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+class HourlyVideoActivity(VideoActivity):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'start'], name='hourly_activity_video_start'),
+        ]
+        indexes = [
+            models.Index(fields=['creator', 'start'], name='hourly_activity_creator_idx'),
+            models.Index(fields=['start'], name='hourly_activity_start_idx'),
+        ]
+
+class DailyVideoActivity(VideoActivity):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'start'], name='daily_activity_video_start'),
+        ]
+        indexes = [
+            models.Index(fields=['creator', 'start'], name='daily_activity_creator_idx'),
+            models.Index(fields=['start'], name='daily_activity_start_idx'),
+        ]
+
+class DailyFollowerActivity(models.Model):
+    """Followers a creator gained on one day"""
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    start = models.DateTimeField()
+    new_followers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['creator', 'start'], name='daily_followers_creator_start'),
+        ]
+        indexes = [
+            models.Index(fields=['start'], name='daily_followers_start_idx'),
+        ]
+
+
+def publish_counts(video_id, **delta):
+    """Push a counter change to live watchers once the transaction commits"""
+    transaction.on_commit(lambda: live_counters.publish(video_id, **delta))
+
+def reaction_delta(was_like, is_like):
+    """(likes, dislikes) change when a reaction goes from was_like to is_like; None means no reaction"""
+    return (is_like is True) - (was_like is True), (is_like is False) - (was_like is False)
+
+def adjust_reaction_counts(video_id, likes, dislikes):
+    """Apply like/dislike deltas to the video's stored counters in one UPDATE"""
+    if not likes and not dislikes:
+        return
+    Video.objects.filter(pk=video_id).update(
+        like_count=Greatest(F('like_count') + likes, 0),
+        dislike_count=Greatest(F('dislike_count') + dislikes, 0),
+    )
+    if likes:
+        adjust_creator_stats(creator_of(video_id), like_count=likes)
+        publish_counts(video_id, likes=likes)
+
+# interactions.reactions writes likes with raw upserts and keeps the counters
+# itself; these receivers cover every other ORM path (admin, cascades, shell).
+
+@receiver(post_save, sender=Like)
+def update_reaction_counts(sender, instance, created, **kwargs):
+    was_like = None if created else getattr(instance, '_saved_is_like', instance.is_like)
+    instance._saved_is_like = instance.is_like
+    adjust_reaction_counts(instance.video_id, *reaction_delta(was_like, instance.is_like))
+
+@receiver(post_delete, sender=Like)
+def release_reaction_counts(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Video) or getattr(origin, 'model', None) is Video:
+        return  # the video and its counters are going too
+    adjust_reaction_counts(instance.video_id, *reaction_delta(instance.is_like, None))
+
+@receiver(post_save, sender=Comment)
+def publish_comment_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_counts(instance.video_id, comments=1)
+    purge_on_commit(f'video:{instance.video_id}')
+
+@receiver(post_delete, sender=Comment)
+def publish_comment_deleted(sender, instance, **kwargs):
+    publish_counts(instance.video_id, comments=-1)
+    purge_on_commit(f'video:{instance.video_id}')
+
+@receiver(post_save, sender=View)
+def publish_view_saved(sender, instance, created, **kwargs):
+    # The creator's view total comes from the rollups (interactions.analytics),
+    # so recording a view never waits on their stats row
+    if created:
+        publish_counts(instance.video_id, views=1)
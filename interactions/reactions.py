@@ -0,0 +1,154 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from users.models import CreatorStats
+from videos.models import Video
+from .models import Like, publish_counts, reaction_delta
+
+LIKE = 'like'
+DISLIKE = 'dislike'
+CLEAR = 'clear'
+REACTIONS = (LIKE, DISLIKE, CLEAR)
+
+# One statement per reaction: the upsert/delete, the video's counters and the
+# creator's like total commit together, concurrent clicks serialize on the
+# video row, and the new counts come back in the same round trip. A repeated
+# reaction changes nothing.
+# Retired videos (deleted_at set) take no reactions: retire_video has already
+# released their likes from the creator's total, and the reaper removes the
+# rows without receivers.
+POSTGRES_UPSERT_SQL = '''
+WITH target AS (
+    SELECT id FROM {video} WHERE id = %(video_id)s AND deleted_at IS NULL FOR UPDATE
+), changed AS (
+    INSERT INTO {like} (user_id, video_id, is_like, created_at)
+    SELECT %(user_id)s, id, %(is_like)s, %(now)s FROM target
+    ON CONFLICT (user_id, video_id) DO UPDATE SET is_like = EXCLUDED.is_like
+    WHERE {like}.is_like <> EXCLUDED.is_like
+    RETURNING (xmax = 0) AS inserted
+), counted AS (
+    UPDATE {video} SET
+        like_count = GREATEST(like_count + CASE WHEN %(is_like)s THEN 1 WHEN changed.inserted THEN 0 ELSE -1 END, 0),
+        dislike_count = GREATEST(dislike_count + CASE WHEN NOT %(is_like)s THEN 1 WHEN changed.inserted THEN 0 ELSE -1 END, 0)
+    FROM changed
+    WHERE {video}.id = %(video_id)s
+    RETURNING {video}.user_id, like_count, dislike_count, changed.inserted
+), creator AS (
+    -- A new dislike leaves the creator's likes alone; a like adds one and a
+    -- like turned dislike takes one off
+    UPDATE {stats} SET
+        like_count = GREATEST({stats}.like_count + CASE WHEN %(is_like)s THEN 1 ELSE -1 END, 0)
+    FROM counted
+    WHERE {stats}.user_id = counted.user_id AND (%(is_like)s OR NOT counted.inserted)
+)
+SELECT like_count, dislike_count, TRUE, inserted FROM counted
+UNION ALL
+SELECT like_count, dislike_count, FALSE, FALSE FROM {video}
+WHERE id = %(video_id)s AND deleted_at IS NULL AND NOT EXISTS (SELECT 1 FROM changed)
+'''
+
+POSTGRES_CLEAR_SQL = '''
+WITH target AS (
+    SELECT id FROM {video} WHERE id = %(video_id)s AND deleted_at IS NULL FOR UPDATE
+), removed AS (
+    DELETE FROM {like} WHERE user_id = %(user_id)s AND video_id IN (SELECT id FROM target)
+    RETURNING is_like
+), counted AS (
+    UPDATE {video} SET
+        like_count = GREATEST(like_count - CASE WHEN removed.is_like THEN 1 ELSE 0 END, 0),
+        dislike_count = GREATEST(dislike_count - CASE WHEN removed.is_like THEN 0 ELSE 1 END, 0)
+    FROM removed
+    WHERE {video}.id = %(video_id)s
+    RETURNING {video}.user_id, like_count, dislike_count, removed.is_like
+), creator AS (
+    UPDATE {stats} SET like_count = GREATEST({stats}.like_count - 1, 0)
+    FROM counted
+    WHERE {stats}.user_id = counted.user_id AND counted.is_like
+)
+SELECT like_count, dislike_count, TRUE, is_like FROM counted
+UNION ALL
+SELECT like_count, dislike_count, FALSE, NULL FROM {video}
+WHERE id = %(video_id)s AND deleted_at IS NULL AND NOT EXISTS (SELECT 1 FROM removed)
+'''
+
+
+def react(user_id, video_id, reaction):
+    """Set a user's reaction to a video and return the video's new counts.
+
+    Returns a dict with like_count, dislike_count and whether anything
+    changed. Raises Video.DoesNotExist for an unknown or retired video.
+    """
+    if reaction not in REACTIONS:
+        raise ValueError(f'Unknown reaction {reaction!r}')
+    if connection.vendor == 'postgresql':
+        return _react_postgres(user_id, video_id, reaction)
+    return _react_orm(user_id, video_id, reaction)
+
+
+def _react_postgres(user_id, video_id, reaction):
+    tables = {name: connection.ops.quote_name(model._meta.db_table)
+              for name, model in (('like', Like), ('video', Video), ('stats', CreatorStats))}
+    params = {'user_id': user_id, 'video_id': video_id}
+    if reaction == CLEAR:
+        sql = POSTGRES_CLEAR_SQL
+    else:
+        sql = POSTGRES_UPSERT_SQL
+        params.update(is_like=reaction == LIKE, now=timezone.now())
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql.format(**tables), params)
+            row = cursor.fetchone()
+    except IntegrityError:
+        # The only foreign key that can be missing is the video's
+        raise Video.DoesNotExist
+    if row is None:
+        raise Video.DoesNotExist
+    like_count, dislike_count, changed, detail = row
+
+    if changed:
+        if reaction == CLEAR:
+            likes, _ = reaction_delta(detail, None)
+        else:
+            is_like = reaction == LIKE
+            likes, _ = reaction_delta(None if detail else not is_like, is_like)
+        if likes:
+            publish_counts(video_id, likes=likes)
+    return {'like_count': like_count, 'dislike_count': dislike_count, 'changed': changed}
+
+
+def _react_orm(user_id, video_id, reaction):
+    # Databases without data-modifying CTEs: lock the rows and let the Like
+    # receivers apply the counter delta inside the same transaction.
+    with transaction.atomic():
+        Video.objects.select_for_update().only('pk').get(pk=video_id)
+        like = Like.objects.select_for_update().filter(user_id=user_id, video_id=video_id).first()
+        changed = True
+        if reaction == CLEAR:
+            if like is None:
+                changed = False
+            else:
+                like.delete()
+        elif like is None:
+            Like.objects.create(user_id=user_id, video_id=video_id, is_like=reaction == LIKE)
+        elif like.is_like != (reaction == LIKE):
+            like.is_like = reaction == LIKE
+            like.save(update_fields=['is_like'])
+        else:
+            changed = False
+        like_count, dislike_count = Video.objects.values_list('like_count', 'dislike_count').get(pk=video_id)
+    return {'like_count': like_count, 'dislike_count': dislike_count, 'changed': changed}
+
+
+def recount_reaction_counts():
+    """Recompute every video's like/dislike counters from scratch (after bulk imports)"""
+    def counted(is_like):
+        return Coalesce(Subquery(
+            Like.objects.filter(video_id=OuterRef('pk'), is_like=is_like)
+            .values('video_id')
+            .annotate(total=Count('id'))
+            .values('total')
+        ), 0)
+
+    Video.objects.update(like_count=counted(True), dislike_count=counted(False))
@@ -1,3 +1,293 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest import skipUnless
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from users.models import CreatorStats, CustomUser
+from videos.deletion import retire_video
+from videos.models import Video
+from .analytics import DAY, HOUR, HOURLY_RETENTION, WEEK, ActivityReport, rebucket, roll_up
+from .exports import EXPORTS, export_chunks
+from .live import LiveCounters
+from .models import Comment, DailyVideoActivity, HourlyVideoActivity, Like, View
+from .reactions import CLEAR, DISLIKE, LIKE, _react_orm, _react_postgres
+from .view_dedup import COOKIE_NAME, ViewFilter, count_view, remember_views
+
+
+async def load_counts(video_id):
+    return {'likes': 1, 'views': 5, 'comments': 0}
+
+
+class LiveCountersTests(SimpleTestCase):
+    def setUp(self):
+        self.counters = LiveCounters()
+        self.stream = self.counters.stream('video', load_counts)
+
+    async def close(self):
+        await self.stream.aclose()
+        if self.counters._ticker is not None:
+            self.counters._ticker.cancel()
+
+    async def next_event(self):
+        return await asyncio.wait_for(self.stream.__anext__(), 1)
+
+    async def test_first_event_carries_counts(self):
+        try:
+            first = await self.next_event()
+        finally:
+            await self.close()
+        self.assertIn(b'retry:', first)
+        self.assertIn(b'"likes":1,"views":5', first)
+
+    async def test_broadcast_while_client_is_busy_is_sent(self):
+        try:
+            await self.next_event()
+            # The client has not asked for its next event yet
+            self.counters._channels['video'].broadcast({'likes': 1})
+            update = await self.next_event()
+        finally:
+            await self.close()
+        self.assertIn(b'"likes":2', update)
+
+    async def test_missed_broadcasts_collapse_into_latest_counts(self):
+        try:
+            await self.next_event()
+            channel = self.counters._channels['video']
+            channel.broadcast({'likes': 1})
+            channel.broadcast({'views': 2})
+            update = await self.next_event()
+        finally:
+            await self.close()
+        self.assertIn(b'"likes":2,"views":7', update)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.creator = CustomUser.objects.create_user('creator', password='pw')
+        self.viewer = CustomUser.objects.create_user('viewer', password='pw')
+        self.video = Video.objects.create(user=self.creator, title='Clip', video_file='videos/clip.mp4')
+
+    def export(self, kind, fmt='csv'):
+        export = EXPORTS[kind]
+        return b''.join(export_chunks(export, export.rows(self.creator), fmt)).decode()
+
+    def test_csv_cells_are_not_formulas(self):
+        texts = ['=HYPERLINK("http://example.com")', '+1', '-1', '@SUM(A1)', '\t=1+1', '\r=1+1']
+        for text in texts:
+            Comment.objects.create(user=self.viewer, video=self.video, text=text)
+        csv_rows = list(csv.reader(io.StringIO(self.export('comments'))))[1:]
+        self.assertEqual([row[-1] for row in csv_rows], ["'" + text for text in texts])
+        # JSON Lines is not opened as a spreadsheet and keeps the text as is
+        self.assertIn('"text": "+1"', self.export('comments', 'jsonl'))
+
+    def test_retired_videos_are_left_out(self):
+        Comment.objects.create(user=self.viewer, video=self.video, text='Gone soon')
+        retire_video(self.video)
+        self.assertNotIn('Gone soon', self.export('comments'))
+
+
+class ReactionTests(TestCase):
+    """react() on databases without data-modifying CTEs (the ORM path)"""
+
+    def react(self, user, reaction):
+        return _react_orm(user.pk, self.video.pk, reaction)
+
+    def setUp(self):
+        self.creator = CustomUser.objects.create_user('creator', password='pw')
+        self.viewer = CustomUser.objects.create_user('viewer', password='pw')
+        self.video = Video.objects.create(user=self.creator, title='Clip', video_file='videos/clip.mp4')
+
+    def assertCounts(self, result, likes, dislikes, changed):
+        self.assertEqual(result, {'like_count': likes, 'dislike_count': dislikes, 'changed': changed})
+        self.video.refresh_from_db()
+        self.assertEqual((self.video.like_count, self.video.dislike_count), (likes, dislikes))
+        self.assertEqual(CreatorStats.objects.get(user=self.creator).like_count, likes)
+        self.assertEqual(Like.objects.filter(video=self.video, is_like=True).count(), likes)
+
+    def test_repeated_like_changes_nothing(self):
+        self.assertCounts(self.react(self.viewer, LIKE), 1, 0, True)
+        self.assertCounts(self.react(self.viewer, LIKE), 1, 0, False)
+
+    def test_like_then_dislike(self):
+        self.react(self.viewer, LIKE)
+        self.assertCounts(self.react(self.viewer, DISLIKE), 0, 1, True)
+        self.assertCounts(self.react(self.viewer, CLEAR), 0, 0, True)
+
+    def test_clear_without_reaction(self):
+        self.assertCounts(self.react(self.viewer, CLEAR), 0, 0, False)
+
+    def test_dislike_leaves_creator_likes(self):
+        self.react(self.creator, LIKE)
+        self.assertCounts(self.react(self.viewer, DISLIKE), 1, 1, True)
+
+    def test_retired_video_takes_no_reactions(self):
+        retire_video(self.video)
+        for reaction in (LIKE, DISLIKE, CLEAR):
+            with self.subTest(reaction=reaction), self.assertRaises(Video.DoesNotExist):
+                self.react(self.viewer, reaction)
+        self.assertFalse(Like.objects.exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'the single-statement reactions need PostgreSQL')
+class PostgresReactionTests(ReactionTests):
+    def react(self, user, reaction):
+        return _react_postgres(user.pk, self.video.pk, reaction)
+
+
+class RollupTests(TestCase):
+    NOW = datetime(2026, 3, 4, 10, 30, tzinfo=timezone.utc)
+
+    def setUp(self):
+        self.creator = CustomUser.objects.create_user('creator', password='pw')
+        self.viewer = CustomUser.objects.create_user('viewer', password='pw')
+        self.video = Video.objects.create(user=self.creator, title='Clip', video_file='videos/clip.mp4')
+
+    def at(self, row, moment):
+        type(row).objects.filter(pk=row.pk).update(created_at=moment)
+        return row
+
+    def hour(self, start):
+        return HourlyVideoActivity.objects.filter(video=self.video, start=start).first()
+
+    def test_late_arrivals_are_recounted(self):
+        nine = self.NOW.replace(minute=0) - HOUR
+        self.at(View.objects.create(video=self.video), nine + timedelta(minutes=5))
+        roll_up(until=self.NOW)
+        self.assertEqual(self.hour(nine).views, 1)
+        # Committed after the run that counted its hour
+        self.at(View.objects.create(video=self.video), nine + timedelta(minutes=50))
+        roll_up(until=self.NOW + timedelta(minutes=20))
+        self.assertEqual(self.hour(nine).views, 2)
+        self.assertEqual(DailyVideoActivity.objects.get(video=self.video).views, 2)
+
+    def test_withdrawn_like_disappears(self):
+        like = self.at(Like.objects.create(user=self.viewer, video=self.video), self.NOW - timedelta(minutes=10))
+        roll_up(until=self.NOW)
+        self.assertEqual(self.hour(self.NOW.replace(minute=0)).likes, 1)
+        like.delete()
+        roll_up(until=self.NOW)
+        self.assertIsNone(self.hour(self.NOW.replace(minute=0)))
+        self.assertFalse(DailyVideoActivity.objects.exists())
+
+    def test_old_hours_are_pruned(self):
+        old = self.NOW - HOURLY_RETENTION - 2 * DAY
+        self.at(View.objects.create(video=self.video), old)
+        roll_up(since=old, until=self.NOW)
+        self.assertFalse(HourlyVideoActivity.objects.filter(start__lt=self.NOW - HOURLY_RETENTION).exists())
+        # The day they fed is kept
+        self.assertEqual(DailyVideoActivity.objects.get(start=old.replace(hour=0, minute=0)).views, 1)
+
+    def test_rebucket_drops_rows_outside_the_range(self):
+        start = datetime(2026, 1, 5, tzinfo=timezone.utc)
+        starts = [start - DAY, start, start + WEEK - DAY, start + 2 * WEEK - DAY, start + 2 * WEEK]
+        values = np.array([[1], [2], [4], [8], [16]])
+        self.assertEqual(rebucket(starts, values, start, WEEK, 2)[:, 0].tolist(), [6, 8])
+        self.assertEqual(rebucket([], np.zeros((0, 1), dtype=np.int64), start, WEEK, 2).tolist(), [[0], [0]])
+
+    def test_weekly_report_edges(self):
+        report = ActivityReport(self.creator, '13w', now=self.NOW)
+        self.assertEqual(report.count, 13)
+        for start, views in ((report.start - DAY, 100), (report.start, 1), (report.end - DAY, 2)):
+            DailyVideoActivity.objects.create(video=self.video, creator=self.creator, start=start, views=views)
+        report = ActivityReport(self.creator, '13w', now=self.NOW)
+        series = report.series[:, 0].tolist()
+        self.assertEqual((series[0], series[-1], sum(series)), (1, 2, 3))
+        self.assertEqual(report.totals['views'], 3)
+        self.assertEqual(report.videos[0]['views_series'], series)
+
+
+def request_with(cookies=None):
+    request = RequestFactory().get('/')
+    request.COOKIES.update(cookies or {})
+    return request
+
+
+def cookie_of(view_filter):
+    response = HttpResponse()
+    view_filter.set_cookie(request_with(), response)
+    return {COOKIE_NAME: response.cookies[COOKIE_NAME].value}
+
+
+class ViewFilterTests(SimpleTestCase):
+    def test_membership(self):
+        seen = ViewFilter()
+        videos = [uuid.UUID(int=index) for index in range(20)]
+        for video_id in videos:
+            seen.add(video_id)
+        self.assertTrue(all(video_id in seen for video_id in videos))
+        self.assertNotIn(uuid.UUID(int=999), seen)
+        self.assertTrue(seen.changed)
+
+    def test_starts_over_when_half_full(self):
+        seen = ViewFilter(bytes([0xff]) * (ViewFilter.BITS // 16) + bytes(ViewFilter.BITS // 16), started=1)
+        self.assertEqual(seen.fill(), 0.5)
+        seen.add('video')
+        self.assertIn('video', seen)
+        self.assertLess(seen.fill(), 0.01)
+        self.assertGreater(seen.started, 1)
+
+    def test_cookie_round_trip(self):
+        seen = ViewFilter()
+        seen.add('video')
+        restored = ViewFilter.from_request(request_with(cookie_of(seen)))
+        self.assertIn('video', restored)
+        self.assertFalse(restored.changed)
+
+    @override_settings(VIEW_DEDUP_WINDOW=60)
+    def test_expired_filter_starts_over(self):
+        seen = ViewFilter(started=int(time.time()) - 61)
+        seen.add('video')
+        self.assertNotIn('video', ViewFilter.from_request(request_with(cookie_of(seen))))
+
+    def test_tampered_cookie_starts_over(self):
+        seen = ViewFilter()
+        seen.add('video')
+        value = cookie_of(seen)[COOKIE_NAME]
+        started, rest = value.split(':', 1)
+        for forged in (f'{int(started) + 1}:{rest}', value[:-1], 'junk'):
+            with self.subTest(forged=forged):
+                self.assertNotIn('video', ViewFilter.from_request(request_with({COOKIE_NAME: forged})))
+
+
+class CountViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = CustomUser.objects.create_user('creator', password='pw')
+        self.viewer = CustomUser.objects.create_user('viewer', password='pw')
+        self.video = Video.objects.create(user=self.creator, title='Clip', video_file='videos/clip.mp4')
+
+    def test_anonymous_repeats_are_not_counted(self):
+        request = request_with()
+        self.assertTrue(count_view(request, AnonymousUser(), self.video))
+        response = remember_views(request, HttpResponse())
+        again = request_with({COOKIE_NAME: response.cookies[COOKIE_NAME].value})
+        self.assertFalse(count_view(again, AnonymousUser(), self.video))
+        self.assertEqual(View.objects.count(), 1)
+
+    def test_signed_in_repeats_within_the_window(self):
+        self.assertTrue(count_view(request_with(), self.viewer, self.video))
+        with self.assertNumQueries(0):
+            self.assertFalse(count_view(request_with(), self.viewer, self.video))
+        # The View table still gates once the cache entry is gone
+        cache.clear()
+        self.assertFalse(count_view(request_with(), self.viewer, self.video))
+        self.assertEqual(View.objects.count(), 1)
+
+    @override_settings(VIEW_DEDUP_WINDOW=60)
+    def test_signed_in_views_count_again_after_the_window(self):
+        count_view(request_with(), self.viewer, self.video)
+        View.objects.update(created_at=datetime.now(timezone.utc) - timedelta(seconds=61))
+        cache.clear()
+        self.assertTrue(count_view(request_with(), self.viewer, self.video))
+        self.assertEqual(View.objects.count(), 2)
@@ -8,4 +8,5 @@ urlpatterns = [
     path('comment/<uuid:video_id>/', views.add_comment, name='add_comment'),
     path('comment/delete/<int:comment_id>/', views.delete_comment, name='delete_comment'),
     path('view/<uuid:video_id>/', views.record_view, name='record_view'),
+    path('live/<uuid:video_id>/', views.live_counts, name='live_counts'),
 ]
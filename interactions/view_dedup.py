@@ -0,0 +1,118 @@
+import base64
+import hashlib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import View
+
+COOKIE_NAME = 'viewed'
+COOKIE_SALT = 'interactions.view_dedup'
+
+
+def dedup_window():
+    """Seconds during which repeat views of a video by the same viewer are not counted"""
+    return getattr(settings, 'VIEW_DEDUP_WINDOW', 60 * 60 * 24)
+
+
+class ViewFilter:
+    """Fixed-size bloom filter of the videos an anonymous visitor has been counted for.
+
+    It lives in a signed cookie of constant size (~400 bytes) rather than the
+    session, so anonymous visitors never get a session and their pages stay
+    cacheable. It starts over once the dedup window has passed or half its
+    bits are set, which keeps the false-positive rate (a genuine first view
+    going uncounted) at a few percent at worst.
+    """
+
+    BITS = 2048
+    HASHES = 4
+    MAX_FILL = 0.5
+
+    def __init__(self, bits=None, started=None):
+        self.bits = bytearray(bits or bytes(self.BITS // 8))
+        self.started = started if started is not None else int(time.time())
+        self.changed = False
+
+    @classmethod
+    def from_request(cls, request):
+        value = request.get_signed_cookie(COOKIE_NAME, default=None, salt=COOKIE_SALT)
+        if value:
+            try:
+                started, encoded = value.split(':', 1)
+                bits = base64.b64decode(encoded)
+                if len(bits) == cls.BITS // 8 and time.time() - int(started) < dedup_window():
+                    return cls(bits, int(started))
+            except ValueError:
+                pass
+        return cls()
+
+    def set_cookie(self, request, response):
+        value = f'{self.started}:{base64.b64encode(bytes(self.bits)).decode()}'
+        response.set_signed_cookie(
+            COOKIE_NAME, value, salt=COOKIE_SALT, max_age=dedup_window(),
+            httponly=True, samesite='Lax', secure=request.is_secure(),
+        )
+
+    def positions(self, video_id):
+        digest = hashlib.blake2b(str(video_id).encode(), digest_size=16).digest()
+        # Double hashing: k positions from two 64-bit halves
+        h1, h2 = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.BITS for i in range(self.HASHES)]
+
+    def __contains__(self, video_id):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self.positions(video_id))
+
+    def add(self, video_id):
+        if self.fill() >= self.MAX_FILL:
+            self.bits = bytearray(self.BITS // 8)
+            self.started = int(time.time())
+        for p in self.positions(video_id):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.changed = True
+
+    def fill(self):
+        return int.from_bytes(self.bits, 'big').bit_count() / self.BITS
+
+
+def viewed_cache_key(user_id, video_id):
+    return f'interactions:viewed:{user_id}:{video_id}'
+
+
+def count_view(request, user, video):
+    """Record a view of video unless this viewer was already counted within the dedup window.
+
+    Anonymous viewers are tracked in a ViewFilter cookie; call
+    remember_views() on the response to send it back. Signed-in viewers
+    are gated by a cache entry first and the View table second, so repeats
+    cost no queries while the cache holds them. Returns True if a view was
+    recorded.
+    """
+    if not user.is_authenticated:
+        seen = getattr(request, 'view_filter', None) or ViewFilter.from_request(request)
+        request.view_filter = seen
+        if video.pk in seen:
+            return False
+        seen.add(video.pk)
+        View.objects.create(user=None, video=video)
+        return True
+
+    window = dedup_window()
+    if not cache.add(viewed_cache_key(user.pk, video.pk), 1, window):
+        return False
+    since = timezone.now() - timedelta(seconds=window)
+    if View.objects.filter(user=user, video=video, created_at__gte=since).exists():
+        return False
+    View.objects.create(user=user, video=video)
+    return True
+
+
+def remember_views(request, response):
+    """Send an anonymous viewer's updated ViewFilter back with the response"""
+    seen = getattr(request, 'view_filter', None)
+    if seen is not None and seen.changed:
+        seen.set_cookie(request, response)
+    return response
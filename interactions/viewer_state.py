@@ -0,0 +1,95 @@
+from django.db.models import Count, Exists, OuterRef, Subquery
+
+from users.follows import is_following_many
+from users.models import Follow
+from .models import Comment, Like, View
+from .reactions import DISLIKE, LIKE
+
+
+def attach_viewer_state(videos, viewer):
+    """Mark a page of videos with what the viewer has done to each one.
+
+    Sets viewer_reaction ('like', 'dislike' or None), viewer_follows_creator
+    and viewer_watched on every video, using one query per kind of state
+    however long the page is (and none for anonymous viewers). Returns the
+    videos as a list so templates reuse the marked instances.
+    """
+    videos = list(videos)
+    reactions, following, watched = {}, set(), set()
+    if viewer.is_authenticated and videos:
+        video_ids = [video.pk for video in videos]
+        reactions = dict(
+            Like.objects.filter(user=viewer, video_id__in=video_ids).values_list('video_id', 'is_like')
+        )
+        following = is_following_many(viewer, {video.user_id for video in videos})
+        watched = set(
+            View.objects.filter(user=viewer, video_id__in=video_ids)
+            .values_list('video_id', flat=True)
+            .distinct()
+        )
+
+    for video in videos:
+        is_like = reactions.get(video.pk)
+        video.viewer_reaction = None if is_like is None else LIKE if is_like else DISLIKE
+        video.viewer_follows_creator = video.user_id in following
+        video.viewer_watched = video.pk in watched
+    return videos
+
+
+def viewer_state_annotations(viewer):
+    """attach_viewer_state's marks as annotations on a Video query, read with the rows.
+
+    viewer_is_like is the Like.is_like of the viewer's reaction (None for
+    none); anonymous viewers get no annotations.
+    """
+    if not viewer.is_authenticated:
+        return {}
+    return {
+        'viewer_is_like': Subquery(Like.objects.filter(user=viewer, video=OuterRef('pk')).values('is_like')[:1]),
+        'viewer_follows_creator': Exists(Follow.objects.filter(follower=viewer, followee=OuterRef('user_id'))),
+        'viewer_watched': Exists(View.objects.filter(user=viewer, video=OuterRef('pk'))),
+    }
+
+
+def attach_viewer_state_to_page(page, viewer):
+    """attach_viewer_state for a Paginator page, keeping the page usable in templates"""
+    page.object_list = attach_viewer_state(page.object_list, viewer)
+    return page
+
+
+# Attribute set by attach_counts -> the model counted per video
+CARD_TOTALS = {'view_total': View, 'comment_total': Comment}
+
+
+def attach_counts(videos, names=tuple(CARD_TOTALS)):
+    """Set view_total and comment_total on a page of videos, one grouped query each.
+
+    Cards read these instead of video.views.count and video.comment_count,
+    which would cost two queries per card. Pass names to set only some of
+    them. Returns the videos as a list.
+    """
+    videos = list(videos)
+    totals = {}
+    if videos:
+        video_ids = [video.pk for video in videos]
+        for name in names:
+            model = CARD_TOTALS[name]
+            totals[name] = dict(
+                model.objects.filter(video_id__in=video_ids)
+                .values('video_id').annotate(total=Count('pk')).values_list('video_id', 'total')
+            )
+    for video in videos:
+        for name, counts in totals.items():
+            setattr(video, name, counts.get(video.pk, 0))
+    return videos
+
+
+def attach_card_state(videos, viewer):
+    """Everything a feed card shows beyond the row itself: counts plus the viewer's state"""
+    return attach_counts(attach_viewer_state(videos, viewer))
+
+
+def attach_card_state_to_page(page, viewer):
+    """attach_card_state for a Paginator page, keeping the page usable in templates"""
+    page.object_list = attach_card_state(page.object_list, viewer)
+    return page
@@ -1,43 +1,57 @@
-from django.shortcuts import redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
+from asgiref.sync import sync_to_async
 from videos.models import Video
-from .models import Like, Comment, View
-from django.http import JsonResponse
+from videos.views import can_view_video
+from .live import live_counters
+from .reactions import CLEAR, DISLIKE, LIKE, REACTIONS, react
+from .view_dedup import count_view, remember_views
+from .models import Comment, View
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, StreamingHttpResponse,
+)
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
 
+# The interaction endpoints are tiny and I/O-bound, so they are async views:
+# under ASGI they wait on the database without holding a worker thread.
+
+REACTION_ACTIONS = {LIKE: 'liked', DISLIKE: 'disliked', CLEAR: 'cleared'}
+
+@require_POST
 @login_required
-def like_video(request, video_id):
-    video = get_object_or_404(Video, id=video_id)
-    like, created = Like.objects.get_or_create(
-        user=request.user,
-        video=video,
-        defaults={'is_like': True}
-    )
-    
-    if not created:
-        if like.is_like:
-            like.delete()
-            action = 'unliked'
-        else:
-            like.is_like = True
-            like.save()
-            action = 'liked'
-    else:
-        action = 'liked'
+async def like_video(request, video_id):
+    reaction = request.POST.get('reaction', LIKE)
+    if reaction not in REACTIONS:
+        return HttpResponseBadRequest('Unknown reaction')
+    user = await request.auser()
+    try:
+        counts = await sync_to_async(react)(user.pk, video_id, reaction)
+    except Video.DoesNotExist:
+        raise Http404('No Video matches the given query.')
+    action = REACTION_ACTIONS[reaction]
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({
             'status': 'success',
             'action': action,
-            'like_count': video.like_count,
+            'reaction': reaction,
+            'like_count': counts['like_count'],
+            'dislike_count': counts['dislike_count'],
         })
     
-    messages.success(request, f'You {action} the video.')
+    if reaction == CLEAR:
+        messages.success(request, 'Your reaction was removed.')
+    else:
+        messages.success(request, f'You {action} the video.')
     return redirect('videos:watch', video_id=video_id)
 
 @login_required
-def add_comment(request, video_id):
-    video = get_object_or_404(Video, id=video_id)
+async def add_comment(request, video_id):
+    user = await request.auser()
+    video = await aget_object_or_404(Video, id=video_id)
     if request.method == 'POST':
         text = request.POST.get('text')
         parent_id = request.POST.get('parent_id')
@@ -45,10 +59,10 @@ def add_comment(request, video_id):
         if text:
             parent = None
             if parent_id:
-                parent = Comment.objects.get(id=parent_id)
+                parent = await aget_object_or_404(Comment, id=parent_id, video=video)
             
-            Comment.objects.create(
-                user=request.user,
+            await Comment.objects.acreate(
+                user=user,
                 video=video,
                 text=text,
                 parent=parent
@@ -65,19 +79,42 @@ def delete_comment(request, comment_id):
     messages.success(request, 'Comment deleted successfully!')
     return redirect('videos:watch', video_id=video_id)
 
-def record_view(request, video_id):
-    video = get_object_or_404(Video, id=video_id)
-    if request.user.is_authenticated:
-        viewer = request.user
-    else:
-        viewer = None
-    
-    View.objects.create(user=viewer, video=video)
+@never_cache
+async def record_view(request, video_id):
+    user = await request.auser()
+    video = await aget_object_or_404(Video, id=video_id)
+    await sync_to_async(count_view)(request, user, video)
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        return JsonResponse({
+        response = JsonResponse({
             'status': 'success',
-            'view_count': video.views.count(),
+            'view_count': await video.views.acount(),
         })
-    
-    return redirect('videos:watch', video_id=video_id)
+    else:
+        response = redirect('videos:watch', video_id=video_id)
+    return remember_views(request, response)
+
+async def video_counts(video_id):
+    return {
+        'likes': await Video.objects.filter(pk=video_id).values_list('like_count', flat=True).aget(),
+        'views': await View.objects.filter(video_id=video_id).acount(),
+        'comments': await Comment.objects.filter(video_id=video_id).acount(),
+    }
+
+async def live_counts(request, video_id):
+    """Server-sent events stream of a video's like, view and comment counts"""
+    if settings.SERVER_MODE != 'asgi':
+        # A WSGI worker would be tied up for the life of the stream; 204 stops EventSource reconnecting
+        return HttpResponse(status=204)
+    user = await request.auser()
+    video = await aget_object_or_404(Video.objects.select_related('user'), id=video_id)
+    if not await sync_to_async(can_view_video)(user, video):
+        return HttpResponseForbidden()
+
+    response = StreamingHttpResponse(
+        live_counters.stream(video.pk, video_counts),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # let nginx pass events straight through
+    return response
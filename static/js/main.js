@@ -25,6 +25,13 @@ document.addEventListener('DOMContentLoaded', function() {
                     const icon = button.querySelector('i');
                     const countElement = button.querySelector('span') || button.nextElementSibling;
                     
+                    // Next click undoes this one
+                    const reactionInput = form.querySelector('input[name="reaction"]');
+                    if (reactionInput) {
+                        reactionInput.value = data.action === 'liked' ? 'clear' : 'like';
+                    }
+                    button.classList.toggle('liked', data.action === 'liked');
+                    
                     // Update button appearance
                     if (data.action === 'liked') {
                         button.classList.remove('btn-outline-danger');
@@ -37,7 +44,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     
                     // Update like count if element exists
                     if (countElement) {
-                        countElement.textContent =  ;
+                        countElement.textContent = data.like_count;
                     }
                     
                     // Remove animation class after it completes
@@ -0,0 +1,40 @@
+// Profile picture preview
+document.getElementById('id_profile_pic').addEventListener('change', function(e) {
+    const [file] = e.target.files;
+    if (file) {
+        const reader = new FileReader();
+        reader.onload = function(e) {
+            document.getElementById('profile-pic-preview').src = e.target.result;
+            // Show remove button if it exists
+            const removeBtn = document.getElementById('remove-profile-pic');
+            if (removeBtn) removeBtn.style.display = 'inline-block';
+        }
+        reader.readAsDataURL(file);
+    }
+});
+
+// Remove profile picture
+document.getElementById('remove-profile-pic')?.addEventListener('click', function() {
+    document.getElementById('id_profile_pic').value = '';
+    const preview = document.getElementById('profile-pic-preview');
+    preview.src = preview.dataset.defaultSrc;
+    this.style.display = 'none';
+});
+
+// Character counter for bio
+const bioField = document.getElementById('id_bio');
+if (bioField) {
+    const charCounter = document.createElement('small');
+    charCounter.className = 'text-muted float-end';
+    charCounter.textContent = `${bioField.value.length}/150`;
+    bioField.parentNode.appendChild(charCounter);
+
+    bioField.addEventListener('input', function() {
+        charCounter.textContent = `${this.value.length}/150`;
+        if (this.value.length > 150) {
+            charCounter.classList.add('text-danger');
+        } else {
+            charCounter.classList.remove('text-danger');
+        }
+    });
+}
@@ -0,0 +1,18 @@
+// Avatar preview in modal
+document.getElementById('avatarInput')?.addEventListener('change', function(e) {
+    const [file] = e.target.files;
+    if (file) {
+        document.getElementById('avatarPreview').src = URL.createObjectURL(file);
+    }
+});
+
+// Video hover effect enhancement
+document.querySelectorAll('.video-card').forEach(card => {
+    card.addEventListener('mouseenter', function() {
+        this.querySelector('.thumbnail-image').style.transform = 'scale(1.05)';
+    });
+
+    card.addEventListener('mouseleave', function() {
+        this.querySelector('.thumbnail-image').style.transform = 'scale(1)';
+    });
+});
@@ -0,0 +1,7 @@
+// Profile picture preview
+document.getElementById('profile_pic').addEventListener('change', function(e) {
+    const [file] = e.target.files;
+    if (file) {
+        document.getElementById('profile-pic-preview').src = URL.createObjectURL(file);
+    }
+});
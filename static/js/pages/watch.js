@@ -0,0 +1,146 @@
+// Video Player Controls
+document.addEventListener('DOMContentLoaded', function() {
+    const video = document.getElementById('main-video');
+    const playPauseBtn = document.querySelector('.play-pause-btn');
+    const progressBar = document.querySelector('.video-progress-bar');
+    const progressContainer = document.querySelector('.video-progress-container');
+    const timeDisplay = document.querySelector('.video-time-display');
+    const currentTimeDisplay = timeDisplay.querySelector('.current-time');
+    const durationDisplay = timeDisplay.querySelector('.duration');
+    const fullscreenBtn = document.querySelector('.fullscreen-btn');
+
+    // Play/Pause toggle
+    playPauseBtn.addEventListener('click', function() {
+        if (video.paused) {
+            video.play();
+            this.innerHTML = '<i class="fas fa-pause"></i>';
+        } else {
+            video.pause();
+            this.innerHTML = '<i class="fas fa-play"></i>';
+        }
+    });
+
+    // Update progress bar
+    video.addEventListener('timeupdate', function() {
+        const percent = (video.currentTime / video.duration) * 100;
+        progressBar.style.width = `${percent}%`;
+
+        // Update time display
+        currentTimeDisplay.textContent = formatTime(video.currentTime);
+        durationDisplay.textContent = formatTime(video.duration);
+    });
+
+    // Click on progress bar to seek
+    progressContainer.addEventListener('click', function(e) {
+        const pos = (e.pageX - this.offsetLeft) / this.offsetWidth;
+        video.currentTime = pos * video.duration;
+    });
+
+    // Fullscreen toggle
+    fullscreenBtn.addEventListener('click', function() {
+        if (!document.fullscreenElement) {
+            video.requestFullscreen().catch(err => {
+                console.error(`Error attempting to enable fullscreen: ${err.message}`);
+            });
+        } else {
+            document.exitFullscreen();
+        }
+    });
+
+    // Format time as MM:SS
+    function formatTime(seconds) {
+        const minutes = Math.floor(seconds / 60);
+        const secs = Math.floor(seconds % 60);
+        return `${minutes}:${secs < 10 ? '0' : ''}${secs}`;
+    }
+
+    // Show duration when metadata is loaded
+    video.addEventListener('loadedmetadata', function() {
+        durationDisplay.textContent = formatTime(video.duration);
+    });
+
+    // Reply button functionality
+    document.querySelectorAll('.btn-reply').forEach(btn => {
+        btn.addEventListener('click', function() {
+            const commentId = this.getAttribute('data-comment-id');
+            document.getElementById(`reply-form-${commentId}`).style.display = 'block';
+        });
+    });
+
+    // Cancel reply button functionality
+    document.querySelectorAll('.btn-cancel-reply').forEach(btn => {
+        btn.addEventListener('click', function() {
+            const commentId = this.getAttribute('data-comment-id');
+            document.getElementById(`reply-form-${commentId}`).style.display = 'none';
+        });
+    });
+
+    // Live counters pushed by the server (coalesced to at most one update a second)
+    const pageContainer = document.querySelector('.video-page-container');
+    if (window.EventSource && pageContainer.dataset.liveUrl) {
+        const liveCounts = new EventSource(pageContainer.dataset.liveUrl);
+        liveCounts.addEventListener('counts', function(e) {
+            const counts = JSON.parse(e.data);
+            document.querySelectorAll('.like-count').forEach(el => el.textContent = counts.likes);
+            document.querySelectorAll('.view-count').forEach(el => el.textContent = counts.views);
+            document.querySelectorAll('.comment-count').forEach(el => el.textContent = counts.comments);
+        });
+        window.addEventListener('pagehide', () => liveCounts.close());
+    }
+
+    // Views are reported by the page so it can come from a cache (or a 304)
+    // and still count; the reply also refreshes the view total it shows.
+    fetch(pageContainer.dataset.viewUrl, {
+        headers: {'X-Requested-With': 'XMLHttpRequest'},
+        credentials: 'same-origin'
+    })
+        .then(response => response.json())
+        .then(data => {
+            document.querySelectorAll('.view-count').forEach(el => el.textContent = data.view_count);
+        })
+        .catch(() => {});
+
+    // Add pulse animation to video container
+    const videoContainer = document.querySelector('.video-player-container');
+    setInterval(() => {
+        videoContainer.classList.toggle('pulse');
+    }, 3000);
+});
+
+// Copy share link
+function copyShareLink() {
+    const shareLink = document.getElementById('shareLink');
+    shareLink.select();
+    shareLink.setSelectionRange(0, 99999);
+    document.execCommand('copy');
+
+    // Show tooltip or notification
+    const copyBtn = document.querySelector('.btn-copy');
+    const originalText = copyBtn.innerHTML;
+    copyBtn.innerHTML = '<i class="fas fa-check"></i> Copied!';
+    copyBtn.classList.add('liked');
+
+    setTimeout(() => {
+        copyBtn.innerHTML = originalText;
+        copyBtn.classList.remove('liked');
+    }, 2000);
+}
+
+// Auto-play videos when they come into view (for sidebar videos)
+document.addEventListener('DOMContentLoaded', function() {
+    const videos = document.querySelectorAll('.thumbnail-img');
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.play();
+            } else {
+                entry.target.pause();
+            }
+        });
+    }, { threshold: 0.5 });
+
+    videos.forEach(video => {
+        observer.observe(video);
+    });
+});
@@ -1,20 +1,23 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from core.admin import RetiringAdminMixin
+from .deletion import retire_account
 from .models import CustomUser
 from .forms import CustomUserCreationForm, CustomUserChangeForm
 
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(RetiringAdminMixin, UserAdmin):
+    retire = staticmethod(retire_account)
     add_form = CustomUserCreationForm
     form = CustomUserChangeForm
     model = CustomUser
-    list_display = ('username', 'email', 'user_type', 'is_staff')
-    list_filter = ('user_type', 'is_staff', 'is_superuser')
+    list_display = ('username', 'email', 'user_type', 'follower_count', 'is_staff')
+    list_filter = ('user_type', 'is_staff', 'is_superuser', 'is_active')
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
         ('Personal info', {'fields': ('first_name', 'last_name', 'email', 'profile_pic', 'bio', 'website')}),
         ('Permissions', {'fields': ('user_type', 'is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
         ('Important dates', {'fields': ('last_login', 'date_joined')}),
-        ('Social', {'fields': ('followers',)}),
+        ('Social', {'fields': ('follower_count', 'following_count')}),
     )
     add_fieldsets = (
         (None, {
@@ -24,5 +27,6 @@ class CustomUserAdmin(UserAdmin):
     )
     search_fields = ('username', 'email')
     ordering = ('username',)
+    readonly_fields = ('follower_count', 'following_count')
 
-admin.site.register(CustomUser, CustomUserAdmin)
+admin.site.register(CustomUser, CustomUserAdmin)
\ No newline at end of file
@@ -0,0 +1,83 @@
+import time
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from core.bulk import delete_in_batches
+from core.images import delete_image
+from core.page_cache import purge_on_commit
+from interactions.models import Comment, DailyFollowerActivity, Like, View
+from videos.deletion import REAP_BATCH_SIZE, reap_video, retire_video
+from videos.models import Video, adjust_tag_counts
+from .models import CustomUser, Follow, adjust_follow_counts
+
+
+def retire_account(user):
+    """Deactivate an account and take its profile and videos off the site at once.
+
+    The user can no longer sign in (their sessions stop resolving too) and
+    their videos leave every listing; their likes, comments and follows
+    stay until manage.py reap_deleted works through them. Returns False if
+    the account was already retired.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if not CustomUser.objects.filter(pk=user.pk, deleted_at__isnull=True).update(deleted_at=now, is_active=False):
+            return False
+        videos = Video.objects.filter(user_id=user.pk)
+        # One UPDATE per distinct count rather than one per video
+        uses = (
+            Video.tags.through.objects.filter(video__in=videos.filter(visibility='public'))
+            .values('tag_id').annotate(videos=Count('pk')).values_list('tag_id', 'videos')
+        )
+        by_count = {}
+        for tag_id, count in uses:
+            by_count.setdefault(count, []).append(tag_id)
+        for count, tag_ids in by_count.items():
+            adjust_tag_counts(tag_ids, -count)
+        # The stats row goes with the account, so it is not adjusted
+        videos.update(deleted_at=now)
+        purge_on_commit(f'user:{user.pk}', 'feed')
+    return True
+
+
+def reap_account(user, batch_size=REAP_BATCH_SIZE, pause=0.0):
+    """Delete a retired account's videos, interactions and follows in short batches, then the account"""
+    while video := Video.all_objects.filter(user_id=user.pk).first():
+        if video.deleted_at is None:
+            # Uploaded while the account was being retired
+            retire_video(video)
+            video.refresh_from_db(fields=['deleted_at'])
+        reap_video(video, batch_size, pause)
+
+    # Likes and comments on other creators' videos go through their
+    # receivers, which keep those videos' counters right
+    delete_in_batches(Like.objects.filter(user_id=user.pk), batch_size, pause, signals=True)
+    delete_in_batches(Comment.objects.filter(user_id=user.pk).order_by('-pk'), batch_size, pause, signals=True)
+    # Views are kept, anonymously, as they still count for the videos
+    views = View.objects.filter(user_id=user.pk)
+    while keys := list(views.values_list('pk', flat=True)[:batch_size]):
+        View.objects.filter(pk__in=keys).update(user=None)
+        if pause:
+            time.sleep(pause)
+
+    # Follow rows have no delete receivers; release the other side's counter per batch
+    delete_in_batches(
+        Follow.objects.filter(follower_id=user.pk), batch_size, pause,
+        on_batch=lambda keys: adjust_follow_counts(
+            'follower_count', Follow.objects.filter(pk__in=keys).values_list('followee_id', flat=True), -1,
+        ),
+    )
+    delete_in_batches(
+        Follow.objects.filter(followee_id=user.pk), batch_size, pause,
+        on_batch=lambda keys: adjust_follow_counts(
+            'following_count', Follow.objects.filter(pk__in=keys).values_list('follower_id', flat=True), -1,
+        ),
+    )
+    delete_in_batches(DailyFollowerActivity.objects.filter(creator_id=user.pk), batch_size, pause)
+
+    if user.profile_pic.name != CustomUser._meta.get_field('profile_pic').default:
+        # The default picture and its variants are shared by every account
+        delete_image(user, 'profile_pic')
+    user.delete()
@@ -0,0 +1,77 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import CustomUser, Follow, adjust_follow_counts
+
+
+def is_following(viewer, creator):
+    """Whether viewer follows creator"""
+    if not viewer.is_authenticated or viewer.pk == creator.pk:
+        return False
+    return Follow.objects.filter(follower=viewer, followee=creator).exists()
+
+
+def is_following_many(viewer, creator_ids):
+    """Return the subset of creator_ids that viewer follows, in one query"""
+    creator_ids = set(creator_ids)
+    if not viewer.is_authenticated or not creator_ids:
+        return set()
+    return set(
+        Follow.objects.filter(follower=viewer, followee_id__in=creator_ids)
+        .values_list('followee_id', flat=True)
+    )
+
+
+def follow(follower, followee):
+    """Make follower follow followee; returns False if it was already the case"""
+    if follower.pk == followee.pk:
+        return False
+    try:
+        with transaction.atomic():
+            Follow.objects.create(follower=follower, followee=followee)
+            _adjust_counts(follower, followee, 1)
+    except IntegrityError:
+        # The edge already exists, possibly from a concurrent request
+        return False
+    return True
+
+
+def unfollow(follower, followee):
+    """Remove the follow edge; returns False if there was nothing to remove"""
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(follower=follower, followee=followee).delete()
+        if deleted:
+            _adjust_counts(follower, followee, -1)
+    return bool(deleted)
+
+
+def _adjust_counts(follower, followee, delta):
+    # Edges written here bypass the related manager, so m2m_changed does not
+    # fire and the counters are adjusted directly.
+    adjust_follow_counts('following_count', [follower.pk], delta)
+    adjust_follow_counts('follower_count', [followee.pk], delta)
+
+
+def toggle_follow(follower, followee):
+    """Follow or unfollow; returns True if follower now follows followee"""
+    if unfollow(follower, followee):
+        return False
+    follow(follower, followee)
+    return True
+
+
+def recount_follow_counts():
+    """Recompute the stored follower/following counters for every user, e.g. after bulk inserts"""
+    def edge_count(field):
+        return Coalesce(Subquery(
+            Follow.objects.filter(**{field: OuterRef('pk')})
+            .values(field)
+            .annotate(total=Count('id'))
+            .values('total')
+        ), 0)
+
+    CustomUser.objects.update(
+        follower_count=edge_count('followee'),
+        following_count=edge_count('follower'),
+    )
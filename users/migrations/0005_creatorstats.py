@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_creator_stats(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    CreatorStats = apps.get_model('users', 'CreatorStats')
+    Video = apps.get_model('videos', 'Video')
+    View = apps.get_model('interactions', 'View')
+
+    user_ids = CustomUser.objects.values_list('pk', flat=True)
+    CreatorStats.objects.bulk_create(
+        [CreatorStats(user_id=user_id) for user_id in user_ids.iterator(chunk_size=2000)],
+        batch_size=2000, ignore_conflicts=True,
+    )
+
+    def total(queryset, aggregate):
+        return Coalesce(Subquery(
+            queryset.values('user_id').annotate(total=aggregate).values('total')
+        ), 0)
+
+    videos = Video.objects.filter(user_id=OuterRef('user_id'))
+    CreatorStats.objects.update(
+        video_count=total(videos, Count('pk')),
+        public_video_count=total(videos.filter(visibility='public'), Count('pk')),
+        like_count=total(videos, Sum('like_count')),
+        view_count=Coalesce(Subquery(
+            View.objects.filter(video__user_id=OuterRef('user_id'))
+            .values('video__user_id').annotate(total=Count('pk')).values('total')
+        ), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_customuser_profile_pic_variants'),
+        ('videos', '0006_video_thumbnail_variants'),
+        ('interactions', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreatorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('video_count', models.PositiveIntegerField(default=0)),
+                ('public_video_count', models.PositiveIntegerField(default=0)),
+                ('view_count', models.PositiveBigIntegerField(default=0)),
+                ('like_count', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_creator_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_creatorstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['created_at'], name='follow_created_idx'),
+        ),
+    ]
@@ -1,8 +1,12 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_save, pre_delete
 from django.dispatch import receiver
+from core.images import AVATAR, ResponsiveImage, needs_variants, variant_worker
+from core.page_cache import purge_on_commit
 import os
 
 def profile_pic_upload_path(instance, filename):
@@ -27,40 +31,151 @@ class CustomUser(AbstractUser):
         null=True,
         default='profile_pics/default.png'
     )
+    # Sized WebP/JPEG copies of the profile picture, built by core.images
+    profile_pic_variants = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(blank=True)
     followers = models.ManyToManyField(
         'self',
+        through='Follow',
+        through_fields=('followee', 'follower'),
         symmetrical=False,
         blank=True,
         related_name='following'
     )
+    # Denormalized follow-graph counters, kept in sync by update_follow_counts
+    follower_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
     website = models.URLField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by users.deletion.retire_account, which also deactivates the
+    # account; manage.py reap_deleted removes it and everything it made
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    IMAGE_VARIANTS = {'profile_pic': AVATAR}
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='user_retired_idx'),
+        ]
 
     def __str__(self):
         return self.username
 
     @property
-    def full_name(self):
-        return f'{self.first_name} {self.last_name}'.strip()
+    def profile_pic_image(self):
+        return ResponsiveImage(self.profile_pic, self.profile_pic_variants)
 
     @property
-    def follower_count(self):
-        return self.followers.count()
-
-    @property
-    def following_count(self):
-        return self.following.count()
+    def full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
 
     def get_profile_pic_url(self):
         if self.profile_pic and hasattr(self.profile_pic, 'url'):
             return self.profile_pic.url
         return '/static/images/default_profile.png'
 
+class Follow(models.Model):
+    follower = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='following_links')
+    followee = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='follower_links')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['follower', 'followee'], name='unique_follow'),
+        ]
+        indexes = [
+            models.Index(fields=['followee', '-created_at'], name='follow_followee_created_idx'),
+            # Follower-growth rollups count recent days across all creators
+            models.Index(fields=['created_at'], name='follow_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.follower.username} follows {self.followee.username}'
+
+class CreatorStats(models.Model):
+    """Running totals for a creator's profile header, kept current by adjust_creator_stats.
+
+    Followers are counted on CustomUser.follower_count. view_count is the
+    sum of the creator's daily rollup buckets, refreshed by each hourly
+    roll_up rather than per view, so it trails by up to an hour.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    video_count = models.PositiveIntegerField(default=0)
+    public_video_count = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveBigIntegerField(default=0)
+    like_count = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f'Stats for user {self.user_id}'
+
+def adjust_creator_stats(user_id, **deltas):
+    """Apply counter deltas to a creator's stats row in one UPDATE; user_id may be a subquery"""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if deltas:
+        CreatorStats.objects.filter(user_id=user_id).update(
+            **{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()}
+        )
+
+def adjust_follow_counts(field, user_ids, delta):
+    user_ids = list(user_ids)
+    if user_ids and delta:
+        CustomUser.objects.filter(pk__in=user_ids).update(**{field: Greatest(F(field) + delta, 0)})
+
+@receiver(m2m_changed, sender=Follow)
+def update_follow_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    # Forward (user.followers) edits have the followee as instance; reverse
+    # (user.following) edits have the follower as instance.
+    own_field, other_field = (
+        ('following_count', 'follower_count') if reverse
+        else ('follower_count', 'following_count')
+    )
+    if action == 'pre_clear':
+        related = instance.following if reverse else instance.followers
+        instance._cleared_follow_ids = list(related.values_list('id', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_follow_ids', [])
+        delta = -1
+    elif action in ('post_add', 'post_remove'):
+        delta = 1 if action == 'post_add' else -1
+    else:
+        return
+    if not pk_set:
+        return
+    adjust_follow_counts(own_field, [instance.pk], delta * len(pk_set))
+    adjust_follow_counts(other_field, pk_set, delta)
+
+@receiver(pre_delete, sender=CustomUser)
+def release_follow_counts(sender, instance, **kwargs):
+    # Follow rows cascade without m2m_changed, so fix the other side up front
+    adjust_follow_counts(
+        'following_count',
+        Follow.objects.filter(followee=instance).values_list('follower_id', flat=True),
+        -1,
+    )
+    adjust_follow_counts(
+        'follower_count',
+        Follow.objects.filter(follower=instance).values_list('followee_id', flat=True),
+        -1,
+    )
+
 @receiver(post_save, sender=CustomUser)
 def create_user_profile(sender, instance, created, **kwargs):
+    if not created:
+        # Watch pages show the creator's name and picture
+        purge_on_commit(f'user:{instance.pk}')
     if created and not instance.profile_pic:
         # Set default profile pic if none was provided
         instance.profile_pic = 'profile_pics/default.png'
-        instance.save()
\ No newline at end of file
+        instance.save()
+
+@receiver(post_save, sender=CustomUser)
+def create_creator_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CreatorStats.objects.get_or_create(user=instance)
+
+@receiver(post_save, sender=CustomUser)
+def schedule_profile_pic_variants(sender, instance, raw=False, **kwargs):
+    if not raw and needs_variants(instance, 'profile_pic'):
+        variant_worker.schedule(instance, 'profile_pic')
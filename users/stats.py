@@ -0,0 +1,67 @@
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from interactions.models import DailyVideoActivity
+from videos.models import Video
+from .models import CreatorStats, CustomUser
+
+
+def creator_totals(user_id):
+    """A creator's stats counted from scratch, as CreatorStats field values"""
+    totals = Video.objects.filter(user_id=user_id).aggregate(
+        video_count=Count('pk'),
+        public_video_count=Count('pk', filter=Q(visibility='public')),
+        like_count=Coalesce(Sum('like_count'), 0),
+    )
+    totals['view_count'] = DailyVideoActivity.objects.filter(creator_id=user_id).aggregate(
+        total=Coalesce(Sum('views'), 0))['total']
+    return totals
+
+
+def rolled_up_views(user_id):
+    """Subquery-ready sum of a creator's daily view buckets; user_id may be an OuterRef"""
+    return Coalesce(Subquery(
+        DailyVideoActivity.objects.filter(creator_id=user_id)
+        .values('creator_id').annotate(total=Sum('views')).values('total')
+    ), 0)
+
+
+def refresh_view_counts(user_ids):
+    """Set these creators' view_count to the sum of their daily view buckets"""
+    CreatorStats.objects.filter(user_id__in=user_ids).update(view_count=rolled_up_views(OuterRef('user_id')))
+
+
+def refresh_creator_stats(user_id):
+    """Recount one creator's stats row, creating it if missing, and return it"""
+    stats, _ = CreatorStats.objects.update_or_create(user_id=user_id, defaults=creator_totals(user_id))
+    return stats
+
+
+def get_creator_stats(user):
+    """user's stats row; counted and stored on first use for users the receivers never saw"""
+    try:
+        return user.stats
+    except CreatorStats.DoesNotExist:
+        return refresh_creator_stats(user.pk)
+
+
+def recount_creator_stats():
+    """Recompute every creator's stats from scratch (after bulk imports)"""
+    missing = CustomUser.objects.filter(stats__isnull=True).values_list('pk', flat=True)
+    CreatorStats.objects.bulk_create(
+        [CreatorStats(user_id=user_id) for user_id in missing.iterator(chunk_size=2000)],
+        batch_size=2000, ignore_conflicts=True,
+    )
+
+    def total(queryset, aggregate):
+        return Coalesce(Subquery(
+            queryset.values('user_id').annotate(total=aggregate).values('total')
+        ), 0)
+
+    videos = Video.objects.filter(user_id=OuterRef('user_id'))
+    CreatorStats.objects.update(
+        video_count=total(videos, Count('pk')),
+        public_video_count=total(videos.filter(visibility='public'), Count('pk')),
+        like_count=total(videos, Sum('like_count')),
+        view_count=rolled_up_views(OuterRef('user_id')),
+    )
@@ -1,3 +1,172 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from interactions.analytics import roll_up
+from interactions.models import View
+from videos.deletion import reap_video, retire_video
+from videos.models import Video, azure_storage
+from .follows import follow, recount_follow_counts, toggle_follow, unfollow
+from .models import CreatorStats, CustomUser, Follow, adjust_follow_counts
+
+PAGE_SIZE = 12
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ProfileGridTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = CustomUser.objects.create_user('creator', password='pw')
+        cls.videos = [
+            Video.objects.create(user=cls.creator, title=f'Video {index}', video_file=f'videos/{index}.mp4')
+            for index in range(PAGE_SIZE + 3)
+        ]
+        cls.hidden = Video.objects.create(user=cls.creator, title='Hidden', video_file='videos/h.mp4',
+                                          visibility='private')
+        # Half the grid was uploaded in one batch
+        Video.objects.filter(pk__in=[video.pk for video in cls.videos[::2]]).update(created_at=timezone.now())
+
+    def page(self, after=None):
+        url = reverse('users:profile', args=[self.creator.username])
+        response = self.client.get(url, {'after': after} if after else {})
+        self.assertEqual(response.status_code, 200)
+        return response.context['videos']
+
+    def test_grid_pages_through_every_visible_video(self):
+        first = self.page()
+        self.assertEqual(len(first), PAGE_SIZE)
+        self.assertTrue(first.has_next)
+        second = self.page(first.next_cursor)
+        self.assertFalse(second.has_next)
+        shown = [video.pk for video in list(first) + list(second)]
+        self.assertEqual(shown, list(
+            Video.objects.filter(visibility='public', user=self.creator).order_by('-created_at', '-pk')
+            .values_list('pk', flat=True)))
+        self.assertNotIn(self.hidden.pk, shown)
+
+    def test_owner_sees_private_videos(self):
+        self.client.force_login(self.creator)
+        first = self.page()
+        self.assertIn(self.hidden.pk, [video.pk for video in first] + [video.pk for video in self.page(first.next_cursor)])
+
+
+class CreatorViewTotalTests(TestCase):
+    """The profile's view total is summed from the rollups, not bumped per view"""
+
+    def setUp(self):
+        self.creator = CustomUser.objects.create_user('creator', password='pw')
+        self.video = Video.objects.create(user=self.creator, title='Clip', video_file='videos/clip.mp4')
+
+    def view_count(self):
+        return CreatorStats.objects.get(user=self.creator).view_count
+
+    def test_views_do_not_touch_the_stats_row(self):
+        with self.assertNumQueries(1):
+            View.objects.create(video=self.video)
+        self.assertEqual(self.view_count(), 0)
+
+    def test_roll_up_sets_the_total(self):
+        for _ in range(3):
+            View.objects.create(video=self.video)
+        roll_up()
+        self.assertEqual(self.view_count(), 3)
+        View.objects.create(video=self.video)
+        roll_up()
+        self.assertEqual(self.view_count(), 4)
+
+    def test_old_days_still_count(self):
+        View.objects.create(video=self.video)
+        View.objects.filter(video=self.video).update(created_at=timezone.now() - timedelta(days=30))
+        roll_up(since=timezone.now() - timedelta(days=31))
+        View.objects.create(video=self.video)
+        roll_up()
+        self.assertEqual(self.view_count(), 2)
+
+    def test_reaping_releases_the_views(self):
+        other = Video.objects.create(user=self.creator, title='Other', video_file='videos/other.mp4')
+        View.objects.create(video=self.video)
+        View.objects.create(video=other)
+        roll_up()
+        retire_video(self.video)
+        with mock.patch.object(azure_storage, 'delete'):
+            reap_video(self.video)
+        self.assertEqual(self.view_count(), 1)
+        roll_up()
+        self.assertEqual(self.view_count(), 1)
+
+    def test_deleting_a_video_releases_its_views(self):
+        View.objects.create(video=self.video)
+        roll_up()
+        self.video.delete()
+        self.assertEqual(self.view_count(), 0)
+
+
+class FollowCountTests(TestCase):
+    """follower_count/following_count track the Follow edges, and match a recount"""
+
+    def setUp(self):
+        self.alice, self.bob, self.carol = (
+            CustomUser.objects.create_user(name, password='pw') for name in ('alice', 'bob', 'carol')
+        )
+
+    def assertCounts(self, expected):
+        def counts():
+            return {
+                user.username: (user.follower_count, user.following_count)
+                for user in CustomUser.objects.filter(pk__in=[self.alice.pk, self.bob.pk, self.carol.pk])
+            }
+        self.assertEqual(counts(), expected)
+        recount_follow_counts()
+        self.assertEqual(counts(), expected)
+
+    def test_follow_and_unfollow(self):
+        self.assertTrue(follow(self.alice, self.bob))
+        self.assertTrue(follow(self.carol, self.bob))
+        self.assertCounts({'alice': (0, 1), 'bob': (2, 0), 'carol': (0, 1)})
+        self.assertTrue(unfollow(self.alice, self.bob))
+        self.assertCounts({'alice': (0, 0), 'bob': (1, 0), 'carol': (0, 1)})
+
+    def test_repeats_change_nothing(self):
+        follow(self.alice, self.bob)
+        self.assertFalse(follow(self.alice, self.bob))
+        self.assertFalse(follow(self.alice, self.alice))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertCounts({'alice': (0, 1), 'bob': (1, 0), 'carol': (0, 0)})
+        unfollow(self.alice, self.bob)
+        self.assertFalse(unfollow(self.alice, self.bob))
+        self.assertCounts({'alice': (0, 0), 'bob': (0, 0), 'carol': (0, 0)})
+
+    def test_toggle_follow(self):
+        self.assertTrue(toggle_follow(self.alice, self.bob))
+        self.assertCounts({'alice': (0, 1), 'bob': (1, 0), 'carol': (0, 0)})
+        self.assertFalse(toggle_follow(self.alice, self.bob))
+        self.assertCounts({'alice': (0, 0), 'bob': (0, 0), 'carol': (0, 0)})
+
+    def test_related_manager_edits(self):
+        self.bob.followers.add(self.alice, self.carol)
+        self.assertCounts({'alice': (0, 1), 'bob': (2, 0), 'carol': (0, 1)})
+        self.alice.following.add(self.carol)
+        self.assertCounts({'alice': (0, 2), 'bob': (2, 0), 'carol': (1, 1)})
+        self.bob.followers.remove(self.carol)
+        self.assertCounts({'alice': (0, 2), 'bob': (1, 0), 'carol': (1, 0)})
+        self.alice.following.clear()
+        self.assertCounts({'alice': (0, 0), 'bob': (0, 0), 'carol': (0, 0)})
+
+    def test_deleted_user_releases_counts(self):
+        follow(self.alice, self.bob)
+        follow(self.bob, self.carol)
+        self.bob.delete()
+        self.assertCounts({'alice': (0, 0), 'carol': (0, 0)})
+
+    def test_adjust_follow_counts_never_goes_negative(self):
+        adjust_follow_counts('follower_count', [self.alice.pk, self.bob.pk], 2)
+        adjust_follow_counts('follower_count', [self.alice.pk], -5)
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual((self.alice.follower_count, self.bob.follower_count), (0, 2))
+        with self.assertNumQueries(0):
+            adjust_follow_counts('follower_count', [], 1)
+            adjust_follow_counts('follower_count', [self.alice.pk], 0)
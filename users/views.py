@@ -2,9 +2,22 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import condition
+from .follows import is_following, toggle_follow
 from .forms import CustomUserChangeForm, SignUpForm
-from .models import CustomUser
+from .models import CustomUser, Follow
+from .stats import get_creator_stats
 from videos.models import Video
+from videos.visibility import visible_to
+from core.conditional import card_rows, card_versions, make_etag
+from core.keyset import keyset_page
+from core.routers import replica_reads
+from interactions.viewer_state import attach_card_state_to_page
+
+PROFILE_PAGE_SIZE = 12
 
 def signup(request):
     if request.method == 'POST':
@@ -37,15 +50,45 @@ def logout_view(request):
     messages.success(request, 'Logged out successfully!')
     return redirect('core:home')
 
+def profile_videos(request, user):
+    return Video.objects.filter(visible_to(request.user), user=user)
+
+def profile_etag(request, username):
+    following = Follow.objects.filter(follower_id=request.user.pk, followee=OuterRef('pk'))
+    user = (
+        CustomUser.objects.filter(username=username, deleted_at__isnull=True)
+        .select_related('stats')
+        .only('updated_at', 'follower_count', 'following_count',
+              'stats__video_count', 'stats__public_video_count', 'stats__like_count')
+        .annotate(viewer_follows=Exists(following))
+        .first()
+    )
+    if user is None:
+        return None
+    stats = get_creator_stats(user)
+    videos = keyset_page(card_rows(profile_videos(request, user), request.user), request.GET.get('after'), PROFILE_PAGE_SIZE)
+    # View totals are left out, as for cards: they would change on every request
+    return make_etag(
+        request, user.pk, user.updated_at, user.follower_count, user.following_count,
+        stats.video_count, stats.public_video_count, stats.like_count,
+        user.viewer_follows and user.pk != request.user.pk, videos.next_cursor,
+        card_versions(videos),
+    )
+
+@replica_reads
+@condition(etag_func=profile_etag)
 def profile(request, username):
-    user = get_object_or_404(CustomUser, username=username)
-    videos = Video.objects.filter(user=user, visibility='public').order_by('-created_at')
-    is_following = request.user.is_authenticated and request.user.following.filter(id=user.id).exists()
+    user = get_object_or_404(CustomUser, username=username, deleted_at__isnull=True)
+    videos = keyset_page(profile_videos(request, user), request.GET.get('after'), PROFILE_PAGE_SIZE)
     
     context = {
         'profile_user': user,
-        'videos': videos,
-        'is_following': is_following,
+        # Only read when the cached header fragment is rendered
+        'stats': SimpleLazyObject(lambda: get_creator_stats(user)),
+        'header_timeout': settings.PROFILE_HEADER_TIMEOUT,
+        'is_owner': request.user == user,
+        'videos': attach_card_state_to_page(videos, request.user),
+        'is_following': is_following(request.user, user),
     }
     return render(request, 'users/profile.html', context)
 
@@ -63,14 +106,12 @@ def edit_profile(request):
 
 @login_required
 def follow_user(request, username):
-    user_to_follow = get_object_or_404(CustomUser, username=username)
+    user_to_follow = get_object_or_404(CustomUser, username=username, deleted_at__isnull=True)
     if request.user == user_to_follow:
         messages.error(request, 'You cannot follow yourself.')
     else:
-        if request.user.following.filter(id=user_to_follow.id).exists():
-            request.user.following.remove(user_to_follow)
-            messages.success(request, f'You have unfollowed {username}.')
-        else:
-            request.user.following.add(user_to_follow)
+        if toggle_follow(request.user, user_to_follow):
             messages.success(request, f'You are now following {username}.')
+        else:
+            messages.success(request, f'You have unfollowed {username}.')
     return redirect('users:profile', username=username)
\ No newline at end of file
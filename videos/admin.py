@@ -1,8 +1,11 @@
 from django.contrib import admin
+from core.admin import RetiringAdminMixin
+from .deletion import retire_video
 from .models import Video, Tag
 
 @admin.register(Video)
-class VideoAdmin(admin.ModelAdmin):
+class VideoAdmin(RetiringAdminMixin, admin.ModelAdmin):
+    retire = staticmethod(retire_video)
     list_display = ('title', 'user', 'visibility', 'created_at')
     list_filter = ('visibility', 'created_at')
     search_fields = ('title', 'description', 'user__username')
@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.bulk import delete_in_batches
+from core.images import delete_image
+from core.page_cache import purge_on_commit
+from interactions.models import Comment, DailyVideoActivity, HourlyVideoActivity, Like, View
+from users.models import adjust_creator_stats
+from .models import Video, adjust_tag_counts
+
+REAP_BATCH_SIZE = 1000
+
+
+def retire_video(video):
+    """Take a video off the site at once, leaving its rows and files to the reaper.
+
+    One short transaction: the row is flagged (Video.objects stops
+    returning it) and the tag and creator counters its deletion would
+    move are released now; views are taken off the creator's total as the
+    reaper deletes the video's daily buckets. Returns False if the video was already retired.
+    """
+    with transaction.atomic():
+        current = (
+            Video.objects.select_for_update().filter(pk=video.pk)
+            .values('user_id', 'visibility', 'like_count').first()
+        )
+        if current is None:
+            return False
+        Video.objects.filter(pk=video.pk).update(deleted_at=timezone.now())
+        if current['visibility'] == 'public':
+            adjust_tag_counts(Video.tags.through.objects.filter(video_id=video.pk).values_list('tag_id', flat=True), -1)
+        adjust_creator_stats(
+            current['user_id'],
+            video_count=-1,
+            public_video_count=-int(current['visibility'] == 'public'),
+            like_count=-current['like_count'],
+        )
+        purge_on_commit(f'video:{video.pk}', 'feed')
+    return True
+
+
+def reap_video(video, batch_size=REAP_BATCH_SIZE, pause=0.0):
+    """Delete a retired video's dependent rows in short batches, then its files and the row itself.
+
+    Nothing outside the video reads these rows any more, so batches skip
+    the receivers. Interrupted runs pick up where they stopped.
+    """
+    def release_views(keys):
+        # The creator's view total is the sum of their daily buckets
+        views = DailyVideoActivity.objects.filter(pk__in=keys).aggregate(total=Sum('views'))['total']
+        adjust_creator_stats(video.user_id, view_count=-(views or 0))
+
+    for queryset, on_batch in (
+        (View.objects.filter(video_id=video.pk), None),
+        (Like.objects.filter(video_id=video.pk), None),
+        # Replies always have higher keys than what they answer, so
+        # newest-first batches never leave a reply pointing at a gone row
+        (Comment.objects.filter(video_id=video.pk).order_by('-pk'), None),
+        (HourlyVideoActivity.objects.filter(video_id=video.pk), None),
+        (DailyVideoActivity.objects.filter(video_id=video.pk), release_views),
+        (Video.tags.through.objects.filter(video_id=video.pk), None),
+    ):
+        delete_in_batches(queryset, batch_size, pause, on_batch=on_batch)
+
+    delete_image(video, 'thumbnail')
+    if video.video_file:
+        video.video_file.delete(save=False)
+    # Only empty relations are left to cascade
+    video.delete()
@@ -1,5 +1,6 @@
 from django import forms
-from .models import Video, Tag
+from .models import Video
+from .tagging import set_video_tags
 import os
 
 class VideoUploadForm(forms.ModelForm):
@@ -11,7 +12,9 @@ class VideoUploadForm(forms.ModelForm):
 
     class Meta:
         model = Video
-        fields = ['video_file', 'thumbnail', 'title', 'description', 'visibility', 'tags']
+        # tags is the free-text field above, saved by save() or the views
+        # through set_video_tags rather than as a ModelForm M2M field
+        fields = ['video_file', 'thumbnail', 'title', 'description', 'visibility']
         widgets = {
             'description': forms.Textarea(attrs={'rows': 3}),
         }
@@ -44,22 +47,7 @@ class VideoUploadForm(forms.ModelForm):
         return video_file
 
     def save(self, commit=True):
-        # First save the video instance
         video = super().save(commit=commit)
-        
-        # Process tags after the video is saved
-        tags_input = self.cleaned_data.get('tags', '')
-        if tags_input:
-            tag_names = [tag.strip() for tag in tags_input.split(',') if tag.strip()]
-            tags = []
-            for tag_name in tag_names:
-                tag, created = Tag.objects.get_or_create(
-                    name=tag_name.lower(),
-                    defaults={'slug': tag_name.lower().replace(' ', '-')}
-                )
-                tags.append(tag)
-            video.tags.set(tags)
-        else:
-            video.tags.clear()
-            
+        if commit:
+            set_video_tags(video, self.cleaned_data.get('tags', ''))
         return video
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:33
+
+import django.core.validators
+import storages.backends.azure_storage
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_tag_counts(apps, schema_editor):
+    Tag = apps.get_model('videos', 'Tag')
+    Video = apps.get_model('videos', 'Video')
+    through = Video.tags.through
+    counts = (
+        through.objects.filter(tag_id=OuterRef('pk'))
+        .values('tag_id')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Tag.objects.update(video_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='last_used_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='video_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='thumbnail',
+            field=models.ImageField(blank=True, max_length=200, null=True, storage=storages.backends.azure_storage.AzureStorage(), upload_to='thumbnails/'),
+        ),
+        migrations.AlterField(
+            model_name='video',
+            name='video_file',
+            field=models.FileField(max_length=200, storage=storages.backends.azure_storage.AzureStorage(), upload_to='videos/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['mp4', 'webm', 'avi', 'mov', 'mkv'])]),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-video_count', '-last_used_at'], name='tag_popularity_idx'),
+        ),
+        migrations.RunPython(backfill_tag_counts, migrations.RunPython.noop),
+    ]
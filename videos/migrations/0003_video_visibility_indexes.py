@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0002_tag_popularity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['visibility', '-created_at'], name='video_visibility_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['user', 'visibility', '-created_at'], name='video_user_vis_created_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:54
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_reaction_counts(apps, schema_editor):
+    Video = apps.get_model('videos', 'Video')
+    Like = apps.get_model('interactions', 'Like')
+
+    def counted(is_like):
+        return Coalesce(Subquery(
+            Like.objects.filter(video_id=OuterRef('pk'), is_like=is_like)
+            .values('video_id')
+            .annotate(total=Count('id'))
+            .values('total')
+        ), 0)
+
+    Video.objects.update(like_count=counted(True), dislike_count=counted(False))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0004_video_public_partial_index'),
+        ('interactions', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='dislike_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_reaction_counts, migrations.RunPython.noop),
+    ]
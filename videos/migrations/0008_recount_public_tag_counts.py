@@ -0,0 +1,29 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_tag_counts(apps, schema_editor):
+    Tag = apps.get_model('videos', 'Tag')
+    Video = apps.get_model('videos', 'Video')
+    counts = (
+        Video.tags.through.objects.filter(
+            tag_id=OuterRef('pk'), video__visibility='public', video__deleted_at__isnull=True,
+        )
+        .values('tag_id')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Tag.objects.update(video_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+    """Tag.video_count now counts only public videos on the site"""
+
+    dependencies = [
+        ('videos', '0007_video_deleted_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_tag_counts, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,18 @@
+from django.apps import apps
 from django.db import models
+from django.db.models import F, Subquery, Sum
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
 from django.utils.text import slugify
 from django.core.validators import FileExtensionValidator
 from storages.backends.azure_storage import AzureStorage  # Add this import
+from core.images import THUMBNAIL, ResponsiveImage, needs_variants, variant_worker
+from core.page_cache import purge_on_commit
+from users.models import adjust_creator_stats
 import uuid
 import os
 
@@ -14,6 +24,16 @@ azure_storage = AzureStorage()
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(unique=True)
+    # Public videos on the site with this tag, the ones a tag listing shows.
+    # Maintained by the receivers below so tag listings never need a COUNT
+    # over the video/tag through table.
+    video_count = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-video_count', '-last_used_at'], name='tag_popularity_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -23,6 +43,12 @@ class Tag(models.Model):
     def __str__(self):
         return self.name
 
+class VideoManager(models.Manager):
+    """Videos still on the site; retired ones wait for the reaper in Video.all_objects"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 class Video(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='videos')
@@ -43,6 +69,8 @@ class Video(models.Model):
         max_length=200,
         storage=azure_storage  # Add this line to use Azure Storage
     )
+    # Sized WebP/JPEG copies of the thumbnail, built by core.images
+    thumbnail_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True)
@@ -58,13 +86,31 @@ class Video(models.Model):
         ],
         default='public'
     )
+    # Kept current by interactions.reactions and the Like signal receivers
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    dislike_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set by videos.deletion.retire_video; the row, its views, likes and
+    # comments and its files are removed later by manage.py reap_deleted
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = VideoManager()
+    all_objects = models.Manager()
+
+    IMAGE_VARIANTS = {'thumbnail': THUMBNAIL}
 
     def __str__(self):
         return f'{self.title} by {self.user.username}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets update_creator_video_counts see visibility changes without a query
+        instance._saved_visibility = instance.__dict__.get('visibility')
+        return instance
+
     @property
-    def like_count(self):
-        return self.likes.filter(is_like=True).count()
+    def thumbnail_image(self):
+        return ResponsiveImage(self.thumbnail, self.thumbnail_variants)
 
     @property
     def comment_count(self):
@@ -72,3 +118,131 @@ class Video(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['visibility', '-created_at'], name='video_visibility_created_idx'),
+            models.Index(fields=['user', 'visibility', '-created_at'], name='video_user_vis_created_idx'),
+            # Anonymous feeds only ever read public rows newest-first
+            models.Index(fields=['-created_at'], condition=models.Q(visibility='public'), name='video_public_created_idx'),
+            models.Index(fields=['deleted_at'], condition=models.Q(deleted_at__isnull=False), name='video_retired_idx'),
+        ]
+
+
+def creator_of(video_id):
+    """Subquery for a video's user_id, so creator counters update in one statement"""
+    return Subquery(Video.objects.filter(pk=video_id).values('user_id')[:1])
+
+
+def tag_first_page_cache_key(tag_id):
+    return f'videos:tag:{tag_id}:first_page'
+
+
+def adjust_tag_counts(tag_ids, delta):
+    """Apply a video_count delta to many tags in one UPDATE and drop their cached pages"""
+    tag_ids = list(tag_ids)
+    if not tag_ids:
+        return
+    updates = {'video_count': Greatest(F('video_count') + delta, 0)}
+    if delta > 0:
+        updates['last_used_at'] = timezone.now()
+    Tag.objects.filter(pk__in=tag_ids).update(**updates)
+    cache.delete_many([tag_first_page_cache_key(tag_id) for tag_id in tag_ids])
+    purge_on_commit(*(f'tag:{tag_id}' for tag_id in tag_ids))
+
+
+def counts_toward_tags(video):
+    """Whether video is counted in its tags' video_count"""
+    return video.visibility == 'public' and video.deleted_at is None
+
+
+@receiver(m2m_changed, sender=Video.tags.through)
+def update_tag_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse and not counts_toward_tags(instance):
+        return  # video.tags changes on a video no tag listing shows
+
+    if action == 'pre_clear':
+        # pk_set is not provided for clear(), so remember what is about to go
+        if reverse:
+            instance._cleared_video_count = instance.videos.filter(visibility='public').count()
+        else:
+            instance._cleared_tag_ids = list(instance.tags.values_list('id', flat=True))
+        return
+
+    if action == 'post_clear':
+        if reverse:
+            adjust_tag_counts([instance.pk], -getattr(instance, '_cleared_video_count', 0))
+        else:
+            adjust_tag_counts(getattr(instance, '_cleared_tag_ids', []), -1)
+        return
+
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    delta = 1 if action == 'post_add' else -1
+    if reverse:
+        # tag.videos.add(...) / remove(...): one tag, many videos
+        adjust_tag_counts([instance.pk], delta * Video.objects.filter(pk__in=pk_set, visibility='public').count())
+    else:
+        adjust_tag_counts(pk_set, delta)
+
+
+@receiver(pre_delete, sender=Video)
+def release_video_tags(sender, instance, **kwargs):
+    if instance.deleted_at is not None:
+        return  # retire_video already did
+    # Cascade deletes of through rows do not fire m2m_changed; the saved
+    # visibility decides, as the instance's copy may be stale
+    adjust_tag_counts(
+        Video.tags.through.objects.filter(video_id=instance.pk, video__visibility='public')
+        .values_list('tag_id', flat=True),
+        -1,
+    )
+
+
+@receiver(post_save, sender=Video)
+def update_creator_video_counts(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    is_public = instance.visibility == 'public'
+    if created:
+        adjust_creator_stats(instance.user_id, video_count=1, public_video_count=int(is_public))
+    else:
+        was_public = getattr(instance, '_saved_visibility', None)
+        # None: loaded without the field, so whether it changed is unknown
+        if was_public is not None and (was_public == 'public') != is_public:
+            adjust_creator_stats(instance.user_id, public_video_count=1 if is_public else -1)
+            if instance.deleted_at is None:
+                adjust_tag_counts(instance.tags.values_list('id', flat=True), 1 if is_public else -1)
+    instance._saved_visibility = instance.visibility
+
+
+@receiver(pre_delete, sender=Video)
+def release_creator_stats(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        return  # the creator and their stats row are going too
+    if instance.deleted_at is not None:
+        return  # retire_video and the reaper already did
+    # Counters move by UPDATE, so the instance's own copies may be stale
+    current = Video.objects.filter(pk=instance.pk).values('visibility', 'like_count').first()
+    if current is not None:
+        # The creator's view total is their daily buckets summed (interactions.analytics)
+        days = apps.get_model('interactions', 'DailyVideoActivity').objects.filter(video_id=instance.pk)
+        adjust_creator_stats(
+            instance.user_id,
+            video_count=-1,
+            public_video_count=-int(current['visibility'] == 'public'),
+            like_count=-current['like_count'],
+            view_count=-(days.aggregate(total=Sum('views'))['total'] or 0),
+        )
+
+
+@receiver(post_save, sender=Video)
+def schedule_thumbnail_variants(sender, instance, raw=False, **kwargs):
+    if not raw and needs_variants(instance, 'thumbnail'):
+        variant_worker.schedule(instance, 'thumbnail')
+
+
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def purge_video_pages(sender, instance, **kwargs):
+    # Tag pages carry 'feed' too, so this covers every listing the video is on
+    purge_on_commit(f'video:{instance.pk}', 'feed')
@@ -0,0 +1,110 @@
+from django.core.cache import cache
+from django.core.paginator import Page
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.text import slugify
+
+from core.metrics import record_cache
+
+from .models import Tag, Video, tag_first_page_cache_key
+
+MAX_TAGS_PER_VIDEO = 5
+TAG_NAME_MAX_LENGTH = Tag._meta.get_field('name').max_length
+TAG_PAGE_SIZE = 12
+TAG_PAGE_CACHE_TIMEOUT = 300
+
+
+def normalize_tag_names(tags_input, limit=MAX_TAGS_PER_VIDEO):
+    """Split a comma-separated tag string into clean, unique, lower-case names"""
+    names = []
+    seen_slugs = set()
+    for raw in (tags_input or '').split(','):
+        name = ' '.join(raw.split()).lower()[:TAG_NAME_MAX_LENGTH].strip()
+        slug = slugify(name)
+        # Names that slugify to the same value would collide on Tag.slug,
+        # so the first spelling wins and later ones map onto it.
+        if not slug or slug in seen_slugs:
+            continue
+        seen_slugs.add(slug)
+        names.append(name)
+        if limit and len(names) >= limit:
+            break
+    return names
+
+
+def resolve_tags(names):
+    """Return Tag objects for the given normalized names, creating missing ones in bulk"""
+    if not names:
+        return []
+
+    slugs = {name: slugify(name) for name in names}
+    existing = list(Tag.objects.filter(Q(name__in=names) | Q(slug__in=slugs.values())))
+    by_name = {tag.name: tag for tag in existing}
+    by_slug = {tag.slug: tag for tag in existing}
+
+    missing = [
+        name for name in names
+        if name not in by_name and slugs[name] not in by_slug
+    ]
+    if missing:
+        # Concurrent uploads may insert the same tag first; ignore_conflicts
+        # plus a re-read by slug picks up whichever row won.
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=slugs[name]) for name in missing],
+            ignore_conflicts=True,
+        )
+        for tag in Tag.objects.filter(slug__in=[slugs[name] for name in missing]):
+            by_slug[tag.slug] = tag
+
+    tags = []
+    for name in names:
+        tag = by_name.get(name) or by_slug.get(slugs[name])
+        if tag is not None and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def set_video_tags(video, tags_input):
+    """Replace a video's tags from raw form input using a constant number of queries"""
+    tags = resolve_tags(normalize_tag_names(tags_input))
+    video.tags.set(tags)
+    return tags
+
+
+def recount_tag_video_counts():
+    """Recompute every Tag.video_count from the through table, e.g. after bulk inserts"""
+    counts = (
+        # Retired videos released their tags already, though the reaper
+        # may not have removed the through rows yet
+        Video.tags.through.objects.filter(
+            tag_id=OuterRef('pk'), video__visibility='public', video__deleted_at__isnull=True,
+        )
+        .values('tag_id')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Tag.objects.update(video_count=Coalesce(Subquery(counts), 0))
+
+
+def popular_tags():
+    """Tags ordered by the precomputed popularity index"""
+    return Tag.objects.filter(video_count__gt=0).order_by('-video_count', '-last_used_at', 'name')
+
+
+def get_tag_first_page(tag, paginator):
+    """Serve page 1 of a tag listing from cached video ids, skipping the COUNT and join"""
+    key = tag_first_page_cache_key(tag.pk)
+    cached = cache.get(key)
+    record_cache(cached is not None)
+    if cached is None:
+        page = paginator.page(1)
+        cache.set(key, {
+            'count': paginator.count,
+            'ids': [video.pk for video in page.object_list],
+        }, TAG_PAGE_CACHE_TIMEOUT)
+        return page
+
+    # count is a cached_property, so seeding it keeps the paginator from querying
+    paginator.count = cached['count']
+    videos = Video.objects.filter(visibility='public').select_related('user').in_bulk(cached['ids'])
+    return Page([videos[pk] for pk in cached['ids'] if pk in videos], 1, paginator)
@@ -1,3 +1,116 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from users.deletion import retire_account
+from users.models import CustomUser
+from .deletion import retire_video
+from .models import Tag, Video
+from .tagging import MAX_TAGS_PER_VIDEO, normalize_tag_names, recount_tag_video_counts, resolve_tags, set_video_tags
+
+
+class TagNameTests(TestCase):
+    def test_names_are_cleaned(self):
+        self.assertEqual(normalize_tag_names('  Dance ,, hip   HOP, ,music '), ['dance', 'hip hop', 'music'])
+        self.assertEqual(normalize_tag_names(''), [])
+        self.assertEqual(normalize_tag_names(None), [])
+
+    def test_names_sharing_a_slug_keep_the_first_spelling(self):
+        self.assertEqual(normalize_tag_names('Hip Hop, hip-hop, HIP  hop'), ['hip hop'])
+
+    def test_tag_limit(self):
+        names = normalize_tag_names(', '.join(f'tag{i}' for i in range(8)))
+        self.assertEqual(names, [f'tag{i}' for i in range(MAX_TAGS_PER_VIDEO)])
+        self.assertEqual(len(normalize_tag_names('a, b, c', limit=2)), 2)
+
+
+class ResolveTagsTests(TestCase):
+    def test_existing_tags_are_matched_by_name_or_slug(self):
+        existing = Tag.objects.create(name='hip-hop')
+        self.assertEqual(resolve_tags(['hip hop', 'hip-hop']), [existing])
+        self.assertEqual(Tag.objects.count(), 1)
+
+    def test_missing_tags_are_created_once(self):
+        first = resolve_tags(['dance', 'music'])
+        self.assertEqual([tag.slug for tag in first], ['dance', 'music'])
+        self.assertEqual(resolve_tags(['music', 'dance']), first[::-1])
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_query_count_does_not_grow_with_tags(self):
+        with self.assertNumQueries(3):
+            resolve_tags(['one'])
+        with self.assertNumQueries(3):
+            resolve_tags(['two', 'three', 'four', 'five', 'six'])
+        with self.assertNumQueries(1):
+            resolve_tags(['one', 'two', 'three', 'four', 'five'])
+
+    def test_setting_tags_costs_the_same_for_one_or_five(self):
+        creator = CustomUser.objects.create_user('creator', password='pw')
+        counts = []
+        for tags in ('solo', 'a, b, c, d, e'):
+            video = Video.objects.create(user=creator, title=tags, video_file='videos/clip.mp4')
+            with CaptureQueriesContext(connection) as queries:
+                set_video_tags(video, tags)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class TagVideoCountTests(TestCase):
+    """Tag.video_count counts the public videos on the site, and matches a recount"""
+
+    def setUp(self):
+        self.creator = CustomUser.objects.create_user('creator', password='pw')
+        self.public = self.upload('public')
+        self.private = self.upload('private')
+
+    def upload(self, visibility):
+        video = Video.objects.create(
+            user=self.creator, title=visibility, video_file='videos/clip.mp4', visibility=visibility,
+        )
+        set_video_tags(video, 'dance')
+        return video
+
+    def assertCount(self, expected):
+        tag = Tag.objects.get(slug='dance')
+        self.assertEqual(tag.video_count, expected)
+        recount_tag_video_counts()
+        tag.refresh_from_db()
+        self.assertEqual(tag.video_count, expected)
+
+    def test_only_public_videos_count(self):
+        self.assertCount(1)
+        set_video_tags(self.private, '')
+        self.assertCount(1)
+        set_video_tags(self.public, '')
+        self.assertCount(0)
+
+    def test_visibility_changes(self):
+        self.public.visibility = 'followers'
+        self.public.save()
+        self.assertCount(0)
+        self.private.visibility = 'public'
+        self.private.save()
+        self.assertCount(1)
+
+    def test_tag_side_changes(self):
+        tag = Tag.objects.get(slug='dance')
+        tag.videos.clear()
+        self.assertCount(0)
+        tag.videos.add(self.public, self.private)
+        self.assertCount(1)
+
+    def test_retired_and_deleted_videos(self):
+        retire_video(self.private)
+        self.assertCount(1)
+        retire_video(self.public)
+        self.assertCount(0)
+
+        video = self.upload('public')
+        self.assertCount(1)
+        video.delete()
+        self.assertCount(0)
+
+    def test_retired_accounts(self):
+        self.upload('public')
+        retire_account(self.creator)
+        self.assertCount(0)
@@ -9,5 +9,8 @@ urlpatterns = [
     path('edit/<uuid:video_id>/', views.edit_video, name='edit'),
     path('delete/<uuid:video_id>/', views.delete_video, name='delete'),
     path('search/', views.search, name='search'),
+    path('tags/', views.tag_directory, name='tags'),
     path('tag/<slug:tag_slug>/', views.videos_by_tag, name='tag'),
+    path('analytics/', views.creator_analytics, name='analytics'),
+    path('analytics/export/<slug:kind>/', views.export_analytics, name='export_analytics'),
 ]
@@ -1,18 +1,33 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import models
-from django.db.models import Count, Q
-from django.http import JsonResponse, HttpResponseForbidden
-from django.views.decorators.http import require_POST
+from django.db.models import Count, Max, Prefetch, Q
+from django.http import Http404, JsonResponse, HttpResponseForbidden
+from django.views.decorators.http import condition, require_POST
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.utils import timezone
 from django.conf import settings
 import logging
 
+from asgiref.sync import sync_to_async
+
+from .deletion import retire_video
 from .models import Video, Tag
 from .forms import VideoUploadForm
-from interactions.models import Like, View
+from .tagging import TAG_PAGE_SIZE, get_tag_first_page, popular_tags, set_video_tags
+from .visibility import visible_to
+from interactions.analytics import RANGES, ActivityReport
+from interactions.exports import EXPORTS, FORMATS, day_start, export_chunks, export_filename
+from interactions.models import Comment
+from interactions.view_dedup import count_view
+from interactions.viewer_state import attach_card_state_to_page, attach_counts, viewer_state_annotations
+from users.follows import is_following
+from core.conditional import link_versions, make_etag, page_versions
+from core.page_cache import add_surrogate_keys, anonymous_page_cache
+from core.routers import replica_reads
+from core.streaming import streaming_response
 
 logger = logging.getLogger(__name__)
 
@@ -74,20 +89,7 @@ def upload_video(request):
                     return render(request, 'videos/upload.html', {'form': form})
                 
                 # Handle tags
-                form.save_m2m()
-                
-                # Process tags manually if needed
-                tags_input = form.cleaned_data.get('tags', '')
-                if tags_input:
-                    tag_names = [tag.strip() for tag in tags_input.split(',') if tag.strip()]
-                    tags = []
-                    for tag_name in tag_names[:5]:  # Limit to 5 tags
-                        tag, created = Tag.objects.get_or_create(
-                            name=tag_name.lower(),
-                            defaults={'slug': tag_name.lower().replace(' ', '-')}
-                        )
-                        tags.append(tag)
-                    video.tags.set(tags)
+                set_video_tags(video, form.cleaned_data['tags'])
                 
                 messages.success(request, 'Video uploaded successfully!')
                 return redirect('videos:watch', video_id=video.id)
@@ -114,11 +116,37 @@ def upload_video(request):
     
     return render(request, 'videos/upload.html', {'form': form})
     
+def watch_etag(request, video_id):
+    """Versions of everything the watch page shows except view totals, without rendering it"""
+    # The viewer's reaction and follow come back with the row; having
+    # watched the video does not change this page
+    viewer_state = viewer_state_annotations(request.user)
+    viewer_state.pop('viewer_watched', None)
+    video = (
+        Video.objects.filter(pk=video_id)
+        .annotate(**viewer_state)
+        .values('updated_at', 'visibility', 'like_count', 'dislike_count', 'user_id',
+                'user__updated_at', 'user__follower_count', *viewer_state)
+        .annotate(comment_total=Count('comments'), comments_changed=Max('comments__updated_at'),
+                  commenters_changed=Max('comments__user__updated_at'))
+        .order_by('pk')
+        .first()
+    )
+    if video is None:
+        return None
+    sidebar = Video(pk=video_id, user=get_user_model()(pk=video['user_id']))
+    return make_etag(
+        request, sorted(video.items()),
+        link_versions(get_related_videos(sidebar)), link_versions(creator_videos(request, sidebar)),
+    )
+
+@anonymous_page_cache
+@replica_reads
+@condition(etag_func=watch_etag)
 def watch_video(request, video_id):
     try:
         video = get_object_or_404(
-            Video.objects.select_related('user')
-                       .prefetch_related('tags', 'comments', 'comments__user'),
+            Video.objects.select_related('user').prefetch_related('tags'),
             id=video_id
         )
 
@@ -131,38 +159,33 @@ def watch_video(request, video_id):
                 messages.error(request, 'Please login to view this video.')
                 return redirect('login')
 
-        # Record view (for authenticated users only)
-        if request.user.is_authenticated:
-            View.objects.get_or_create(
-                user=request.user,
-                video=video
-            )
-        else:
-            # Track anonymous views using session
-            viewed_videos = request.session.get('viewed_videos', [])
-            if video_id not in viewed_videos:
-                View.objects.create(user=None, video=video)
-                viewed_videos.append(video_id)
-                request.session['viewed_videos'] = viewed_videos
+        # Views are reported by the page itself through interactions:record_view,
+        # so the page can come from the page cache or a 304 and still count.
 
         # Get comments with optimization
-        comments = video.comments.filter(parent=None).select_related('user').order_by('-created_at')
+        comments = video.comments.filter(parent=None).select_related('user').order_by('-created_at').prefetch_related(
+            Prefetch('replies', queryset=Comment.objects.select_related('user').order_by('created_at'))
+        )
 
         # Check if user liked the video
         user_like = None
         if request.user.is_authenticated:
             user_like = video.likes.filter(user=request.user).first()
 
-        # Get related videos
-        related_videos = get_related_videos(video)
+        # Get related videos; sidebar links read view totals from attach_counts
+        related_videos = attach_counts(get_related_videos(video).select_related('user'), names=('view_total',))
+        more_from_creator = attach_counts(creator_videos(request, video).select_related('user'), names=('view_total',))
 
         context = {
             'video': video,
             'comments': comments,
             'user_like': user_like,
+            'is_following': is_following(request.user, video.user),
             'related_videos': related_videos,
+            'creator_videos': more_from_creator,
         }
-        return render(request, 'videos/watch.html', context)
+        response = render(request, 'videos/watch.html', context)
+        return add_surrogate_keys(response, f'video:{video.pk}', f'user:{video.user_id}')
 
     except Video.DoesNotExist:
         messages.error(request, 'Video not found.')
@@ -181,29 +204,35 @@ def can_view_video(user, video):
     elif video.visibility == 'private':
         return video.user == user
     elif video.visibility == 'followers':
-        return video.user == user or video.user.followers.filter(id=user.id).exists()
+        return video.user == user or is_following(user, video.user)
     return False
 
+def creator_videos(request, video, limit=5):
+    """The creator's other videos that the viewer may watch, newest first"""
+    return (
+        Video.objects.filter(visible_to(request.user), user_id=video.user_id)
+        .exclude(id=video.id).order_by('-created_at')[:limit]
+    )
+
 def get_related_videos(video, limit=6):
     """Get related videos based on tags and user"""
     related_videos = Video.objects.filter(
         visibility='public'
     ).exclude(id=video.id)
 
-    # Filter by tags if video has tags
-    if video.tags.exists():
-        tag_ids = video.tags.values_list('id', flat=True)
-        related_videos = related_videos.filter(
-            tags__in=tag_ids
-        ).distinct()
+    # Filter by tags if video has tags; matching through a subquery keeps
+    # rows unique without DISTINCT, which could not be combined below
+    tag_ids = list(video.tags.values_list('id', flat=True))
+    if tag_ids:
+        tagged = Q(id__in=Video.tags.through.objects.filter(tag_id__in=tag_ids).values('video_id'))
+        related_videos = related_videos.filter(tagged)
 
-    # If not enough videos by tags, include videos from same user
-    if related_videos.count() < limit:
-        same_user_videos = Video.objects.filter(
-            user=video.user,
-            visibility='public'
-        ).exclude(id=video.id)
-        related_videos = (related_videos | same_user_videos).distinct()
+        # If not enough videos by tags, include videos from same user
+        if related_videos.count() < limit:
+            related_videos = Video.objects.filter(
+                tagged | Q(user_id=video.user_id),
+                visibility='public',
+            ).exclude(id=video.id)
 
     return related_videos.order_by('-created_at')[:limit]
 
@@ -234,19 +263,7 @@ def edit_video(request, video_id):
                 video.save()
                 
                 # Handle tags
-                tags_input = form.cleaned_data.get('tags', '')
-                if tags_input:
-                    tag_names = [tag.strip() for tag in tags_input.split(',') if tag.strip()]
-                    tags = []
-                    for tag_name in tag_names:
-                        tag, created = Tag.objects.get_or_create(
-                            name=tag_name.lower(),
-                            defaults={'slug': tag_name.lower().replace(' ', '-')}
-                        )
-                        tags.append(tag)
-                    video.tags.set(tags)
-                else:
-                    video.tags.clear()
+                set_video_tags(video, form.cleaned_data['tags'])
                 
                 messages.success(request, 'Video updated successfully!')
                 return redirect('videos:watch', video_id=video.id)
@@ -268,13 +285,8 @@ def delete_video(request, video_id):
     video = get_object_or_404(Video, id=video_id, user=request.user)
     
     try:
-        # Delete files from Azure Storage
-        if video.video_file:
-            video.video_file.delete(save=False)
-        if video.thumbnail:
-            video.thumbnail.delete(save=False)
-        
-        video.delete()
+        # Hidden now; manage.py reap_deleted removes its rows and files
+        retire_video(video)
         messages.success(request, 'Video deleted successfully!')
         return redirect('users:profile', username=request.user.username)
         
@@ -283,12 +295,14 @@ def delete_video(request, video_id):
         messages.error(request, 'An error occurred while deleting the video.')
         return redirect('videos:watch', video_id=video_id)
 
-def search(request):
+SEARCH_PAGE_SIZE = 12
+
+def search_videos(request):
+    """The search results for request's q and sort parameters, with the parsed values"""
     query = request.GET.get('q', '').strip()
-    page = request.GET.get('page', 1)
     sort_by = request.GET.get('sort', 'newest')
-    
-    videos = Video.objects.filter(visibility='public').select_related('user').prefetch_related('tags')
+
+    videos = Video.objects.filter(visible_to(request.user))
 
     if query:
         videos = videos.filter(
@@ -304,12 +318,25 @@ def search(request):
     elif sort_by == 'most_views':
         videos = videos.annotate(view_count=Count('views')).order_by('-view_count')
     elif sort_by == 'most_likes':
-        videos = videos.annotate(like_count=Count('likes')).order_by('-like_count')
+        videos = videos.order_by('-like_count')
     else:  # newest (default)
         videos = videos.order_by('-created_at')
+    return videos, query, sort_by
+
+def search_etag(request):
+    videos, _, _ = search_videos(request)
+    return make_etag(request, page_versions(videos, SEARCH_PAGE_SIZE, request.GET.get('page', 1), request.user))
+
+@anonymous_page_cache
+@replica_reads
+@condition(etag_func=search_etag)
+def search(request):
+    page = request.GET.get('page', 1)
+    videos, query, sort_by = search_videos(request)
+    videos = videos.select_related('user').prefetch_related('tags')
 
     # Pagination
-    paginator = Paginator(videos, 12)  # 12 videos per page
+    paginator = Paginator(videos, SEARCH_PAGE_SIZE)
     try:
         videos_page = paginator.page(page)
     except PageNotAnInteger:
@@ -318,32 +345,65 @@ def search(request):
         videos_page = paginator.page(paginator.num_pages)
 
     context = {
-        'videos': videos_page,
+        'videos': attach_card_state_to_page(videos_page, request.user),
         'query': query,
         'sort_by': sort_by,
     }
-    return render(request, 'videos/search.html', context)
+    return add_surrogate_keys(render(request, 'videos/search.html', context), 'feed')
+
+def tag_videos(request, tag):
+    return tag.videos.filter(visible_to(request.user)).order_by('-created_at')
+
+def tag_etag(request, tag_slug):
+    tag = Tag.objects.filter(slug=tag_slug).only('pk', 'name', 'video_count').first()
+    if tag is None:
+        return None
+    return make_etag(request, tag.pk, tag.name, tag.video_count, page_versions(
+        tag_videos(request, tag), TAG_PAGE_SIZE, request.GET.get('page', 1), request.user,
+    ))
 
+@anonymous_page_cache
+@replica_reads
+@condition(etag_func=tag_etag)
 def videos_by_tag(request, tag_slug):
     tag = get_object_or_404(Tag, slug=tag_slug)
     page = request.GET.get('page', 1)
     
-    videos = tag.videos.filter(visibility='public').select_related('user').order_by('-created_at')
+    videos = tag_videos(request, tag).select_related('user')
     
     # Pagination
-    paginator = Paginator(videos, 12)
+    paginator = Paginator(videos, TAG_PAGE_SIZE)
+    # The cached first page holds the public listing, which is exactly what
+    # anonymous visitors see; signed-in users get their own feed.
+    cacheable = not request.user.is_authenticated
     try:
-        videos_page = paginator.page(page)
+        if cacheable and str(page) == '1':
+            videos_page = get_tag_first_page(tag, paginator)
+        else:
+            videos_page = paginator.page(page)
     except PageNotAnInteger:
-        videos_page = paginator.page(1)
+        videos_page = get_tag_first_page(tag, paginator) if cacheable else paginator.page(1)
     except EmptyPage:
         videos_page = paginator.page(paginator.num_pages)
 
     context = {
         'tag': tag,
-        'videos': videos_page,
+        'videos': attach_card_state_to_page(videos_page, request.user),
     }
-    return render(request, 'videos/tag.html', context)
+    return add_surrogate_keys(render(request, 'videos/tag.html', context), f'tag:{tag.pk}', 'feed')
+
+def tag_directory(request):
+    """Browse tags ordered by popularity"""
+    page = request.GET.get('page', 1)
+    paginator = Paginator(popular_tags(), 48)
+    try:
+        tags_page = paginator.page(page)
+    except PageNotAnInteger:
+        tags_page = paginator.page(1)
+    except EmptyPage:
+        tags_page = paginator.page(paginator.num_pages)
+
+    return render(request, 'videos/tags.html', {'tags': tags_page})
 
 @login_required
 def my_videos(request):
@@ -361,19 +421,46 @@ def my_videos(request):
 
     return render(request, 'videos/my_videos.html', {'videos': videos_page})
 
+@login_required
+@replica_reads
+def creator_analytics(request):
+    """The signed-in creator's activity dashboard, read only from the rollup tables"""
+    report = ActivityReport(request.user, request.GET.get('range'))
+    return render(request, 'videos/analytics.html', {'report': report, 'ranges': RANGES, 'exports': EXPORTS})
+
+@login_required
+@replica_reads
+def export_analytics(request, kind):
+    """Stream one of the signed-in creator's tables as CSV or JSON lines, optionally gzipped"""
+    export = EXPORTS.get(kind)
+    if export is None:
+        raise Http404('Unknown export')
+    fmt = request.GET.get('format') if request.GET.get('format') in FORMATS else 'csv'
+    compress = request.GET.get('gzip') == '1'
+    rows = export.rows(request.user, day_start(request.GET.get('since')), day_start(request.GET.get('until')))
+    # Rows are read after the view returns, once the replica choice is gone,
+    # so fix the alias now
+    rows = rows.using(rows.db)
+
+    response = streaming_response(
+        export_chunks(export, rows, fmt, compress),
+        content_type='application/gzip' if compress else FORMATS[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(request.user, kind, fmt, compress)}"'
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
 # API endpoints for AJAX requests
 @require_POST
 @login_required
-def increment_view_count(request, video_id):
+async def increment_view_count(request, video_id):
     """API endpoint to increment view count (for AJAX)"""
     try:
-        video = get_object_or_404(Video, id=video_id)
-        if can_view_video(request.user, video):
-            View.objects.get_or_create(
-                user=request.user,
-                video=video
-            )
-            return JsonResponse({'success': True, 'views': video.views.count()})
+        user = await request.auser()
+        video = await aget_object_or_404(Video.objects.select_related('user'), id=video_id)
+        if await sync_to_async(can_view_video)(user, video):
+            await sync_to_async(count_view)(request, user, video)
+            return JsonResponse({'success': True, 'views': await video.views.acount()})
         return JsonResponse({'success': False, 'error': 'Permission denied'})
     except Exception as e:
         logger.error(f"Error incrementing view count: {e}")
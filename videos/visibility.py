@@ -0,0 +1,16 @@
+from django.db.models import Exists, OuterRef, Q
+
+from users.models import Follow
+
+
+def visible_to(user):
+    """Single predicate for videos a user may see: public, their own, or followers-only from creators they follow"""
+    predicate = Q(visibility='public')
+    if user.is_authenticated:
+        # Correlated EXISTS keeps the follower check a semi-join instead of a
+        # per-row permission lookup.
+        follows_creator = Exists(
+            Follow.objects.filter(follower_id=user.pk, followee_id=OuterRef('user_id'))
+        )
+        predicate |= Q(user_id=user.pk) | (Q(visibility='followers') & follows_creator)
+    return predicate